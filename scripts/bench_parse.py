@@ -0,0 +1,137 @@
+"""Parse benchmark for the v3/v4 API payload parsers.
+
+Builds a large batched response by repeating the items of the bundled API
+fixtures, then reports the parse time and the memory held per entry for the
+SpotlightEntry parsers (with the standard json module and, when installed,
+orjson) next to the previous dict-per-entry parsing.
+
+Usage: python scripts/bench_parse.py [--items N] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+# pylint: disable=wrong-import-position
+from pyspotlightarchiver.helpers import spotlight_entry
+from pyspotlightarchiver.helpers.v3_helper import _sha256_hex, parse_v3_data
+from pyspotlightarchiver.helpers.v4_helper import parse_v4_data
+
+FIXTURES_DIR = os.path.join(SRC_DIR, "pyspotlightarchiver", "tests")
+
+
+def _dict_v3(data, orientation):
+    """The dict-per-entry v3 parsing the SpotlightEntry parser replaced."""
+    results = []
+    for item in data.get("batchrsp", {}).get("items", []):
+        ad = json.loads(item["item"]).get("ad", {})
+        entry = {}
+        landscape = ad.get("image_fullscreen_001_landscape", {})
+        portrait = ad.get("image_fullscreen_001_portrait", {})
+        if orientation == "landscape":
+            entry["image_url"] = landscape.get("u")
+            entry["image_sha256"] = _sha256_hex(landscape)
+        elif orientation == "portrait":
+            entry["image_url"] = portrait.get("u")
+            entry["image_sha256"] = _sha256_hex(portrait)
+        else:
+            entry["image_url_landscape"] = landscape.get("u")
+            entry["image_url_portrait"] = portrait.get("u")
+            entry["image_sha256_landscape"] = _sha256_hex(landscape)
+            entry["image_sha256_portrait"] = _sha256_hex(portrait)
+        entry["title"] = ad.get("title_text", {}).get("tx")
+        entry["copyright"] = ad.get("copyright_text", {}).get("tx")
+        results.append(entry)
+    return results
+
+
+def _dict_v4(data, orientation):
+    """The dict-per-entry v4 parsing the SpotlightEntry parser replaced."""
+    results = []
+    for item in data.get("batchrsp", {}).get("items", []):
+        ad = json.loads(item["item"]).get("ad", {})
+        entry = {}
+        if orientation == "landscape":
+            entry["image_url"] = ad.get("landscapeImage", {}).get("asset")
+        elif orientation == "portrait":
+            entry["image_url"] = ad.get("portraitImage", {}).get("asset")
+        else:
+            entry["image_url_landscape"] = ad.get("landscapeImage", {}).get("asset")
+            entry["image_url_portrait"] = ad.get("portraitImage", {}).get("asset")
+        icon_hover = ad.get("iconHoverText", "")
+        entry["picture_title"] = (
+            icon_hover.split("\r\n")[0] if "\r\n" in icon_hover else icon_hover
+        )
+        entry["copyright"] = ad.get("copyright")
+        entry["caption_title"] = ad.get("title")
+        entry["caption_description"] = ad.get("description")
+        results.append(entry)
+    return results
+
+
+def _batch(name, count):
+    """A response holding count items, cycling through the fixture's items."""
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        items = json.load(f)["batchrsp"]["items"]
+    return {"batchrsp": {"items": [items[i % len(items)] for i in range(count)]}}
+
+
+def _measure(parse, data, orientation, repeat):
+    """Return (best seconds per parse, bytes held per entry)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(data, orientation)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = parse(data, orientation)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return best, held / max(len(results), 1)
+
+
+def main():
+    """Run the benchmark and print one line per parser."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--items", type=int, default=20000, help="Items per batch. Default: 20000"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Timed runs per parser. Default: 5"
+    )
+    args = parser.parse_args()
+
+    orjson = spotlight_entry.orjson
+    for api_ver, fixture, dict_parse, entry_parse in (
+        (3, "v3_api.json", _dict_v3, parse_v3_data),
+        (4, "v4_api.json", _dict_v4, parse_v4_data),
+    ):
+        data = _batch(fixture, args.items)
+        for orientation in ("landscape", "both"):
+            print(f"v{api_ver}, {orientation}, {args.items} items:")
+            runs = [("dict + json", dict_parse, None)]
+            runs.append(("SpotlightEntry + json", entry_parse, None))
+            if orjson is not None:
+                runs.append(("SpotlightEntry + orjson", entry_parse, orjson))
+            for label, parse, backend in runs:
+                spotlight_entry.orjson = backend
+                seconds, per_entry = _measure(parse, data, orientation, args.repeat)
+                print(
+                    f"  {label:<24} {seconds * 1000:8.1f} ms"
+                    f"  {seconds / args.items * 1e6:6.2f} us/entry"
+                    f"  {per_entry:7.0f} B/entry"
+                )
+    spotlight_entry.orjson = orjson
+    if orjson is None:
+        print("orjson is not installed; pip install orjson to compare it too.")
+
+
+if __name__ == "__main__":
+    main()
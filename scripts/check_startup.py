@@ -0,0 +1,96 @@
+"""Startup budget check for the pyspotlightarchiver CLI.
+
+Imports the CLI entry point in a fresh interpreter with `-X importtime` and
+fails if a heavy dependency is loaded at import time, or if the import takes
+longer than the budget. Lighter per-command checks run too when the runtime
+dependencies are installed.
+
+Usage: python scripts/check_startup.py [--budget MILLISECONDS]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Modules that must never be imported just to parse arguments or print help
+HEAVY_MODULES = ("requests", "rich", "babel", "imagededup", "numpy", "PIL", "urllib3")
+
+# module to import -> heavy modules it must not pull in
+COMMAND_CHECKS = {
+    "pyspotlightarchiver.main": HEAVY_MODULES,
+    "pyspotlightarchiver.utils.list_url": ("babel", "imagededup", "numpy", "PIL"),
+}
+
+
+def _import_report(module):
+    """Import module in a fresh interpreter. Returns (loaded modules, timings) or None."""
+    code = (
+        "import sys\n"
+        f"import {module}\n"
+        "sys.stdout.write('\\n'.join(sorted(sys.modules)))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=SRC_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    if result.returncode != 0:
+        # Drop the importtime lines and keep the traceback
+        errors = [l for l in result.stderr.splitlines() if not l.startswith("import time:")]
+        return None, "\n".join(errors)
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative.strip())
+    return set(result.stdout.split()), timings
+
+
+def main():
+    """Run the checks and exit non-zero on any violation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=150.0,
+        help="Maximum cumulative import time of the CLI entry point, in ms. Default: 150",
+    )
+    args = parser.parse_args()
+
+    failures = []
+    for module, forbidden in COMMAND_CHECKS.items():
+        loaded, timings = _import_report(module)
+        if loaded is None:
+            if module == "pyspotlightarchiver.main":
+                failures.append(f"{module} failed to import:\n{timings}")
+            else:
+                print(f"SKIP {module}: runtime dependencies not installed")
+            continue
+        heavy = sorted(
+            name for name in loaded if name.split(".")[0] in forbidden
+        )
+        elapsed_ms = timings.get(module, 0) / 1000
+        print(f"{module}: {elapsed_ms:.1f} ms")
+        if heavy:
+            roots = sorted({name.split(".")[0] for name in heavy})
+            failures.append(f"{module} imports heavy modules at load time: {', '.join(roots)}")
+        if module == "pyspotlightarchiver.main" and elapsed_ms > args.budget:
+            failures.append(
+                f"{module} took {elapsed_ms:.1f} ms to import (budget {args.budget:.0f} ms)"
+            )
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
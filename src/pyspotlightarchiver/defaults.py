@@ -0,0 +1,66 @@
+"""Default settings shared by the CLI and the modules that use them.
+
+Kept free of third-party imports so `main` can build its argument parser
+without loading the download stack.
+"""
+
+# Spotlight API response cache
+API_CACHE_MODES = ("use", "refresh", "off")
+DEFAULT_API_CACHE_MODE = "use"
+DEFAULT_API_CACHE_TTL = 3600  # seconds
+DEFAULT_API_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Locale equivalence classes (--locale all sweeps)
+LOCALE_RECHECK_RATE = 0.1  # chance per sweep of querying a non-representative locale
+LOCALE_MIN_ASSETS = 8  # assets a locale must have returned before it is classified
+# Shared assets / assets of the smaller set for two locales to be equivalent:
+# at least half of what one served must also have been served to the other.
+# Distinct pools share only the odd global image, and a wrong grouping is
+# noticed through LOCALE_RECHECK_RATE
+LOCALE_MIN_OVERLAP = 0.5
+LOCALE_ASSETS_MAX_AGE = 30  # days a locale's observed asset counts toward grouping
+
+# Locale scheduler for --locale all in the download loop
+LOCALE_SCHEDULERS = ("bandit", "sweep")
+DEFAULT_LOCALE_SCHEDULER = "bandit"
+LOCALE_ROUND_SIZE = 15  # locales queried per round by the bandit scheduler
+LOCALE_EXPLORE_RATE = 0.1  # chance of spending a slot on a random locale
+LOCALE_STATS_WINDOW = 20  # past calls per locale the yield estimate trusts
+
+# Stopping rule of the download loop
+DEFAULT_STOP_BELOW = 0.05  # expected new images per API call
+MIN_ROUNDS_BEFORE_STOP = 10
+
+# Retries of API calls and downloads
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 2.0  # seconds before the second attempt, doubled after each failure
+RETRY_MAX_DELAY = 30.0
+RETRY_DEADLINE = 60.0  # seconds after which a failing operation is no longer retried
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failures that open a host's circuit
+CIRCUIT_COOLDOWN = 60.0  # seconds a host's circuit stays open
+
+# Shared HTTP connection pool
+HTTP_POOL_HOSTS = 10  # hosts whose connections are kept
+HTTP_POOL_SIZE = 16  # idle keep-alive connections kept per host
+
+# Staged download pipeline of the threads engine (workers per stage)
+PIPELINE_QUEUE_SIZE = 32  # images waiting in front of each stage
+PIPELINE_DOWNLOAD_WORKERS = 8
+PIPELINE_HASH_WORKERS = 4
+PIPELINE_TAG_WORKERS = 2
+PIPELINE_TAG_BATCH = 32  # images tagged per exiftool round trip
+
+# Async download engine
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_MAX_PER_HOST = 8
+
+# EXIF embedding
+EXIF_WRITERS = ("native", "exiftool")
+DEFAULT_EXIF_WRITER = "native"
+DEFAULT_EXIFTOOL_WORKERS = 2
+
+# Duplicate detection
+DEFAULT_PHASH_THRESHOLD = 6
+PHASH_BACKENDS = ("builtin", "exact", "imagededup")
+DEFAULT_PHASH_BACKEND = "exact"
+DEFAULT_HASH_WORKERS = 4  # processes computing phashes while downloading, at most one per CPU core
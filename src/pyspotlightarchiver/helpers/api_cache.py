@@ -0,0 +1,170 @@
+"""On-disk cache of Spotlight API responses, shared by every command."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from pyspotlightarchiver.defaults import (
+    API_CACHE_MODES,
+    DEFAULT_API_CACHE_MAX_BYTES,
+    DEFAULT_API_CACHE_MODE,
+    DEFAULT_API_CACHE_TTL,
+)
+from pyspotlightarchiver.helpers.download_helper import http_get
+from pyspotlightarchiver.helpers.spotlight_entry import json_loads
+
+API_CACHE_DIRNAME = "api_responses"
+
+_mode = DEFAULT_API_CACHE_MODE
+_ttl = DEFAULT_API_CACHE_TTL
+_max_bytes = DEFAULT_API_CACHE_MAX_BYTES
+_save_dir = None
+
+# {path: (last use, size)} of the cache files, listed on first use and kept up
+# to date by this process so eviction needs no directory scan
+_entries = None
+_entries_lock = threading.Lock()
+
+
+def set_api_cache(mode, save_dir=None, ttl=None):
+    """
+    Select how API responses are cached:
+    'use' (serve fresh cached responses, store new ones),
+    'refresh' (always fetch, store the result) or 'off'.
+    Responses older than ttl seconds are never served.
+    """
+    global _mode, _ttl, _save_dir, _entries  # pylint: disable=global-statement
+    if mode not in API_CACHE_MODES:
+        raise ValueError(f"Unknown API cache mode '{mode}'")
+    if ttl is not None and ttl < 0:
+        raise ValueError("The API cache TTL cannot be negative")
+    _mode = mode
+    if ttl is not None:
+        _ttl = ttl
+    with _entries_lock:
+        if save_dir != _save_dir:
+            _entries = None
+        _save_dir = save_dir
+
+
+def get_api_cache_mode():
+    """Return the current cache mode."""
+    return _mode
+
+
+def get_api_cache_ttl():
+    """Return the seconds a cached response stays valid."""
+    return _ttl
+
+
+def get_api_cache_dir(save_dir=None):
+    """Directory of the cached responses, next to the locale cache."""
+    base = save_dir if save_dir else os.getcwd()
+    return os.path.join(base, ".cache", API_CACHE_DIRNAME)
+
+
+def _cache_path(url):
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(get_api_cache_dir(_save_dir), f"{name}.json")
+
+
+def _load_entries():
+    """List the cache files once per process. Call with _entries_lock held."""
+    global _entries  # pylint: disable=global-statement
+    if _entries is None:
+        _entries = {}
+        try:
+            with os.scandir(get_api_cache_dir(_save_dir)) as it:
+                for entry in it:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        stat = entry.stat()
+                        _entries[entry.path] = (stat.st_mtime, stat.st_size)
+        except FileNotFoundError:
+            pass
+    return _entries
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    with _entries_lock:
+        _load_entries().pop(path, None)
+
+
+def _read(url):
+    """Return the cached data for url, or None if missing, stale or unreadable."""
+    path = _cache_path(url)
+    try:
+        with open(path, "rb") as f:
+            cached = json_loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        _remove(path)
+        return None
+    if cached.get("url") != url or time.time() - cached.get("fetched_at", 0) > _ttl:
+        _remove(path)
+        return None
+    # The file's mtime records its last use, for least-recently-used eviction
+    now = time.time()
+    try:
+        os.utime(path, (now, now))
+    except OSError:
+        pass
+    with _entries_lock:
+        entries = _load_entries()
+        if path in entries:
+            entries[path] = (now, entries[path][1])
+    return cached["data"]
+
+
+def _write(url, data):
+    """Store data for url atomically, then evict least recently used files over budget."""
+    path = _cache_path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.part"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "fetched_at": time.time(), "data": data}, f)
+    os.replace(temp_path, path)
+    size = os.path.getsize(path)
+    with _entries_lock:
+        entries = _load_entries()
+        entries[path] = (time.time(), size)
+        total = sum(entry_size for _, entry_size in entries.values())
+        if total <= _max_bytes:
+            return
+        evicted = []
+        for old_path, (_, old_size) in sorted(entries.items(), key=lambda e: e[1][0]):
+            if total <= _max_bytes or old_path == path:
+                break
+            evicted.append(old_path)
+            total -= old_size
+        for old_path in evicted:
+            del entries[old_path]
+    for old_path in evicted:
+        try:
+            os.remove(old_path)
+        except FileNotFoundError:
+            pass
+
+
+def cached_api_get(url):
+    """
+    GET a JSON API response through the cache. The URL carries the API version,
+    locale and batch parameters, so it is the cache key.
+    """
+    if _mode == "use":
+        data = _read(url)
+        if data is not None:
+            return data
+    response = http_get(url, timeout=10)
+    # Error statuses become HTTPError, so the retry policy can classify them
+    response.raise_for_status()
+    data = json_loads(response.content)
+    if _mode != "off":
+        _write(url, data)
+    return data
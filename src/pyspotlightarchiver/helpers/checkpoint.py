@@ -0,0 +1,48 @@
+"""Checkpoints that let an interrupted --locale all crawl resume where it stopped."""
+
+import json
+import os
+import threading
+
+CHECKPOINT_DIRNAME = "checkpoints"
+
+
+class CrawlCheckpoint:
+    """
+    JSON state of one crawl, saved atomically under .cache/checkpoints.
+    params identify the crawl (API version, orientation, ...): a checkpoint
+    saved with other params is ignored.
+    """
+
+    def __init__(self, name, save_dir=None, **params):
+        base = save_dir if save_dir else os.getcwd()
+        self.path = os.path.join(base, ".cache", CHECKPOINT_DIRNAME, f"{name}.json")
+        self.params = params
+
+    def load(self):
+        """Return the saved state, or None if there is none for these params."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            return None  # Unreadable checkpoint: start over
+        if saved.get("params") != self.params:
+            return None
+        return saved.get("state")
+
+    def save(self, state):
+        """Write state, replacing the previous checkpoint in one rename."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}-{threading.get_ident()}.part"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"params": self.params, "state": state}, f)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        """Delete the checkpoint (the crawl finished or is restarted)."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,118 @@
+"""Per-host circuit breakers that stop requests to a host that keeps failing."""
+
+import math
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from rich import print as rprint
+
+from pyspotlightarchiver.defaults import CIRCUIT_COOLDOWN, CIRCUIT_FAILURE_THRESHOLD
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host, retry_in):
+        if retry_in > 0:
+            wait = f"requests paused for another {math.ceil(retry_in)} second(s)"
+        else:
+            wait = "waiting for the trial request to it"
+        super().__init__(f"{host} is failing, {wait}")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Closed while a host answers; after failure_threshold consecutive failures
+    (transport errors or 5xx responses) it opens and requests fail at once for
+    cooldown seconds. Then a single trial request is let through (half-open):
+    success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        host,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        cooldown=CIRCUIT_COOLDOWN,
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._open_until = None
+        self._trial = False
+        self._lock = threading.Lock()
+        self.trips = 0
+
+    def before_request(self):
+        """
+        Raise CircuitOpenError if no request may be sent to the host now.
+        Returns True if the request is the half-open trial, whose outcome must
+        then be recorded or the trial released.
+        """
+        with self._lock:
+            if self._open_until is None:
+                return False
+            now = time.monotonic()
+            if now < self._open_until or self._trial:
+                raise CircuitOpenError(self.host, max(0.0, self._open_until - now))
+            self._trial = True
+            return True
+
+    def release_trial(self):
+        """The trial request ended without telling whether the host works (e.g. Ctrl-C)."""
+        with self._lock:
+            self._trial = False
+
+    def open_for(self):
+        """Seconds until a trial request may be sent (0 while the circuit is closed)."""
+        with self._lock:
+            if self._open_until is None:
+                return 0.0
+            return max(0.0, self._open_until - time.monotonic())
+
+    def record_success(self):
+        """The host answered (any status below 500)."""
+        with self._lock:
+            self._failures = 0
+            self._open_until = None
+            self._trial = False
+
+    def record_failure(self):
+        """The request failed in transport or with a 5xx status."""
+        with self._lock:
+            self._failures += 1
+            if self._trial or (
+                self._open_until is None and self._failures >= self.failure_threshold
+            ):
+                self._open_until = time.monotonic() + self.cooldown
+                self._trial = False
+                self.trips += 1
+                rprint(
+                    f"🔌 [yellow]{self.host} keeps failing, pausing requests to it "
+                    f"for {self.cooldown:.0f} seconds[/yellow]"
+                )
+
+
+def get_circuit_breaker(url_or_host):
+    """Return the shared breaker for the host of the given URL (or host name)."""
+    host = urlsplit(url_or_host).netloc or url_or_host
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+        return breaker
+
+
+def get_open_circuit_wait():
+    """Seconds until the first open circuit lets a trial request through (0 if none is open)."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    waits = [wait for wait in (breaker.open_for() for breaker in breakers) if wait > 0]
+    return min(waits, default=0.0)
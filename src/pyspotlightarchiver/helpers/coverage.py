@@ -0,0 +1,86 @@
+"""Estimates of how much of the Spotlight image pool is still unseen."""
+
+from collections import Counter
+
+
+class UnseenEstimator:
+    """
+    Good-Turing and Chao1 statistics over the assets observed in API responses
+    during a run. Every response is a sample from the pool, so assets seen only
+    once (f1) or twice (f2) tell how much of it has not turned up yet:
+    the next observed asset is unseen with probability about f1 / n
+    (Good-Turing), and about f1^2 / (2 f2) assets are still unseen (Chao1).
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self.observations = 0
+        self.calls = 0
+        self.new_images = 0
+
+    def update(self, asset_ids, calls, new_images):
+        """Add one round: the asset ids returned, the API calls made and new images saved."""
+        self._counts.update(asset_ids)
+        self.observations += len(asset_ids)
+        self.calls += calls
+        self.new_images += new_images
+
+    def as_dict(self):
+        """JSON-serialisable state, restored by from_dict."""
+        return {
+            "counts": dict(self._counts),
+            "observations": self.observations,
+            "calls": self.calls,
+            "new_images": self.new_images,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild an estimator saved with as_dict."""
+        estimator = cls()
+        estimator._counts.update(state.get("counts", {}))
+        estimator.observations = state.get("observations", 0)
+        estimator.calls = state.get("calls", 0)
+        estimator.new_images = state.get("new_images", 0)
+        return estimator
+
+    def _frequencies(self):
+        f1 = f2 = 0
+        for count in self._counts.values():
+            if count == 1:
+                f1 += 1
+            elif count == 2:
+                f2 += 1
+        return f1, f2
+
+    def unseen_probability(self):
+        """Good-Turing probability that the next observed asset has not been seen yet."""
+        if not self.observations:
+            return 1.0
+        f1, _ = self._frequencies()
+        return f1 / self.observations
+
+    def unseen_assets(self):
+        """Bias-corrected Chao1 estimate of the assets in the pool not seen yet."""
+        f1, f2 = self._frequencies()
+        return f1 * (f1 - 1) / (2 * (f2 + 1))
+
+    def expected_new_per_call(self):
+        """
+        Expected new images per API call: the assets a call returns, times the
+        chance each is unseen, times the share of unseen assets that turned out
+        not to be archived yet (with add-one smoothing).
+        """
+        if not self.calls:
+            return float("inf")
+        per_call = self.observations / self.calls
+        not_archived = (self.new_images + 1) / (len(self._counts) + 2)
+        return per_call * self.unseen_probability() * not_archived
+
+    def format(self):
+        """One-line summary of the current estimates."""
+        return (
+            f"{self.expected_new_per_call():.3f} new image(s) per call expected, "
+            f"~{self.unseen_assets():.0f} unseen asset(s) "
+            f"({len(self._counts)} seen in {self.calls} call(s))"
+        )
@@ -1,15 +1,72 @@
 """Module to manage the SQLite database for downloaded images."""
 
+import atexit
+import os
+import queue
 import sqlite3
 import threading
-import os
-from contextlib import closing
+import time
+from concurrent.futures import Future
+from contextlib import closing, contextmanager
 from datetime import datetime
-from pyspotlightarchiver.helpers.download_helper import get_save_dir
+
+from rich import print as rprint
+
+from pyspotlightarchiver.defaults import LOCALE_ASSETS_MAX_AGE
+from pyspotlightarchiver.helpers.download_helper import asset_id, is_saved_file
+from pyspotlightarchiver.helpers.seen_urls import SeenURLSet
 
 DB_FILENAME = "downloaded_images.sqlite"
 
-_thread_local = threading.local()
+# Image records are committed by a single writer thread per database, in batches
+# of up to WRITE_BATCH_SIZE rows collected for at most WRITE_BATCH_WINDOW seconds
+WRITE_BATCH_SIZE = 256
+WRITE_BATCH_WINDOW = 0.25
+# A batch failing with OperationalError (e.g. "database is locked" by another
+# process) is tried this many times, waiting WRITE_RETRY_DELAY * 2^attempt seconds
+WRITE_RETRIES = 5
+WRITE_RETRY_DELAY = 0.5
+
+# Optional per-image columns accepted by add_image_url_to_db(metadata=...)
+IMAGE_METADATA_COLUMNS = (
+    "sha256",
+    "size",
+    "width",
+    "height",
+    "api_ver",
+    "locale",
+    "orientation",
+    "title",
+    "copyright",
+    "etag",
+    "last_modified",
+)
+_IMAGE_COLUMNS = (
+    "url",
+    "phash",
+    "filename",
+    "downloaded_at",
+    "asset_id",
+) + IMAGE_METADATA_COLUMNS
+_ASSET_ID_INDEX = _IMAGE_COLUMNS.index("asset_id")
+_SHA256_INDEX = _IMAGE_COLUMNS.index("sha256")
+_INSERT_IMAGE_SQL = (
+    f"INSERT OR REPLACE INTO downloaded_images ({', '.join(_IMAGE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_IMAGE_COLUMNS))})"
+)
+
+# Callbacks run after images are inserted:
+# callback(save_dir, [(rowid, url, phash)], replaced_urls)
+_insert_listeners = []
+
+_writers = {}
+_writers_lock = threading.Lock()
+# Idle read connections per database, shared by all threads
+_readers = {}
+_readers_lock = threading.Lock()
+# Archived asset ids per (database, api_ver), loaded once and grown as images land
+_seen_urls = {}
+_seen_urls_lock = threading.Lock()
 
 
 def get_db_path(save_dir=None):
@@ -23,53 +80,461 @@ def get_db_path(save_dir=None):
     return os.path.join(cache_dir, DB_FILENAME)
 
 
+def _connect(db_path):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    return sqlite3.connect(db_path, check_same_thread=False)
+
+
+class _DBWriter:
+    """
+    Owns the only writing connection to one database. Image records are queued
+    and committed in batches with executemany; other writes run in queue order.
+    """
+
+    def __init__(self, db_path, save_dir):
+        self.db_path = db_path
+        self.save_dir = save_dir
+        self.conn = None
+        # Why the database could not be opened, if it could not
+        self._error = None
+        self._queue = queue.Queue()
+        # url -> record that is queued but not committed yet
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="download-db-writer", daemon=True
+        )
+        self._thread.start()
+
+    def is_writer_thread(self):
+        """True when called from this writer's own thread."""
+        return threading.current_thread() is self._thread
+
+    def has_pending(self):
+        """True while records are queued or being committed."""
+        return bool(self._pending)
+
+    def pending_record(self, url):
+        """Return the queued (url, phash, filename, downloaded_at) for url, if any."""
+        with self._pending_lock:
+            record = self._pending.get(url)
+        return record[:4] if record is not None else None
+
+    def pending_records(self):
+        """Return a snapshot of the queued records (full column tuples)."""
+        with self._pending_lock:
+            return list(self._pending.values())
+
+    def add(self, record):
+        """Queue one downloaded_images record. Raises if the database could not be opened."""
+        with self._pending_lock:
+            if self._error is not None:
+                raise self._error
+            self._pending[record[0]] = record
+            self._queue.put(("insert", record))
+
+    def submit(self, func):
+        """Run func(conn) on the writer thread after everything queued so far."""
+        future = Future()
+        with self._pending_lock:
+            if self._error is not None:
+                future.set_exception(self._error)
+            else:
+                self._queue.put(("call", (func, future)))
+        return future
+
+    def stop(self):
+        """Commit everything queued, then close the connection and end the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        try:
+            self.conn = _connect(self.db_path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            # Safe with WAL: a crash can lose the last commits but not corrupt the DB
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self._fail(exc)
+            return
+        while True:
+            item = self._queue.get()
+            records = []
+            deadline = time.monotonic() + WRITE_BATCH_WINDOW
+            while item is not None:
+                kind, payload = item
+                if kind == "call":
+                    # Keep queue order: commit the records queued before the call
+                    self._commit(records)
+                    records = []
+                    self._call(*payload)
+                else:
+                    records.append(payload)
+                if not records or len(records) >= WRITE_BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+            self._commit(records)
+            if item is None:
+                break
+        self.conn.close()
+
+    def _fail(self, exc):
+        """The database cannot be opened: fail what is queued and every later write."""
+        rprint(f"❌ [red]Cannot open the database {self.db_path}: {exc}[/red]")
+        with self._pending_lock:
+            self._error = exc
+            self._pending.clear()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[0] == "call":
+                item[1][1].set_exception(exc)
+
+    def _call(self, func, future):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(self.conn))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            future.set_exception(exc)
+
+    def _commit(self, records):
+        if not records:
+            return
+        try:
+            try:
+                replaced = self._insert(records)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                rprint(
+                    f"❌ [red]Failed to record {len(records)} image(s) in the database: {exc}[/red]"
+                )
+                return
+            # The rows are committed; a failing listener only leaves its own state stale
+            try:
+                rows = self._inserted_rows(records)
+                for callback in _insert_listeners:
+                    callback(self.save_dir, rows, replaced)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                rprint(
+                    f"⚠️ [yellow]Recorded {len(records)} image(s), but updating the "
+                    f"seen-URL set or duplicate groups failed: {exc}[/yellow]"
+                )
+        finally:
+            with self._pending_lock:
+                for record in records:
+                    if self._pending.get(record[0]) is record:
+                        del self._pending[record[0]]
+
+    def _insert(self, records):
+        """
+        Commit the records, retrying while the database is locked.
+        Returns the set of their URLs that were already recorded.
+        """
+        for attempt in range(WRITE_RETRIES):
+            try:
+                with self.conn:
+                    # Re-recorded URLs get a new rowid and maybe a new phash
+                    replaced = self._existing_urls(records)
+                    self.conn.executemany(_INSERT_IMAGE_SQL, records)
+                return replaced
+            except sqlite3.OperationalError as exc:
+                if attempt == WRITE_RETRIES - 1:
+                    raise
+                delay = WRITE_RETRY_DELAY * 2**attempt
+                rprint(
+                    f"⚠️ [yellow]Recording {len(records)} image(s) failed: {exc}. "
+                    f"Retrying in {delay:.1f} seconds...[/yellow]"
+                )
+                time.sleep(delay)
+        raise RuntimeError("WRITE_RETRIES must be at least 1")
+
+    def _existing_urls(self, records):
+        """The set of the records' URLs that are already in the database."""
+        urls = list({record[0] for record in records})
+        existing = set()
+        with closing(self.conn.cursor()) as cursor:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i : i + 500]
+                cursor.execute(
+                    f"""
+                    SELECT url
+                    FROM downloaded_images
+                    WHERE url IN ({",".join("?" * len(chunk))})
+                    """,
+                    chunk,
+                )
+                existing.update(url for (url,) in cursor)
+        return existing
+
+    def _inserted_rows(self, records):
+        """Look up the rowids of committed records. Returns [(rowid, url, phash)]."""
+        latest = {record[0]: record for record in records}
+        urls = list(latest)
+        rowids = {}
+        with closing(self.conn.cursor()) as cursor:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i : i + 500]
+                cursor.execute(
+                    f"""
+                    SELECT url, rowid
+                    FROM downloaded_images
+                    WHERE url IN ({",".join("?" * len(chunk))})
+                    """,
+                    chunk,
+                )
+                rowids.update(cursor.fetchall())
+        return [
+            (rowids[url], url, record[1])
+            for url, record in latest.items()
+            if url in rowids
+        ]
+
+
+def _get_writer(save_dir=None, create=True):
+    """Return the writer for save_dir's database, starting it if needed."""
+    db_path = get_db_path(save_dir)
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None and create:
+            writer = _writers[db_path] = _DBWriter(db_path, save_dir)
+        return writer
+
+
+def _run_write(save_dir, func):
+    """Run func(conn) on the database's writer thread and return its result."""
+    writer = _get_writer(save_dir)
+    if writer.is_writer_thread():
+        return func(writer.conn)
+    return writer.submit(func).result()
+
+
+@contextmanager
 def _get_connection(save_dir=None):
-    """Return a per-thread persistent SQLite connection, creating one if needed."""
+    """Borrow a read connection for save_dir's database, opening one if none is idle."""
     db_path = get_db_path(save_dir)
-    key = f"conn_{db_path}"
-    conn = getattr(_thread_local, key, None)
+    writer = _get_writer(save_dir, create=False)
+    if writer is not None and writer.is_writer_thread():
+        # Insert listeners read through the writer's own connection
+        yield writer.conn
+        return
+    with _readers_lock:
+        idle = _readers.setdefault(db_path, [])
+        conn = idle.pop() if idle else None
     if conn is None:
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        conn = sqlite3.connect(db_path)
-        setattr(_thread_local, key, conn)
-    return conn
+        conn = _connect(db_path)
+    try:
+        yield conn
+    finally:
+        with _readers_lock:
+            _readers.setdefault(db_path, []).append(conn)
 
 
-def init_db(save_dir):
-    """Initialize the SQLite database and create the table if it doesn't exist."""
-    conn = _get_connection(save_dir)
-    with closing(conn.cursor()) as cursor:
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS downloaded_images (
-                url TEXT PRIMARY KEY,
-                phash TEXT,
-                filename TEXT,
-                downloaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+def flush_db(save_dir=None):
+    """Wait until every queued image record is committed and its listeners have run."""
+    writer = _get_writer(save_dir, create=False)
+    if writer is None or writer.is_writer_thread() or not writer.has_pending():
+        return
+    writer.submit(lambda conn: None).result()
+
+
+@atexit.register
+def close_db():
+    """Flush and stop all database writers and close idle read connections."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.stop()
+    with _readers_lock:
+        readers = [conn for idle in _readers.values() for conn in idle]
+        _readers.clear()
+    for conn in readers:
+        conn.close()
+
+
+# Schema migrations, applied in order inside one transaction each. A step is an
+# SQL statement or a callable taking the connection (for data backfills).
+# PRAGMA user_version records how many have been applied.
+_MIGRATIONS = [
+    # 1: original layout
+    [
+        """
+        CREATE TABLE IF NOT EXISTS downloaded_images (
+            url TEXT PRIMARY KEY,
+            phash TEXT,
+            filename TEXT,
+            downloaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS archive_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS duplicate_members (
+            url TEXT PRIMARY KEY,
+            group_id INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_duplicate_members_group
+        ON duplicate_members (group_id)
+        """,
+    ],
+    # 2: per-image metadata, and indexes for the lookups made for every image
+    [
+        "ALTER TABLE downloaded_images ADD COLUMN sha256 TEXT",
+        "ALTER TABLE downloaded_images ADD COLUMN size INTEGER",
+        "ALTER TABLE downloaded_images ADD COLUMN width INTEGER",
+        "ALTER TABLE downloaded_images ADD COLUMN height INTEGER",
+        "ALTER TABLE downloaded_images ADD COLUMN api_ver INTEGER",
+        "ALTER TABLE downloaded_images ADD COLUMN locale TEXT",
+        "ALTER TABLE downloaded_images ADD COLUMN orientation TEXT",
+        "ALTER TABLE downloaded_images ADD COLUMN title TEXT",
+        "ALTER TABLE downloaded_images ADD COLUMN copyright TEXT",
+        """
+        CREATE INDEX IF NOT EXISTS idx_downloaded_images_filename
+        ON downloaded_images (filename)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_downloaded_images_phash
+        ON downloaded_images (phash)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_downloaded_images_sha256
+        ON downloaded_images (sha256)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_downloaded_images_locale
+        ON downloaded_images (locale)
+        """,
+    ],
+    # 3: canonical asset id (file name in the URL path), backfilled from the URLs
+    [
+        "ALTER TABLE downloaded_images ADD COLUMN asset_id TEXT",
+        lambda conn: conn.executemany(
+            "UPDATE downloaded_images SET asset_id = ? WHERE rowid = ?",
+            [
+                (asset_id(url), rowid)
+                for rowid, url in conn.execute("SELECT rowid, url FROM downloaded_images")
+            ],
+        ),
+        """
+        CREATE INDEX IF NOT EXISTS idx_downloaded_images_asset_id
+        ON downloaded_images (asset_id)
+        """,
+    ],
+    # 4: HTTP validators, for conditional requests when an asset is fetched again
+    [
+        "ALTER TABLE downloaded_images ADD COLUMN etag TEXT",
+        "ALTER TABLE downloaded_images ADD COLUMN last_modified TEXT",
+    ],
+    # 5: assets each locale's API responses contained, to learn locale equivalence
+    [
+        """
+        CREATE TABLE IF NOT EXISTS locale_assets (
+            api_ver INTEGER NOT NULL,
+            locale TEXT NOT NULL,
+            asset_id TEXT NOT NULL,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (api_ver, locale, asset_id)
+        ) WITHOUT ROWID
+        """,
+    ],
+    # 6: API calls and new images per locale, for the locale scheduler
+    [
         """
+        CREATE TABLE IF NOT EXISTS locale_stats (
+            api_ver INTEGER NOT NULL,
+            locale TEXT NOT NULL,
+            calls INTEGER NOT NULL DEFAULT 0,
+            new_images INTEGER NOT NULL DEFAULT 0,
+            last_call TIMESTAMP,
+            PRIMARY KEY (api_ver, locale)
         )
-    conn.commit()
+        """,
+    ],
+    # 7: when each locale last served an asset, so old observations age out
+    [
+        "ALTER TABLE locale_assets ADD COLUMN last_seen TIMESTAMP",
+        "UPDATE locale_assets SET last_seen = first_seen",
+    ],
+]
+SCHEMA_VERSION = len(_MIGRATIONS)
 
 
-def add_image_url_to_db(url, phash, filename, save_dir):
-    """Add a new image URL record to the database."""
-    conn = _get_connection(save_dir)
-    with closing(conn.cursor()) as cursor:
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO downloaded_images (url, phash, filename, downloaded_at)
-            VALUES (?, ?, ?, ?)
-        """,
-            (url, phash, filename, datetime.now()),
+def _migrate(conn):
+    """Bring the schema up to SCHEMA_VERSION. Returns the version found before."""
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version > SCHEMA_VERSION:
+        rprint(
+            f"⚠️ [yellow]The database schema (version {version}) is newer than this "
+            f"version of pyspotlightarchiver supports ({SCHEMA_VERSION}).[/yellow]"
         )
-    conn.commit()
+        return version
+    for number in range(version + 1, SCHEMA_VERSION + 1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in _MIGRATIONS[number - 1]:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    return version
+
+
+def init_db(save_dir):
+    """
+    Initialize the SQLite database (in WAL mode), creating it or upgrading an
+    existing archive in place to the current schema.
+    """
+    _run_write(save_dir, _migrate)
+
+
+def add_insert_listener(callback):
+    """
+    Register callback(save_dir, [(rowid, url, phash)], replaced_urls) to run
+    after image inserts; replaced_urls is the set of URLs that were already
+    recorded and got a new row.
+    """
+    if callback not in _insert_listeners:
+        _insert_listeners.append(callback)
+
+
+def add_image_url_to_db(url, phash, filename, save_dir, metadata=None):
+    """
+    Queue a new image URL record for the database writer. The record is visible
+    to get_image_url_from_db at once and is committed with the next batch.
+    metadata is an optional dict keyed by IMAGE_METADATA_COLUMNS.
+    """
+    metadata = metadata or {}
+    _get_writer(save_dir).add(
+        (url, phash, filename, datetime.now(), asset_id(url))
+        + tuple(metadata.get(column) for column in IMAGE_METADATA_COLUMNS)
+    )
 
 
 def get_image_url_from_db(url, save_dir):
     """Retrieve an image record by URL."""
-    conn = _get_connection(save_dir)
-    with closing(conn.cursor()) as cursor:
+    writer = _get_writer(save_dir, create=False)
+    record = writer.pending_record(url) if writer is not None else None
+    if record is not None:
+        return record
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
         cursor.execute(
             """
             SELECT url, phash, filename, downloaded_at
@@ -81,45 +546,441 @@ def get_image_url_from_db(url, save_dir):
         return cursor.fetchone()
 
 
-def get_image_filename_from_db(filename, save_dir):
-    """Retrieve an image by filename."""
-    conn = _get_connection(save_dir)
-    with closing(conn.cursor()) as cursor:
+def is_file_on_disk(filename, save_dir, api_ver=None):
+    """
+    Check if the image file exists on disk. Skips DB lookup — use when record is already confirmed.
+    Uses the save directory snapshot, so it makes no system call after the first check.
+    """
+    return is_saved_file(filename, api_ver, save_dir)
+
+
+def _get_seen_urls(save_dir, api_ver):
+    """
+    Return the in-memory set of archived asset ids for the database and api_ver,
+    loading it from the DB (rows whose file is on disk) on first use.
+    """
+    key = (get_db_path(save_dir), api_ver)
+    with _seen_urls_lock:
+        seen = _seen_urls.get(key)
+        if seen is None:
+            # Records still queued are found by get_archived_urls' lookup and are
+            # added by _on_images_added once committed
+            with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("SELECT asset_id, filename FROM downloaded_images")
+                seen = SeenURLSet(
+                    row_asset_id
+                    for row_asset_id, filename in cursor
+                    if row_asset_id
+                    and filename
+                    and is_file_on_disk(filename, save_dir, api_ver)
+                )
+            _seen_urls[key] = seen
+        return seen
+
+
+def _on_images_added(save_dir, rows, _replaced):
+    """Insert listener: mark newly recorded assets as archived in the loaded sets."""
+    db_path = get_db_path(save_dir)
+    with _seen_urls_lock:
+        sets = [seen for (path, _), seen in _seen_urls.items() if path == db_path]
+    for seen in sets:
+        for _, url, _ in rows:
+            seen.add(asset_id(url))
+
+
+add_insert_listener(_on_images_added)
+
+
+def get_seen_url_stats(save_dir, api_ver=None):
+    """Memory stats of the in-memory archived URL set, or None if it is not loaded."""
+    with _seen_urls_lock:
+        seen = _seen_urls.get((get_db_path(save_dir), api_ver))
+    return seen.memory_stats() if seen is not None else None
+
+
+def _select_by(cursor, column, values):
+    """Yield (asset_id, sha256, filename) of rows whose column is in values."""
+    values = list(values)
+    # Stay below SQLite's bound-parameter limit
+    for i in range(0, len(values), 500):
+        chunk = values[i : i + 500]
         cursor.execute(
-            """
-            SELECT filename
+            f"""
+            SELECT asset_id, sha256, filename
             FROM downloaded_images
-            WHERE filename = ?
+            WHERE {column} IN ({",".join("?" * len(chunk))})
             """,
-            (filename,),
+            chunk,
         )
-        return cursor.fetchone()
+        yield from cursor.fetchall()
 
 
-def is_image_filename_valid(filename, save_dir, api_ver=None):
-    """Check if the image filename is in the DB and the file exists on disk."""
-    record = get_image_filename_from_db(filename, save_dir)
+def get_archived_urls(urls, save_dir, api_ver=None, digests=None):
+    """
+    Returns the set of the given URLs whose asset is already archived: in the DB
+    (or queued for it) with its file on disk. Assets match by asset_id(url), so
+    other hosts or query strings for the same file count, and by the SHA-256 the
+    API announced (digests: {url: hex}), so identical bytes under another name count.
+    Assets in the in-memory set need no I/O; the rest are looked up with one query
+    per 500 ids or digests instead of one per URL.
+    """
+    digests = digests or {}
+    seen = _get_seen_urls(save_dir, api_ver)
+    urls = list(dict.fromkeys(urls))
+    ids = [asset_id(url) for url in urls]
+    archived = set()
+    remaining = {}
+    for url, key, hit in zip(urls, ids, seen.contains_many(ids)):
+        if hit:
+            archived.add(url)
+        else:
+            remaining[url] = key
+    if not remaining:
+        return archived
 
-    full_path = os.path.join(get_save_dir(api_ver, save_dir), filename)
-    return record is not None and os.path.exists(full_path)
+    known_ids = set()
+    known_digests = set()
+    writer = _get_writer(save_dir, create=False)
+    if writer is not None:
+        for record in writer.pending_records():
+            known_ids.add(record[_ASSET_ID_INDEX])
+            known_digests.add(record[_SHA256_INDEX])
+    wanted_digests = {digests[url] for url in remaining if digests.get(url)}
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+        rows = list(_select_by(cursor, "asset_id", set(remaining.values())))
+        rows += _select_by(cursor, "sha256", wanted_digests)
+    for row_asset_id, sha256, filename in rows:
+        if filename and is_file_on_disk(filename, save_dir, api_ver):
+            known_ids.add(row_asset_id)
+            known_digests.add(sha256)
+            seen.add(row_asset_id)
+    known_digests.discard(None)
+    for url, key in remaining.items():
+        if key in known_ids or digests.get(url) in known_digests:
+            archived.add(url)
+            seen.add(key)
+    return archived
 
 
-def is_file_on_disk(filename, save_dir, api_ver=None):
-    """Check if the image file exists on disk. Skips DB lookup — use when record is already confirmed."""
-    full_path = os.path.join(get_save_dir(api_ver, save_dir), filename)
-    return os.path.exists(full_path)
+def get_image_validators(url, save_dir):
+    """
+    Returns the HTTP validators stored for the asset of url, as a dict with
+    "etag", "last_modified" and "size", or None if there are none.
+    The most recently downloaded row for the asset wins.
+    """
+    key = asset_id(url)
+    writer = _get_writer(save_dir, create=False)
+    row = None
+    if writer is not None:
+        for record in writer.pending_records():
+            if record[_ASSET_ID_INDEX] == key:
+                row = tuple(
+                    record[_IMAGE_COLUMNS.index(column)]
+                    for column in ("etag", "last_modified", "size")
+                )
+    if row is None:
+        with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(
+                """
+                SELECT etag, last_modified, size
+                FROM downloaded_images
+                WHERE asset_id = ?
+                ORDER BY downloaded_at DESC
+                LIMIT 1
+                """,
+                (key,),
+            )
+            row = cursor.fetchone()
+    if row is None or not (row[0] or row[1]):
+        return None
+    return {"etag": row[0], "last_modified": row[1], "size": row[2]}
+
+
+def add_locale_assets(api_ver, locale, asset_ids, save_dir):
+    """
+    Queue the asset ids an API response for locale contained (does not wait).
+    The locale's assets not seen for LOCALE_ASSETS_MAX_AGE days are dropped,
+    so the table only holds recent observations.
+    """
+    rows = [(api_ver, locale, key) for key in set(asset_ids) if key]
+    if not rows:
+        return
+
+    def _write(conn):
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO locale_assets (api_ver, locale, asset_id, last_seen)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (api_ver, locale, asset_id)
+                DO UPDATE SET last_seen = excluded.last_seen
+                """,
+                rows,
+            )
+            conn.execute(
+                """
+                DELETE FROM locale_assets
+                WHERE api_ver = ? AND locale = ? AND last_seen < datetime('now', ?)
+                """,
+                (api_ver, locale, f"-{LOCALE_ASSETS_MAX_AGE} days"),
+            )
+
+    _get_writer(save_dir).submit(_write)
+
+
+def get_locale_assets(api_ver, save_dir):
+    """
+    Returns {locale: set of asset ids} seen in API responses for api_ver in the
+    last LOCALE_ASSETS_MAX_AGE days.
+    """
+    assets = {}
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+        cursor.execute(
+            """
+            SELECT locale, asset_id
+            FROM locale_assets
+            WHERE api_ver = ? AND last_seen >= datetime('now', ?)
+            """,
+            (api_ver, f"-{LOCALE_ASSETS_MAX_AGE} days"),
+        )
+        for locale, key in cursor:
+            assets.setdefault(locale, set()).add(key)
+    return assets
+
+
+def add_locale_stats(api_ver, results, save_dir):
+    """
+    Queue per-locale results for the locale_stats totals (does not wait).
+    results is {locale: (API calls, new images)}.
+    """
+    now = datetime.now()
+    rows = [
+        (api_ver, locale, calls, new_images, now)
+        for locale, (calls, new_images) in results.items()
+    ]
+    if not rows:
+        return
+
+    def _write(conn):
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO locale_stats (api_ver, locale, calls, new_images, last_call)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (api_ver, locale) DO UPDATE SET
+                    calls = calls + excluded.calls,
+                    new_images = new_images + excluded.new_images,
+                    last_call = excluded.last_call
+                """,
+                rows,
+            )
+
+    _get_writer(save_dir).submit(_write)
+
+
+def get_locale_stats(api_ver, save_dir):
+    """Returns {locale: (API calls, new images)} recorded for api_ver."""
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+        cursor.execute(
+            "SELECT locale, calls, new_images FROM locale_stats WHERE api_ver = ?",
+            (api_ver,),
+        )
+        return {locale: (calls, new_images) for locale, calls, new_images in cursor}
+
+
+def iter_image_files(save_dir):
+    """
+    Yields (url, phash, filename, api_ver) for every image in the DB.
+    """
+    flush_db(save_dir)
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+        cursor.execute(
+            """
+            SELECT url, phash, filename, api_ver
+            FROM downloaded_images
+            """
+        )
+        yield from cursor
 
 
-def get_all_images(save_dir):
+def update_image_phashes(updates, save_dir):
+    """Replace the phash of images, given [(url, phash)], in one transaction."""
+    updates = [(phash, url) for url, phash in updates]
+
+    def _write(conn):
+        with closing(conn.cursor()) as cursor:
+            cursor.executemany(
+                "UPDATE downloaded_images SET phash = ? WHERE url = ?", updates
+            )
+        conn.commit()
+
+    flush_db(save_dir)
+    _run_write(save_dir, _write)
+
+
+def iter_image_phashes(save_dir):
+    """
+    Yields (rowid, phash) for every image in the DB that has a phash.
+    """
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+        cursor.execute(
+            """
+            SELECT rowid, phash
+            FROM downloaded_images
+            WHERE phash IS NOT NULL
+            """
+        )
+        yield from cursor
+
+
+def get_phash_stats(save_dir):
     """
-    Returns a list of (url, phash, filename) for all images in the DB.
+    Returns (number of rows with a 16-digit phash, highest rowid) for index validation.
     """
-    conn = _get_connection(save_dir)
-    with closing(conn.cursor()) as cursor:
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
         cursor.execute(
             """
-            SELECT url, phash, filename
+            SELECT COUNT(CASE WHEN length(phash) = 16 THEN 1 END), MAX(rowid)
             FROM downloaded_images
             """
         )
-        return cursor.fetchall()
+        return cursor.fetchone()
+
+
+def get_images_by_rowids(rowids, save_dir):
+    """
+    Returns {rowid: (url, phash, filename)} for the given rowids.
+    """
+    rowids = list(rowids)
+    images = {}
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+        # Stay below SQLite's bound-parameter limit
+        for i in range(0, len(rowids), 500):
+            chunk = rowids[i : i + 500]
+            cursor.execute(
+                f"""
+                SELECT rowid, url, phash, filename
+                FROM downloaded_images
+                WHERE rowid IN ({",".join("?" * len(chunk))})
+                """,
+                chunk,
+            )
+            for rowid, url, phash, filename in cursor:
+                images[rowid] = (url, phash, filename)
+    return images
+
+
+def get_meta(key, save_dir, default=None):
+    """Read a value from the archive_meta table."""
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+        cursor.execute("SELECT value FROM archive_meta WHERE key = ?", (key,))
+        row = cursor.fetchone()
+    return row[0] if row else default
+
+
+def set_meta(key, value, save_dir):
+    """Write a value to the archive_meta table."""
+
+    def _write(conn):
+        with closing(conn.cursor()) as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO archive_meta (key, value) VALUES (?, ?)",
+                (key, str(value)),
+            )
+        conn.commit()
+
+    _run_write(save_dir, _write)
+
+
+def merge_duplicate_group(urls, save_dir):
+    """
+    Put the given URLs in one duplicate group, merging any groups they already
+    belong to. Returns True if group membership changed.
+    """
+    urls = list(dict.fromkeys(urls))
+
+    def _write(conn):
+        with closing(conn.cursor()) as cursor:
+            cursor.execute(
+                f"""
+                SELECT url, group_id
+                FROM duplicate_members
+                WHERE url IN ({",".join("?" * len(urls))})
+                """,
+                urls,
+            )
+            current = dict(cursor.fetchall())
+            group_ids = set(current.values())
+            if len(current) == len(urls) and len(group_ids) == 1:
+                return False
+            if group_ids:
+                group_id = min(group_ids)
+            else:
+                cursor.execute(
+                    "SELECT COALESCE(MAX(group_id), 0) + 1 FROM duplicate_members"
+                )
+                group_id = cursor.fetchone()[0]
+            others = sorted(group_ids - {group_id})
+            if others:
+                cursor.execute(
+                    f"""
+                    UPDATE duplicate_members SET group_id = ?
+                    WHERE group_id IN ({",".join("?" * len(others))})
+                    """,
+                    [group_id, *others],
+                )
+            cursor.executemany(
+                "INSERT OR REPLACE INTO duplicate_members (url, group_id) VALUES (?, ?)",
+                [(url, group_id) for url in urls],
+            )
+        conn.commit()
+        return True
+
+    return _run_write(save_dir, _write)
+
+
+def replace_duplicate_groups(groups, save_dir):
+    """Replace all duplicate groups with the given lists of URLs."""
+
+    def _write(conn):
+        with closing(conn.cursor()) as cursor:
+            cursor.execute("DELETE FROM duplicate_members")
+            cursor.executemany(
+                "INSERT OR REPLACE INTO duplicate_members (url, group_id) VALUES (?, ?)",
+                (
+                    (url, group_id)
+                    for group_id, urls in enumerate(groups, start=1)
+                    for url in urls
+                ),
+            )
+        conn.commit()
+
+    _run_write(save_dir, _write)
+
+
+def iter_duplicate_groups(save_dir):
+    """
+    Yields one list of (url, phash, filename) per duplicate group that still has
+    two or more images, streaming rows from SQLite one group at a time.
+    """
+    flush_db(save_dir)
+    with _get_connection(save_dir) as conn, closing(conn.cursor()) as cursor:
+        cursor.execute(
+            """
+            SELECT m.group_id, d.url, d.phash, d.filename
+            FROM duplicate_members AS m
+            JOIN downloaded_images AS d ON d.url = m.url
+            ORDER BY m.group_id, d.rowid
+            """
+        )
+        group_id = None
+        items = []
+        for row_group_id, url, phash, filename in cursor:
+            if row_group_id != group_id:
+                if len(items) > 1:
+                    yield items
+                group_id = row_group_id
+                items = []
+            items.append((url, phash, filename))
+        if len(items) > 1:
+            yield items
@@ -1,18 +1,76 @@
 """Module for downloading images from API"""
 
+import hashlib
 import os
 import threading
+import time
+from urllib.parse import urlsplit
 import requests
 from rich import print as rprint
 
-_thread_local = threading.local()
+from pyspotlightarchiver.helpers.circuit_breaker import get_circuit_breaker
+from pyspotlightarchiver.helpers.http_client import get_session
+from pyspotlightarchiver.helpers.rate_limiter import (
+    get_rate_limiter,
+    parse_retry_after,
+)
 
+# Bytes read from the socket per write; bounds per-worker memory regardless of image size
+CHUNK_SIZE = 64 * 1024
 
-def _get_session():
-    """Return a per-thread requests.Session (creates one if needed)."""
-    if not hasattr(_thread_local, "session"):
-        _thread_local.session = requests.Session()
-    return _thread_local.session
+# Save directories already created, so get_save_dir skips os.makedirs
+_created_dirs = set()
+# File names in each save directory: listed once per run with os.scandir and
+# updated as images are written, so "is it on disk?" needs no system call
+_dir_snapshots = {}
+_dir_snapshots_lock = threading.Lock()
+
+
+def _http_request(method, url, **kwargs):
+    """
+    Send a request through the shared per-host rate limiter and circuit breaker.
+    The response status and latency are fed back so the limiter can adapt, and
+    transport errors and 5xx responses count as failures of the host.
+    """
+    breaker = get_circuit_breaker(url)
+    limiter = get_rate_limiter(url)
+    trial = breaker.before_request()
+    try:
+        limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = get_session().request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            # Treat transport failures like a throttle signal
+            limiter.record(503, time.monotonic() - start)
+            breaker.record_failure()
+            trial = False
+            raise
+    except BaseException:
+        # Any other error says nothing about the host: let another request try
+        if trial:
+            breaker.release_trial()
+        raise
+    limiter.record(
+        response.status_code,
+        time.monotonic() - start,
+        parse_retry_after(response.headers.get("Retry-After")),
+    )
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def http_get(url, **kwargs):
+    """GET a URL through the shared per-host rate limiter."""
+    return _http_request("GET", url, **kwargs)
+
+
+def http_head(url, **kwargs):
+    """HEAD a URL through the shared per-host rate limiter."""
+    return _http_request("HEAD", url, **kwargs)
 
 
 def get_save_dir(api_ver, save_dir=None):
@@ -29,10 +87,53 @@ def get_save_dir(api_ver, save_dir=None):
         save_dir = os.path.join(base_dir, "4K")
     else:
         save_dir = base_dir
-    os.makedirs(save_dir, exist_ok=True)
+    if save_dir not in _created_dirs:
+        os.makedirs(save_dir, exist_ok=True)
+        _created_dirs.add(save_dir)
     return save_dir
 
 
+def _get_dir_snapshot(directory):
+    """Return the cached set of file names in directory, listing it on first use."""
+    with _dir_snapshots_lock:
+        names = _dir_snapshots.get(directory)
+        if names is None:
+            with os.scandir(directory) as it:
+                names = {entry.name for entry in it if entry.is_file()}
+            _dir_snapshots[directory] = names
+        return names
+
+
+def is_saved_file(filename, api_ver, save_dir=None):
+    """Check if filename exists in the save directory, using the directory snapshot."""
+    directory = get_save_dir(api_ver, save_dir)
+    return filename in _get_dir_snapshot(directory)
+
+
+def refresh_saved_files():
+    """Drop the directory snapshots so the next check lists the directories again."""
+    with _dir_snapshots_lock:
+        _dir_snapshots.clear()
+    _created_dirs.clear()
+
+
+def _note_saved_file(path):
+    """Add a newly written file to its directory's snapshot, if one was taken."""
+    with _dir_snapshots_lock:
+        names = _dir_snapshots.get(os.path.dirname(path))
+        if names is not None:
+            names.add(os.path.basename(path))
+
+
+def asset_id(url):
+    """
+    Canonical identity of the image behind a URL: the file name in its path.
+    It ignores the host, query string and fragment, so the same asset served to
+    several locales or with other parameters has one id.
+    """
+    return os.path.basename(urlsplit(url).path)
+
+
 def ensure_jpg_extension(filename):
     """Ensure the filename ends with .jpg"""
     if not filename.lower().endswith(".jpg"):
@@ -40,40 +141,183 @@ def ensure_jpg_extension(filename):
     return filename
 
 
-def download_image(url, save_dir=None, api_ver=None):
+def _stream_to_file(response, save_file):
     """
-    Download an image from the given URL using a cached session.
-    If save_path is provided, saves the image to disk and returns the path.
-    Otherwise, saves to the appropriate folder based on api_ver.
-    Returns the image file path.
+    Stream a response body into save_file without buffering it in memory.
+    The body goes to a hidden temp file in the same directory, which is renamed
+    over save_file only once complete, so a crash never leaves a truncated image.
+    Returns (sha256 hex digest, byte count).
+    """
+    # Unique per process/thread; opened like a normal file so the umask applies
+    temp_path = os.path.join(
+        os.path.dirname(save_file),
+        f".{os.path.basename(save_file)}.{os.getpid()}-{threading.get_ident()}.part",
+    )
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(temp_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+        expected = response.headers.get("Content-Length")
+        if (
+            expected
+            and expected.isdigit()
+            and not response.headers.get("Content-Encoding")
+            and int(expected) != size
+        ):
+            raise requests.exceptions.ChunkedEncodingError(
+                f"Incomplete download: got {size} of {expected} bytes"
+            )
+        os.replace(temp_path, save_file)
+        _note_saved_file(save_file)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return digest.hexdigest(), size
+
+
+def _hash_file(path):
+    """Return (sha256 hex digest, byte count) of a file on disk."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _validator_headers(validators, local_size):
+    """Conditional request headers from stored validators that still describe the local file."""
+    if not validators or validators.get("size") not in (None, local_size):
+        return {}
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def _same_length(response, local_size):
+    length = response.headers.get("Content-Length")
+    return (
+        response.ok
+        and not response.headers.get("Content-Encoding")
+        and length is not None
+        and length.isdigit()
+        and int(length) == local_size
+    )
+
+
+def _reuse_local_file(url, save_file, response, expected_sha256):
+    """
+    Build the download info from the file already on disk, after the server
+    confirmed it matches. Returns None if it contradicts the announced digest.
+    """
+    sha256, size = _hash_file(save_file)
+    if expected_sha256 and expected_sha256 != sha256:
+        return None
+    _note_saved_file(save_file)
+    rprint(
+        f"♻️ [gray]Unchanged on the server, kept the local file:[/gray] "
+        f"{os.path.basename(save_file)}"
+    )
+    return {
+        "url": url,
+        "path": save_file,
+        "sha256": sha256,
+        "size": size,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "reused": True,
+    }
+
+
+def download_image_info(
+    url, save_dir=None, api_ver=None, expected_sha256=None, validators=None
+):
+    """
+    Stream an image from the given URL to disk.
+    Saves to the appropriate folder based on api_ver, named after asset_id(url).
+    If expected_sha256 (from the API payload) is given, a mismatch is reported.
+
+    When the file is already on disk, the transfer is skipped if the server
+    confirms it is unchanged: a conditional GET with the stored validators
+    ({"etag", "last_modified", "size"}) or, without any, a HEAD whose
+    Content-Length equals the local size.
+
+    Returns a dict with "url", "path", "sha256" (hex), "size" (bytes), "etag",
+    "last_modified" and "reused" (True if the local file was kept).
     """
-    response = _get_session().get(url, timeout=10)
-    response.raise_for_status()
     save_dir = get_save_dir(api_ver, save_dir)
-    filename = os.path.basename(url.split("?")[0])
-    save_file = os.path.join(save_dir, ensure_jpg_extension(filename))
-    with open(save_file, "wb") as f:
-        f.write(response.content)
-    return save_file
+    save_file = os.path.join(save_dir, ensure_jpg_extension(asset_id(url)))
+    headers = {}
+    if os.path.isfile(save_file):
+        local_size = os.path.getsize(save_file)
+        headers = _validator_headers(validators, local_size)
+        if not headers:
+            head = http_head(url, timeout=10, allow_redirects=True)
+            if _same_length(head, local_size):
+                info = _reuse_local_file(url, save_file, head, expected_sha256)
+                if info:
+                    return info
 
+    response = http_get(url, timeout=10, stream=True, headers=headers)
+    if response.status_code == 304:
+        # Reading the (empty) body hands the connection back to the pool
+        _ = response.content
+        response.close()
+        info = _reuse_local_file(url, save_file, response, expected_sha256)
+        if info:
+            return info
+        # The local copy contradicts the announced digest; fetch unconditionally
+        response = http_get(url, timeout=10, stream=True)
+    with response:
+        response.raise_for_status()
+        sha256, size = _stream_to_file(response, save_file)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+    if expected_sha256 and expected_sha256 != sha256:
+        rprint(
+            f"⚠️ [yellow]Checksum mismatch for {os.path.basename(save_file)}: "
+            f"the API announced {expected_sha256}, got {sha256}[/yellow]"
+        )
+    return {
+        "url": url,
+        "path": save_file,
+        "sha256": sha256,
+        "size": size,
+        "etag": etag,
+        "last_modified": last_modified,
+        "reused": False,
+    }
 
-def download_images(entry, orientation="landscape", save_dir=None, api_ver=None):
+
+def image_metadata(info, entry, api_ver, locale, orientation, dimensions=(None, None)):
     """
-    Download images from a v3/v4 entry dict.
-    Supports both single and dual (landscape/portrait) URLs.
-    If save_dir is provided, saves images to that directory.
-    Otherwise, saves to the appropriate folder based on api_ver.
-    Returns a dict with file paths.
+    Build the per-image DB metadata for a file downloaded with download_image_info.
+    entry is the SpotlightEntry the URL came from; dimensions is the (width, height)
+    of the saved image.
     """
-    results = {}
     if orientation == "both":
-        for key in ["image_url_landscape", "image_url_portrait"]:
-            url = entry.get(key)
-            if url:
-                results[url] = download_image(url, save_dir, api_ver)
-    else:
-        url = entry.get("image_url")
-        if url:
-            results[url] = download_image(url, save_dir, api_ver)
-            rprint(f"✅ [green]Image saved:[/green] {os.path.basename(results[url])}")
-    return results
+        orientation = entry.orientation_of(info["url"])
+    width, height = dimensions
+    return {
+        "sha256": info["sha256"],
+        "size": info["size"],
+        "width": width,
+        "height": height,
+        "api_ver": api_ver,
+        "locale": locale,
+        "orientation": orientation,
+        "title": entry.title,
+        "copyright": entry.copyright_text,
+        "etag": info.get("etag"),
+        "last_modified": info.get("last_modified"),
+    }
@@ -0,0 +1,91 @@
+"""HTTP sessions whose keep-alive connections every worker thread shares."""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+from pyspotlightarchiver.defaults import HTTP_POOL_HOSTS, HTTP_POOL_SIZE
+
+# {prefix: HTTPAdapter} mounted on every thread's session
+_adapters = None
+# Bumped when the adapters are replaced, so sessions remount them
+_generation = 0
+_pool_size = HTTP_POOL_SIZE
+_session_lock = threading.Lock()
+_local = threading.local()
+
+
+def _new_adapters(pool_size):
+    return {
+        prefix: HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=pool_size)
+        for prefix in ("https://", "http://")
+    }
+
+
+def get_session():
+    """
+    Return the calling thread's requests.Session (created on first use).
+    requests does not promise that a Session is thread-safe (its cookies and
+    settings are shared mutable state), so each thread gets its own, but they
+    all mount the same adapters: urllib3's connection pools are thread-safe,
+    so thread pools created per locale or per entry all reuse the same warm
+    connections instead of opening their own.
+    """
+    global _adapters  # pylint: disable=global-statement
+    session = getattr(_local, "session", None)
+    with _session_lock:
+        if _adapters is None:
+            _adapters = _new_adapters(_pool_size)
+        if session is None or _local.generation != _generation:
+            if session is None:
+                session = _local.session = requests.Session()
+            for prefix, adapter in _adapters.items():
+                session.mount(prefix, adapter)
+            _local.generation = _generation
+    return session
+
+
+def set_http_pool_size(size):
+    """Keep up to size idle connections per host (at least 1)."""
+    global _adapters, _generation, _pool_size  # pylint: disable=global-statement
+    size = max(1, size)
+    with _session_lock:
+        if size == _pool_size:
+            return
+        _pool_size = size
+        if _adapters is not None:
+            # Connections of the replaced adapters are closed with them
+            for adapter in _adapters.values():
+                adapter.close()
+            _adapters = _new_adapters(size)
+            _generation += 1
+
+
+def get_connection_stats():
+    """
+    Return {"requests", "connections"}: requests sent through the shared
+    adapters and connections opened for them, over the pools still held.
+    """
+    stats = {"requests": 0, "connections": 0}
+    with _session_lock:
+        adapters = list(_adapters.values()) if _adapters is not None else []
+    for adapter in adapters:
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                stats["requests"] += pool.num_requests
+                stats["connections"] += pool.num_connections
+    return stats
+
+
+def format_connection_stats():
+    """One-line human readable summary of connection reuse."""
+    stats = get_connection_stats()
+    if not stats["requests"]:
+        return "no requests yet"
+    reused = 1 - stats["connections"] / stats["requests"]
+    return (
+        f"{stats['requests']} request(s) over {stats['connections']} "
+        f"connection(s) ({reused:.0%} reused)"
+    )
@@ -1,13 +1,195 @@
-"""Helper for computing perceptual hash (phash) of images using imagededup."""
+"""Helper for computing perceptual hash (phash) of images."""
 
-from imagededup.methods import PHash
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+import numpy as np
+from PIL import Image
+from rich import print as rprint
 
-# Create a single PHash instance for reuse
-_phasher = PHash()
+from pyspotlightarchiver.defaults import (
+    DEFAULT_HASH_WORKERS,
+    DEFAULT_PHASH_BACKEND,
+    PHASH_BACKENDS,
+)
+
+# Same pipeline as imagededup's PHash: resize to 32x32 grayscale, take the 2D
+# DCT-II, keep the top-left 8x8 coefficients and threshold them at the median
+# of all but the DC term. Hashes are 16 hex characters in both backends.
+_HASH_SIZE = 32
+_COEF_SIZE = 8
+
+# Rows of the (unnormalized) DCT-II basis for the kept coefficients; scaling
+# does not change which coefficients are above the median
+_k = np.arange(_HASH_SIZE)
+_DCT = np.cos(np.pi * (2 * _k[None, :] + 1) * _k[:_COEF_SIZE, None] / (2 * _HASH_SIZE))
+
+_phash_backend = DEFAULT_PHASH_BACKEND
+_phasher = None
+
+# Paths handed to a pool worker at once by compute_phashes
+_CHUNK_SIZE = 8
+
+_hash_workers = DEFAULT_HASH_WORKERS
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+
+def set_phash_backend(backend):
+    """
+    Select how phashes are computed:
+    'builtin' (Pillow + NumPy, JPEGs decoded at reduced scale),
+    'exact' (Pillow + NumPy, full decode, identical to imagededup) or 'imagededup'.
+    """
+    global _phash_backend  # pylint: disable=global-statement
+    if backend not in PHASH_BACKENDS:
+        raise ValueError(f"Unknown phash backend '{backend}'")
+    if backend == "imagededup":
+        _get_phasher()  # fail early if imagededup is not installed
+    _phash_backend = backend
+
+
+def set_hash_workers(workers):
+    """
+    Compute phashes in a pool of workers processes, so hashing is not limited
+    by the GIL (0 computes them in the calling thread).
+    """
+    global _hash_workers  # pylint: disable=global-statement
+    if workers < 0:
+        raise ValueError("The number of hash workers cannot be negative")
+    shutdown_hash_pool()
+    _hash_workers = workers
+
+
+def get_hash_workers():
+    """Number of phash worker processes (0 when hashing in the calling thread)."""
+    return _hash_workers
+
+
+def _get_hash_pool():
+    """Start the phash worker processes on first use."""
+    global _hash_pool  # pylint: disable=global-statement
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # spawn, as on Windows: forking a process that runs download and
+            # database threads could copy a lock one of them holds
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=_hash_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_pool
+
+
+def shutdown_hash_pool():
+    """Stop the phash worker processes, if any were started."""
+    global _hash_pool  # pylint: disable=global-statement
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=True)
+            _hash_pool = None
+
+
+atexit.register(shutdown_hash_pool)
+
+
+def _disable_hash_pool(exc):
+    """Stop using worker processes after the pool broke; later phashes are computed in-process."""
+    global _hash_workers, _hash_pool  # pylint: disable=global-statement
+    with _hash_pool_lock:
+        if _hash_workers:
+            rprint(
+                f"⚠️ [yellow]phash worker processes failed ({exc}), hashing in this process instead[/yellow]"
+            )
+            _hash_workers = 0
+        pool, _hash_pool = _hash_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_phasher():
+    """Create the shared PHash instance on first use (imagededup is slow to import)."""
+    global _phasher  # pylint: disable=global-statement
+    if _phasher is None:
+        try:
+            # pylint: disable=import-outside-toplevel
+            from imagededup.methods import PHash
+        except ImportError as e:
+            raise ImportError(
+                "The 'imagededup' phash backend requires imagededup "
+                "(pip install imagededup)"
+            ) from e
+
+        _phasher = PHash()
+    return _phasher
+
+
+def _load_pixels(image_path, draft):
+    """Load the image as a 32x32 grayscale float array, the way imagededup does."""
+    with Image.open(image_path) as img:
+        if draft and img.format == "JPEG":
+            # libjpeg decodes at 1/2, 1/4 or 1/8 scale, never below the requested size
+            img.draft("RGB", (_HASH_SIZE, _HASH_SIZE))
+        if img.mode != "RGB":
+            img = img.convert("RGBA").convert("RGB")
+        small = img.resize((_HASH_SIZE, _HASH_SIZE), Image.LANCZOS).convert("L")
+    return np.asarray(small, dtype=np.float64)
+
+
+def phash_from_pixels(pixels):
+    """Compute the 16-character hex phash of a 32x32 grayscale array."""
+    coefs = (_DCT @ pixels @ _DCT.T).ravel()
+    bits = coefs >= np.median(coefs[1:])
+    return np.packbits(bits).tobytes().hex()
+
+
+def get_image_size(image_path):
+    """Return (width, height) read from the image header, or (None, None) if unreadable."""
+    try:
+        with Image.open(image_path) as img:
+            return img.size
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None, None
+
+
+def _phash_file(image_path, backend):
+    """Compute the phash of an image file with the given backend (runs in pool workers too)."""
+    if backend == "imagededup":
+        return _get_phasher().encode_image(image_file=image_path)
+    try:
+        pixels = _load_pixels(image_path, draft=backend == "builtin")
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    return phash_from_pixels(pixels)
 
 
 def compute_phash(image_path):
     """
-    Compute the perceptual hash (phash) of an image file.
+    Compute the perceptual hash (phash) of an image file, in a worker process
+    when set_hash_workers enabled them. Returns None if the image cannot be read.
     """
-    return _phasher.encode_image(image_file=image_path)
+    if _hash_workers:
+        try:
+            return _get_hash_pool().submit(_phash_file, image_path, _phash_backend).result()
+        except (BrokenProcessPool, OSError) as exc:
+            _disable_hash_pool(exc)
+    return _phash_file(image_path, _phash_backend)
+
+
+def compute_phashes(image_paths):
+    """Yield the phash of every image file in order, spread over the worker processes if any."""
+    image_paths = list(image_paths)
+    done = 0
+    if _hash_workers:
+        try:
+            for phash in _get_hash_pool().map(
+                _phash_file, image_paths, repeat(_phash_backend), chunksize=_CHUNK_SIZE
+            ):
+                yield phash
+                done += 1
+        except (BrokenProcessPool, OSError) as exc:
+            _disable_hash_pool(exc)
+    for image_path in image_paths[done:]:
+        yield _phash_file(image_path, _phash_backend)
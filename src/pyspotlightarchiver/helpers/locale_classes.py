@@ -0,0 +1,91 @@
+"""Equivalence classes of locales that are served the same Spotlight image pool."""
+
+import random
+from rich import print as rprint
+
+from pyspotlightarchiver.defaults import (
+    LOCALE_MIN_ASSETS,
+    LOCALE_MIN_OVERLAP,
+    LOCALE_RECHECK_RATE,
+)
+from pyspotlightarchiver.helpers.download_db import (
+    add_locale_assets,
+    get_locale_assets,
+)
+from pyspotlightarchiver.helpers.download_helper import asset_id
+
+
+def record_locale_entries(api_ver, locale, entries, orientation, save_dir):
+    """Store the assets an API response for locale contained."""
+    add_locale_assets(
+        api_ver,
+        locale,
+        [asset_id(url) for entry in entries for _, url in entry.urls(orientation)],
+        save_dir,
+    )
+
+
+def overlap(assets_a, assets_b):
+    """Shared assets over the size of the smaller set (0.0 if either is empty)."""
+    if not assets_a or not assets_b:
+        return 0.0
+    return len(assets_a & assets_b) / min(len(assets_a), len(assets_b))
+
+
+def get_locale_classes(api_ver, save_dir, locales=None):
+    """
+    Group locales whose API responses overlap by at least LOCALE_MIN_OVERLAP.
+    Locales are taken from the most to the least observed; each joins the first
+    class whose representative (its first member) it overlaps, so classes do not
+    chain through loosely related locales. Locales with fewer than
+    LOCALE_MIN_ASSETS observed assets are left out.
+    Returns a list of classes (lists of locales, representative first).
+    """
+    assets = get_locale_assets(api_ver, save_dir)
+    candidates = [
+        locale
+        for locale in (assets if locales is None else locales)
+        if len(assets.get(locale, ())) >= LOCALE_MIN_ASSETS
+    ]
+    candidates.sort(key=lambda locale: (-len(assets[locale]), locale))
+    classes = []
+    for locale in candidates:
+        for members in classes:
+            if overlap(assets[members[0]], assets[locale]) >= LOCALE_MIN_OVERLAP:
+                members.append(locale)
+                break
+        else:
+            classes.append([locale])
+    return classes
+
+
+def plan_locale_sweep(locales, api_ver, save_dir, recheck_rate=LOCALE_RECHECK_RATE):
+    """
+    Choose the locales to query in one sweep over locales: every representative
+    and every locale not classified yet, plus each other class member with
+    probability recheck_rate, so changes in the pools are still noticed.
+    Returns (locales to query, in the given order, number of classes that
+    group several locales).
+    """
+    classes = get_locale_classes(api_ver, save_dir, locales)
+    skipped = {
+        locale
+        for members in classes
+        for locale in members[1:]
+        if random.random() >= recheck_rate
+    }
+    shared = sum(1 for members in classes if len(members) > 1)
+    return [locale for locale in locales if locale not in skipped], shared
+
+
+def sweep_locales(all_locales, api_ver, save_dir, every_locale=False, verbose=False):
+    """Locales to query in one --locale all sweep (see plan_locale_sweep)."""
+    if every_locale:
+        return all_locales
+    locales, shared = plan_locale_sweep(all_locales, api_ver, save_dir)
+    if verbose and len(locales) < len(all_locales):
+        rprint(
+            f"ℹ️ [gray]LOG: [sweep_locales]Querying {len(locales)} of "
+            f"{len(all_locales)} locales ({shared} classes of equivalent locales)[/gray]"
+        )
+    return locales
@@ -0,0 +1,83 @@
+"""Yield-aware choice of the locales queried in each round of the download loop."""
+
+import random
+
+from pyspotlightarchiver.defaults import (
+    LOCALE_EXPLORE_RATE,
+    LOCALE_ROUND_SIZE,
+    LOCALE_STATS_WINDOW,
+)
+from pyspotlightarchiver.helpers.download_db import add_locale_stats, get_locale_stats
+
+# Gamma(shape, rate) prior on a locale's new images per call: mean 1, so locales
+# without history look promising until they have been tried
+PRIOR_SHAPE = 1.0
+PRIOR_RATE = 1.0
+
+
+class LocaleScheduler:
+    """
+    Thompson sampling over locales. Each locale's new images per API call is
+    modelled as a Poisson rate with a Gamma posterior; every round a rate is
+    drawn per locale and the highest draws are queried. Only the last
+    LOCALE_STATS_WINDOW calls' worth of history is trusted, so locales whose
+    pool changes are picked up again, and each slot goes to a random locale
+    with probability explore_rate so idle locales are still visited.
+    """
+
+    def __init__(
+        self,
+        api_ver,
+        save_dir=None,
+        round_size=LOCALE_ROUND_SIZE,
+        explore_rate=LOCALE_EXPLORE_RATE,
+        window=LOCALE_STATS_WINDOW,
+    ):
+        self.api_ver = api_ver
+        self.save_dir = save_dir
+        self.round_size = round_size
+        self.explore_rate = explore_rate
+        self.window = window
+        self._stats = get_locale_stats(api_ver, save_dir)
+        self.calls = 0
+        self.new_images = 0
+
+    def _draw(self, locale):
+        calls, new_images = self._stats.get(locale, (0, 0))
+        if calls > self.window:
+            new_images = new_images * self.window / calls
+            calls = self.window
+        return random.gammavariate(PRIOR_SHAPE + new_images, 1 / (PRIOR_RATE + calls))
+
+    def choose(self, locales):
+        """Pick up to round_size of locales for the next round."""
+        draws = {locale: self._draw(locale) for locale in locales}
+        ranked = sorted(locales, key=draws.__getitem__, reverse=True)
+        chosen = ranked[: self.round_size]
+        rest = ranked[self.round_size :]
+        random.shuffle(rest)
+        for i in range(len(chosen)):
+            if rest and random.random() < self.explore_rate:
+                chosen[i] = rest.pop()
+        return chosen
+
+    def update(self, results):
+        """Record a round's {locale: new images} (one API call each)."""
+        for locale, new_images in results.items():
+            calls, total = self._stats.get(locale, (0, 0))
+            self._stats[locale] = (calls + 1, total + new_images)
+            self.calls += 1
+            self.new_images += new_images
+        add_locale_stats(
+            self.api_ver,
+            {locale: (1, new_images) for locale, new_images in results.items()},
+            self.save_dir,
+        )
+
+    def format_yield(self):
+        """One-line summary of this run's new images per API call."""
+        rate = self.new_images / self.calls if self.calls else 0.0
+        return (
+            f"{self.new_images} new image(s) in {self.calls} locale call(s) "
+            f"({rate:.2f} per call)"
+        )
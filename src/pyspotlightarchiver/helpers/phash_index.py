@@ -0,0 +1,224 @@
+"""Near-duplicate search over perceptual hashes packed as 64-bit integers."""
+
+import os
+import numpy as np
+
+from pyspotlightarchiver.defaults import DEFAULT_PHASH_THRESHOLD
+from pyspotlightarchiver.helpers.download_db import (
+    get_db_path,
+    get_phash_stats,
+    iter_image_phashes,
+)
+
+PHASH_INDEX_FILENAME = "phash_index.npy"
+
+# One record per DB row: the row's SQLite rowid and its packed 64-bit phash
+INDEX_DTYPE = np.dtype([("rowid", "<i8"), ("phash", "<u8")])
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+# Rows compared at once by query_batch; bounds the temporary distance matrix
+_QUERY_BLOCK = 256
+
+
+def phash_to_int(phash):
+    """Convert a 16-character hex phash string to an int. Returns None if invalid."""
+    if not phash or len(phash) != 16:
+        return None
+    try:
+        return int(phash, 16)
+    except ValueError:
+        return None
+
+
+def int_to_phash(value):
+    """Convert a packed phash back to its 16-character hex string."""
+    return f"{int(value):016x}"
+
+
+def popcount(values):
+    """Count set bits of every element of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    return (
+        _POPCOUNT8[values.view(np.uint8)]
+        .reshape(values.shape + (8,))
+        .sum(axis=-1, dtype=np.uint8)
+    )
+
+
+def _band_edges(max_distance):
+    """Split 64 bits into max_distance + 1 bands (pigeonhole principle)."""
+    bands = max_distance + 1
+    return [(64 * i) // bands for i in range(bands + 1)]
+
+
+class PHashIndex:
+    """
+    Array of (rowid, phash) records supporting Hamming-distance queries.
+    The array may be a read-only memory map; appends switch to an in-memory copy.
+    """
+
+    def __init__(self, records=None):
+        if records is None:
+            records = np.empty(0, dtype=INDEX_DTYPE)
+        self._records = records
+        self._size = len(records)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def rowids(self):
+        """Row ids of the indexed rows."""
+        return self._records["rowid"][: self._size]
+
+    @property
+    def hashes(self):
+        """Packed phashes of the indexed rows."""
+        return self._records["phash"][: self._size]
+
+    def append(self, rowid, phash):
+        """Add one row; phash may be a hex string or an int. Returns False if invalid."""
+        value = phash_to_int(phash) if isinstance(phash, str) else phash
+        if value is None:
+            return False
+        if self._size == len(self._records) or not self._records.flags.writeable:
+            grown = np.empty(max(16, self._size * 2), dtype=INDEX_DTYPE)
+            grown[: self._size] = self._records[: self._size]
+            self._records = grown
+        self._records[self._size] = (rowid, value)
+        self._size += 1
+        return True
+
+    def query(self, phash, max_distance=DEFAULT_PHASH_THRESHOLD):
+        """Return [(rowid, distance)] of rows within max_distance of phash, nearest first."""
+        return self.query_batch([phash], max_distance)[0]
+
+    def query_batch(self, phashes, max_distance=DEFAULT_PHASH_THRESHOLD):
+        """Vectorized query of many phashes. Returns one [(rowid, distance)] list per input."""
+        values = [phash_to_int(p) if isinstance(p, str) else p for p in phashes]
+        results = [[] for _ in values]
+        valid = [i for i, v in enumerate(values) if v is not None]
+        if not valid or not self._size:
+            return results
+        hashes = self.hashes
+        rowids = self.rowids
+        queries = np.array([values[i] for i in valid], dtype=np.uint64)
+        for start in range(0, len(queries), _QUERY_BLOCK):
+            block = queries[start : start + _QUERY_BLOCK]
+            distances = popcount(np.bitwise_xor(block[:, None], hashes[None, :]))
+            for offset, row in enumerate(distances):
+                hits = np.nonzero(row <= max_distance)[0]
+                hits = hits[np.argsort(row[hits], kind="stable")]
+                results[valid[start + offset]] = [
+                    (int(rowids[h]), int(row[h])) for h in hits
+                ]
+        return results
+
+    def near_duplicate_groups(self, max_distance=DEFAULT_PHASH_THRESHOLD):
+        """
+        Group rows whose phashes are within max_distance of each other (transitively).
+        Returns a list of rowid lists, one per group of two or more rows.
+        """
+        hashes = self.hashes
+        rowids = self.rowids
+        parent = {}
+
+        def find(i):
+            root = i
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while i != root:
+                parent[i], i = root, parent[i]
+            return root
+
+        def union_pairs(left, right):
+            distances = popcount(
+                np.bitwise_xor(hashes[left][:, None], hashes[right][None, :])
+            )
+            for li, ri in zip(*np.nonzero(distances <= max_distance)):
+                ra, rb = find(int(left[li])), find(int(right[ri]))
+                if ra != rb:
+                    parent.setdefault(ra, ra)
+                    parent.setdefault(rb, rb)
+                    parent[max(ra, rb)] = min(ra, rb)
+
+        def union_bucket(members):
+            for i in range(0, len(members), _QUERY_BLOCK):
+                union_pairs(members[i : i + _QUERY_BLOCK], members[i:])
+
+        if max_distance >= 63:
+            union_bucket(np.arange(len(hashes)))
+        else:
+            # Rows within max_distance agree exactly on at least one band, so only
+            # rows sharing a band value need to be compared
+            edges = _band_edges(max_distance)
+            for lo, hi in zip(edges, edges[1:]):
+                mask = np.uint64((1 << (hi - lo)) - 1)
+                keys = (hashes >> np.uint64(lo)) & mask
+                order = np.argsort(keys, kind="stable")
+                starts = np.flatnonzero(np.diff(keys[order])) + 1
+                for members in np.split(order, starts):
+                    if len(members) > 1:
+                        union_bucket(members)
+
+        groups = {}
+        for i in parent:
+            groups.setdefault(find(i), []).append(i)
+        return [
+            sorted(int(rowids[i]) for i in members)
+            for members in groups.values()
+            if len(members) > 1
+        ]
+
+    def save(self, path):
+        """Write the index to a .npy file (atomically)."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.part"
+        with open(temp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(self._records[: self._size]))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load an index saved with save(), memory-mapped read-only by default."""
+        records = np.load(path, mmap_mode="r" if mmap else None)
+        if records.dtype != INDEX_DTYPE:
+            raise ValueError(f"Unexpected phash index format in {path}")
+        return cls(records)
+
+
+def get_phash_index_path(save_dir):
+    """Path of the on-disk phash index, next to the database."""
+    return os.path.join(os.path.dirname(get_db_path(save_dir)), PHASH_INDEX_FILENAME)
+
+
+def build_phash_index(save_dir):
+    """Build the index from the DB and save it. Returns the index."""
+    index = PHashIndex()
+    for rowid, phash in iter_image_phashes(save_dir):
+        index.append(rowid, phash)
+    index.save(get_phash_index_path(save_dir))
+    return index
+
+
+def load_phash_index(save_dir):
+    """
+    Load the memory-mapped index for save_dir, rebuilding it when it is missing
+    or no longer matches the DB (row count or highest rowid changed).
+    """
+    path = get_phash_index_path(save_dir)
+    count, max_rowid = get_phash_stats(save_dir)
+    if os.path.exists(path):
+        try:
+            index = PHashIndex.load(path)
+        except (OSError, ValueError):
+            index = None
+        if (
+            index is not None
+            and len(index) == count
+            and (not count or int(index.rowids.max()) == max_rowid)
+        ):
+            return index
+    return build_phash_index(save_dir)
@@ -0,0 +1,151 @@
+"""Adaptive token-bucket rate limiter shared by every API and image request."""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from pyspotlightarchiver.utils.countdown import inline_countdown
+
+# Status codes that mean the server wants us to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+
+DEFAULT_RATE = 5.0  # requests per second
+MIN_RATE = 0.1
+MAX_RATE = 50.0
+DEFAULT_BURST = 5
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate adapts to server feedback (AIMD).
+    Healthy responses raise the rate additively; 429/503 responses halve it and
+    honour Retry-After; latency well above the running average trims it slightly.
+    """
+
+    def __init__(
+        self,
+        rate=DEFAULT_RATE,
+        min_rate=MIN_RATE,
+        max_rate=MAX_RATE,
+        burst=DEFAULT_BURST,
+        increase=0.25,
+        decrease=0.5,
+        latency_factor=2.0,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._avg_latency = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Block until a request may be sent. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    self.requests += 1
+                    return waited
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            if wait >= 5 and threading.current_thread() is threading.main_thread():
+                inline_countdown(int(wait))
+                time.sleep(wait - int(wait))
+            else:
+                time.sleep(wait)
+            waited += wait
+
+    def record(self, status_code, latency, retry_after=None):
+        """Feed back the outcome of a request to adjust the rate."""
+        with self._lock:
+            if status_code in THROTTLE_STATUS_CODES:
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._tokens = min(self._tokens, 0.0)
+                if retry_after:
+                    self._blocked_until = max(
+                        self._blocked_until, time.monotonic() + retry_after
+                    )
+                return
+            if self._avg_latency is None:
+                self._avg_latency = latency
+            elif latency > self._avg_latency * self.latency_factor:
+                self.rate = max(self.min_rate, self.rate * 0.9)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            self._avg_latency = 0.8 * self._avg_latency + 0.2 * latency
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date). Returns None if absent/unparsable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def get_rate_limiter(url_or_host):
+    """Return the shared limiter for the host of the given URL (or host name)."""
+    host = urlsplit(url_or_host).netloc or url_or_host
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter()
+            _limiters[host] = limiter
+        return limiter
+
+
+def get_rate_stats():
+    """Return {host: {"rate", "requests", "throttled"}} for every limiter in use."""
+    with _limiters_lock:
+        return {
+            host: {
+                "rate": limiter.rate,
+                "requests": limiter.requests,
+                "throttled": limiter.throttled,
+            }
+            for host, limiter in _limiters.items()
+        }
+
+
+def format_rate_stats():
+    """One-line human readable summary of the current request rates."""
+    stats = get_rate_stats()
+    if not stats:
+        return "no requests yet"
+    return ", ".join(
+        f"{host} {s['rate']:.1f} req/s ({s['throttled']} throttled)"
+        for host, s in sorted(stats.items())
+    )
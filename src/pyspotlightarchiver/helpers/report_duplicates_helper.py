@@ -1,9 +1,40 @@
 """Helper to report duplicates in the DB."""
 
 import os
+import threading
 from pyspotlightarchiver.helpers.download_db import (
-    get_all_images,
+    add_insert_listener,
+    flush_db,
+    get_db_path,
+    get_images_by_rowids,
+    get_meta,
+    iter_duplicate_groups,
+    merge_duplicate_group,
+    replace_duplicate_groups,
+    set_meta,
 )
+from pyspotlightarchiver.defaults import DEFAULT_PHASH_THRESHOLD
+from pyspotlightarchiver.helpers.phash_index import (
+    build_phash_index,
+    get_phash_index_path,
+    load_phash_index,
+    phash_to_int,
+)
+
+# archive_meta keys
+_META_THRESHOLD = "duplicates_threshold"
+_META_DIRTY = "duplicates_report_dirty"
+
+_duplicate_threshold = DEFAULT_PHASH_THRESHOLD
+# In-process phash index per database, updated as images are inserted
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def set_duplicate_threshold(max_distance):
+    """Set the maximum pHash Hamming distance reported as a potential duplicate."""
+    global _duplicate_threshold  # pylint: disable=global-statement
+    _duplicate_threshold = max(0, max_distance)
 
 
 def get_report_path(save_dir):
@@ -17,32 +48,152 @@ def get_report_path(save_dir):
     )
 
 
-def report_duplicates(save_dir):
-    """
-    Scans the DB for duplicate pHashes and writes a Markdown report.
-    Returns True if duplicates found, else False.
-    """
-    report_path = get_report_path(save_dir)
-    images = get_all_images(save_dir)
-    phash_map = {}
-    for url, phash, path in images:
-        if phash not in phash_map:
-            phash_map[phash] = []
-        phash_map[phash].append((url, path))
+def _distance(phash_a, phash_b):
+    a, b = phash_to_int(phash_a), phash_to_int(phash_b)
+    if a is None or b is None:
+        return None
+    return bin(a ^ b).count("1")
+
+
+def _get_index(save_dir):
+    """Return the cached index for save_dir as [index, changed], loading it once."""
+    key = get_db_path(save_dir)
+    if key not in _indexes:
+        _indexes[key] = [load_phash_index(save_dir), False]
+    return _indexes[key]
+
+
+def _rebuild_groups(save_dir, max_distance):
+    """Recompute every duplicate group from the phash index (first run or new threshold)."""
+    with _indexes_lock:
+        index = _get_index(save_dir)[0]
+        groups = index.near_duplicate_groups(max_distance)
+    images = get_images_by_rowids(
+        (rowid for group in groups for rowid in group), save_dir
+    )
+    replace_duplicate_groups(
+        ([images[rowid][0] for rowid in group if rowid in images] for group in groups),
+        save_dir,
+    )
+    set_meta(_META_THRESHOLD, max_distance, save_dir)
+    set_meta(_META_DIRTY, 1, save_dir)
+
+
+def _on_images_added(save_dir, rows, replaced):
+    """Insert listener: add new rows to the index and merge them into duplicate groups."""
+    max_distance = get_meta(_META_THRESHOLD, save_dir)
+    if max_distance is None:
+        # Groups have never been built; the next report builds them from scratch
+        return
+    max_distance = int(max_distance)
+    if replaced:
+        # Groups only ever merge, and the index keeps the replaced rows' old
+        # hashes: rebuild both so a re-recorded image can leave its group
+        with _indexes_lock:
+            _indexes[get_db_path(save_dir)] = [build_phash_index(save_dir), False]
+        _rebuild_groups(save_dir, max_distance)
+        return
+    with _indexes_lock:
+        cached = _get_index(save_dir)
+        index = cached[0]
+        matches = index.query_batch([phash for _, _, phash in rows], max_distance)
+        # A freshly loaded index may already contain these rows
+        known = int(index.rowids.max()) if len(index) else 0
+        for rowid, _, phash in rows:
+            if rowid > known and index.append(rowid, phash):
+                cached[1] = True
+    changed = False
+    for (_, url, _), neighbours in zip(rows, matches):
+        if not neighbours:
+            continue
+        images = get_images_by_rowids((rowid for rowid, _ in neighbours), save_dir)
+        urls = [image[0] for image in images.values() if image[0] != url]
+        if urls and merge_duplicate_group([url, *urls], save_dir):
+            changed = True
+    if changed:
+        set_meta(_META_DIRTY, 1, save_dir)
 
-    duplicates = {phash: items for phash, items in phash_map.items() if len(items) > 1}
 
-    if not duplicates:
-        return False
+add_insert_listener(_on_images_added)
 
+
+def _write_report(report_path, save_dir):
+    """Stream the duplicate groups from the DB into the Markdown report."""
     os.makedirs(os.path.dirname(report_path), exist_ok=True)
-    with open(report_path, "w", encoding="utf-8") as f:
+    temp_path = f"{report_path}.{os.getpid()}.part"
+    found = False
+    with open(temp_path, "w", encoding="utf-8") as f:
         f.write("# Potential duplicates\n\n")
-        for idx, (phash, items) in enumerate(duplicates.items()):
+        for items in iter_duplicate_groups(save_dir):
+            if found:  # Only add extra newline between groups
+                f.write("\n")
+            found = True
+            phash = items[0][1]
             f.write(f"## phash `{phash}`\n\n")
             f.write(f"![phash {phash}]({items[0][0]})\n")
-            for url, path in items:
-                f.write(f"\n- {url}  \n  Saved to `{path}`\n")
-            if idx < len(duplicates) - 1:  # Only add extra newline between groups
+            for url, item_phash, path in items:
+                f.write(f"\n- {url}  \n  Saved to `{path}`")
+                if item_phash != phash:
+                    f.write(
+                        f"  \n  phash `{item_phash}` (distance {_distance(phash, item_phash)})"
+                    )
                 f.write("\n")
-    return True
+    if found:
+        os.replace(temp_path, report_path)
+    else:
+        os.remove(temp_path)
+        # An old report would otherwise be taken for current duplicates
+        try:
+            os.remove(report_path)
+        except FileNotFoundError:
+            pass
+    return found
+
+
+def report_duplicates(save_dir, max_distance=None):
+    """
+    Writes a Markdown report of images whose pHashes are within max_distance bits
+    of each other (exact duplicates when 0).
+    Groups are kept up to date as images are inserted, so the report is only
+    rewritten when a group changed; a full rebuild happens on first use or when
+    the threshold changes.
+    Returns True if duplicates found, else False.
+    """
+    if max_distance is None:
+        max_distance = _duplicate_threshold
+    report_path = get_report_path(save_dir)
+    # Let queued inserts and their group updates land first
+    flush_db(save_dir)
+
+    stored = get_meta(_META_THRESHOLD, save_dir)
+    if stored is None or int(stored) != max_distance:
+        _rebuild_groups(save_dir, max_distance)
+
+    with _indexes_lock:
+        cached = _indexes.get(get_db_path(save_dir))
+        if cached and cached[1]:
+            # Persist appended hashes so the next run need not rebuild the index
+            cached[0].save(get_phash_index_path(save_dir))
+            cached[1] = False
+
+    if get_meta(_META_DIRTY, save_dir) != "1" and os.path.exists(report_path):
+        return True
+    found = _write_report(report_path, save_dir)
+    set_meta(_META_DIRTY, 0, save_dir)
+    return found
+
+
+def rebuild_duplicates(save_dir, max_distance=None):
+    """
+    Rebuild the phash index and every duplicate group after phashes were
+    rewritten in place (rehash), then write the report.
+    Returns True if duplicates found, else False.
+    """
+    if max_distance is None:
+        max_distance = _duplicate_threshold
+    flush_db(save_dir)
+    with _indexes_lock:
+        # Row counts did not change, so load_phash_index would keep the old hashes
+        _indexes[get_db_path(save_dir)] = [build_phash_index(save_dir), False]
+    _rebuild_groups(save_dir, max_distance)
+    return report_duplicates(save_dir, max_distance)
@@ -1,23 +1,117 @@
-"""Module to retry an operation up to max_retries times, waiting delay seconds between attempts."""
+"""Module to retry an operation that failed with a transient error."""
 
+import random
+import threading
 import time
+import requests
+from rich import print as rprint
 
+from pyspotlightarchiver.defaults import (
+    RETRY_BASE_DELAY,
+    RETRY_DEADLINE,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+)
+from pyspotlightarchiver.helpers.circuit_breaker import CircuitOpenError
+from pyspotlightarchiver.helpers.rate_limiter import parse_retry_after
+from pyspotlightarchiver.utils.countdown import inline_countdown
 
-def retry_operation(*args, operation, max_retries=5, delay=10, **kwargs):
-    """Retry an operation up to max_retries times, waiting delay seconds between attempts."""
-    last_exception = None
-    for attempt in range(max_retries):
-        try:
-            return operation(*args, **kwargs)
-        except Exception as e:
-            last_exception = e
-            if attempt < max_retries - 1:
-                print(
-                    f"Attempt {attempt+1} failed: {e}. Retrying in {delay} seconds..."
+# HTTP statuses worth another attempt; any other error status is permanent
+RETRYABLE_STATUS_CODES = (408, 425, 429, 500, 502, 503, 504)
+
+# Transport failures that may succeed on another attempt
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+
+
+class RetryPolicy:
+    """
+    Retries transient failures (connection errors, timeouts, truncated bodies
+    and the RETRYABLE_STATUS_CODES) with exponential backoff and jitter, waiting
+    as long as a Retry-After header asks instead. Anything else (a 404, a
+    ValueError, an open circuit, ...) is raised at once, and no attempt is
+    started once deadline seconds have passed since the first one.
+    """
+
+    def __init__(
+        self,
+        max_attempts=RETRY_MAX_ATTEMPTS,
+        base_delay=RETRY_BASE_DELAY,
+        max_delay=RETRY_MAX_DELAY,
+        deadline=RETRY_DEADLINE,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    @staticmethod
+    def is_retryable(exc):
+        """Whether exc is a transient failure worth another attempt."""
+        if isinstance(exc, CircuitOpenError):
+            return False
+        if isinstance(exc, requests.exceptions.HTTPError):
+            response = exc.response
+            return response is None or response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(exc, RETRYABLE_EXCEPTIONS)
+
+    def backoff(self, attempt, exc=None):
+        """
+        Seconds to wait after the given failed attempt (0-based): the server's
+        Retry-After if it sent one, else base_delay * 2^attempt (capped at
+        max_delay) with the upper half randomised so clients do not retry in step.
+        """
+        response = getattr(exc, "response", None)
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def run(self, operation, *args, **kwargs):
+        """Call operation(*args, **kwargs), retrying per this policy."""
+        start = time.monotonic()
+        for attempt in range(self.max_attempts):
+            try:
+                return operation(*args, **kwargs)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if not self.is_retryable(e):
+                    raise
+                if attempt == self.max_attempts - 1:
+                    rprint(f"⚠️ [yellow]All {self.max_attempts} attempts failed.[/yellow]")
+                    raise
+                delay = self.backoff(attempt, e)
+                if time.monotonic() - start + delay > self.deadline:
+                    rprint(
+                        f"⚠️ [yellow]Attempt {attempt + 1} failed: {e}. "
+                        f"Giving up, the {self.deadline:.0f}-second deadline would pass.[/yellow]"
+                    )
+                    raise
+                rprint(
+                    f"⚠️ [yellow]Attempt {attempt + 1} failed: {e}. "
+                    f"Retrying in {delay:.1f} seconds...[/yellow]"
                 )
-                time.sleep(delay)
-            else:
-                print(f"All {max_retries} attempts failed.")
-    if last_exception is not None:
-        raise last_exception
-    raise Exception("Operation failed after retries, but no exception was captured.")
+                wait_with_countdown(delay)
+        raise RuntimeError("max_attempts must be at least 1")
+
+
+def wait_with_countdown(seconds):
+    """Wait, showing a countdown for long waits in the main thread."""
+    if seconds >= 5 and threading.current_thread() is threading.main_thread():
+        inline_countdown(int(seconds))
+        time.sleep(seconds - int(seconds))
+    else:
+        time.sleep(seconds)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def retry_operation(*args, operation, policy=None, **kwargs):
+    """Call operation(*args, **kwargs), retrying transient failures per policy (default: DEFAULT_RETRY_POLICY)."""
+    return (policy or DEFAULT_RETRY_POLICY).run(operation, *args, **kwargs)
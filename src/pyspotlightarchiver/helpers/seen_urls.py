@@ -0,0 +1,86 @@
+"""Compact in-process set of archived image URLs."""
+
+import hashlib
+import sys
+import threading
+import numpy as np
+
+# Recent additions are merged into the sorted array once there are this many
+_MERGE_THRESHOLD = 4096
+
+
+def url_key(url):
+    """64-bit key of a URL: the first 8 bytes of its BLAKE2b digest."""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SeenURLSet:
+    """
+    Set of URLs stored as 64-bit hashed keys: a sorted NumPy array (8 bytes per
+    URL) plus a small Python set of recent additions.
+    Two distinct URLs share a key with probability about n^2 / 2^65, roughly
+    3 in a million for ten million URLs.
+    """
+
+    def __init__(self, urls=()):
+        keys = np.fromiter((url_key(url) for url in urls), dtype=np.uint64)
+        self._keys = np.unique(keys)
+        self._recent = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys) + len(self._recent)
+
+    def _has_key(self, key):
+        keys = self._keys
+        i = int(np.searchsorted(keys, np.uint64(key)))
+        return i < len(keys) and int(keys[i]) == key
+
+    def __contains__(self, url):
+        key = url_key(url)
+        return key in self._recent or self._has_key(key)
+
+    def contains_many(self, urls):
+        """Return a list of booleans, one per URL, with one vectorized search."""
+        keys = [url_key(url) for url in urls]
+        if not keys:
+            return []
+        recent = self._recent
+        array = self._keys
+        wanted = np.array(keys, dtype=np.uint64)
+        found = np.zeros(len(keys), dtype=bool)
+        if len(array):
+            positions = np.minimum(np.searchsorted(array, wanted), len(array) - 1)
+            found = array[positions] == wanted
+        return [bool(hit) or key in recent for hit, key in zip(found, keys)]
+
+    def add(self, url):
+        """Add a URL (no-op if it is already in the set)."""
+        key = url_key(url)
+        with self._lock:
+            if key in self._recent or self._has_key(key):
+                return
+            self._recent.add(key)
+            if len(self._recent) >= _MERGE_THRESHOLD:
+                recent = np.fromiter(self._recent, dtype=np.uint64, count=len(self._recent))
+                self._keys = np.union1d(self._keys, recent)
+                self._recent = set()
+
+    def memory_stats(self):
+        """Returns {"urls", "array_bytes", "recent_bytes", "total_bytes"}."""
+        with self._lock:
+            recent = self._recent
+            recent_bytes = sys.getsizeof(recent) + sum(sys.getsizeof(k) for k in recent)
+            array_bytes = self._keys.nbytes
+            return {
+                "urls": len(self._keys) + len(recent),
+                "array_bytes": array_bytes,
+                "recent_bytes": recent_bytes,
+                "total_bytes": array_bytes + recent_bytes,
+            }
+
+
+def format_memory_stats(stats):
+    """One-line summary of memory_stats() for progress output."""
+    return f"{stats['urls']:,} archived URLs in {stats['total_bytes'] / 1024:,.1f} KiB"
@@ -0,0 +1,95 @@
+"""Compact picture entry shared by the v3 and v4 API parsers."""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """Parse a JSON str or bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class SpotlightEntry:
+    """
+    One picture of an API batch. Only the URLs (and v3 SHA-256 digests) of the
+    requested orientation are filled in; urls(orientation) hides which ones.
+    Slots hold an entry in about 10% less memory than the equivalent dict
+    (scripts/bench_parse.py: 630 vs 718 B per v3 landscape entry); they do
+    not make parsing faster.
+    """
+
+    __slots__ = (
+        "landscape_url",
+        "portrait_url",
+        "landscape_sha256",
+        "portrait_sha256",
+        "title",
+        "copyright_text",
+        "caption_title",
+        "caption_description",
+    )
+
+    def __init__(
+        self,
+        landscape_url=None,
+        portrait_url=None,
+        landscape_sha256=None,
+        portrait_sha256=None,
+        title=None,
+        copyright_text=None,
+        caption_title=None,
+        caption_description=None,
+    ):
+        self.landscape_url = landscape_url
+        self.portrait_url = portrait_url
+        self.landscape_sha256 = landscape_sha256
+        self.portrait_sha256 = portrait_sha256
+        self.title = title
+        self.copyright_text = copyright_text
+        self.caption_title = caption_title
+        self.caption_description = caption_description
+
+    def urls(self, orientation="landscape"):
+        """
+        Return a list of (label, url) pairs.
+        Labels are 'Landscape image'/'Portrait image' for orientation 'both', else 'Image'.
+        """
+        if orientation == "both":
+            pairs = [
+                ("Landscape image", self.landscape_url),
+                ("Portrait image", self.portrait_url),
+            ]
+        elif orientation == "portrait":
+            pairs = [("Image", self.portrait_url)]
+        else:
+            pairs = [("Image", self.landscape_url)]
+        return [(label, url) for label, url in pairs if url]
+
+    def orientation_of(self, url):
+        """Return 'portrait' or 'landscape' for one of this entry's URLs."""
+        return "portrait" if url == self.portrait_url else "landscape"
+
+    def sha256(self, url):
+        """Return the SHA-256 (hex) the API payload gives for url, or None (v4 has none)."""
+        if url == self.landscape_url:
+            return self.landscape_sha256
+        if url == self.portrait_url:
+            return self.portrait_sha256
+        return None
+
+    def as_dict(self):
+        """Return the fields that are set, for logging."""
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if getattr(self, name) is not None
+        }
+
+    def __repr__(self):
+        return f"SpotlightEntry({self.as_dict()})"
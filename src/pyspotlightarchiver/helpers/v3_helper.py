@@ -1,35 +1,49 @@
 """Module for parsing v3 API data"""
 
+import base64
+import binascii
 import json
 import os
-from pyspotlightarchiver.helpers.download_helper import _get_session
+from pyspotlightarchiver.helpers.api_cache import cached_api_get
+from pyspotlightarchiver.helpers.spotlight_entry import SpotlightEntry, json_loads
+
+
+def _sha256_hex(image):
+    """Convert the base64 "sha256" of a v3 image object to hex (None if absent or invalid)."""
+    value = image.get("sha256")
+    if not value:
+        return None
+    try:
+        digest = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return digest.hex() if len(digest) == 32 else None
 
 
 def parse_v3_data(data, orientation="landscape", verbose=False):
-    """Code block to parse v3 API data"""
+    """Code block to parse v3 API data into SpotlightEntry objects"""
+    want_landscape = orientation in ("landscape", "both")
+    want_portrait = orientation in ("portrait", "both")
     results = []
     items = data.get("batchrsp", {}).get("items", [])
     for i, item in enumerate(items):
         # Each item['item'] is a JSON string
-        nested = json.loads(item["item"])
-        ad = nested.get("ad", {})
-        entry = {}
-        if orientation == "landscape":
-            entry["image_url"] = ad.get("image_fullscreen_001_landscape", {}).get("u")
-        elif orientation == "portrait":
-            entry["image_url"] = ad.get("image_fullscreen_001_portrait", {}).get("u")
-        elif orientation == "both":
-            entry["image_url_landscape"] = ad.get(
-                "image_fullscreen_001_landscape", {}
-            ).get("u")
-            entry["image_url_portrait"] = ad.get(
-                "image_fullscreen_001_portrait", {}
-            ).get("u")
-        entry["title"] = ad.get("title_text", {}).get("tx")
-        entry["copyright"] = ad.get("copyright_text", {}).get("tx")
+        ad = json_loads(item["item"]).get("ad", {})
+        entry = SpotlightEntry(
+            title=ad.get("title_text", {}).get("tx"),
+            copyright_text=ad.get("copyright_text", {}).get("tx"),
+        )
+        if want_landscape:
+            landscape = ad.get("image_fullscreen_001_landscape", {})
+            entry.landscape_url = landscape.get("u")
+            entry.landscape_sha256 = _sha256_hex(landscape)
+        if want_portrait:
+            portrait = ad.get("image_fullscreen_001_portrait", {})
+            entry.portrait_url = portrait.get("u")
+            entry.portrait_sha256 = _sha256_hex(portrait)
         results.append(entry)
         if verbose:
-            print(f"Picture metadata {i+1}: {entry}")
+            print(f"Picture metadata {i+1}: {entry.as_dict()}")
     return results
 
 
@@ -49,6 +63,5 @@ def v3_helper(use_local=False, orientation="landscape", locale="en-us", verbose=
             f"&ua=WindowsShellClient%2F9.0.40929.0%20%28Windows%29"
             f"&bcnt=3&cdm=1"
         )
-        response = _get_session().get(url, timeout=10)
-        data = response.json()
+        data = cached_api_get(url)
     return parse_v3_data(data, orientation=orientation, verbose=verbose)
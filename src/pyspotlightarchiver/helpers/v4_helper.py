@@ -2,36 +2,34 @@
 
 import json
 import os
-from pyspotlightarchiver.helpers.download_helper import _get_session
+from pyspotlightarchiver.helpers.api_cache import cached_api_get
+from pyspotlightarchiver.helpers.spotlight_entry import SpotlightEntry, json_loads
 
 
 def parse_v4_data(data, orientation="landscape", verbose=False):
-    """Code block to parse v4 API data"""
+    """Code block to parse v4 API data into SpotlightEntry objects"""
+    want_landscape = orientation in ("landscape", "both")
+    want_portrait = orientation in ("portrait", "both")
     results = []
     items = data.get("batchrsp", {}).get("items", [])
     for i, item in enumerate(items):
         # Each item['item'] is a JSON string
-        nested = json.loads(item["item"])
-        ad = nested.get("ad", {})
-        entry = {}
-        if orientation == "landscape":
-            entry["image_url"] = ad.get("landscapeImage", {}).get("asset")
-        elif orientation == "portrait":
-            entry["image_url"] = ad.get("portraitImage", {}).get("asset")
-        elif orientation == "both":
-            entry["image_url_landscape"] = ad.get("landscapeImage", {}).get("asset")
-            entry["image_url_portrait"] = ad.get("portraitImage", {}).get("asset")
+        ad = json_loads(item["item"]).get("ad", {})
         # iconHoverText: text before first \r\n
         icon_hover = ad.get("iconHoverText", "")
-        entry["picture_title"] = (
-            icon_hover.split("\r\n")[0] if "\r\n" in icon_hover else icon_hover
+        entry = SpotlightEntry(
+            title=icon_hover.split("\r\n", 1)[0],
+            copyright_text=ad.get("copyright"),
+            caption_title=ad.get("title"),
+            caption_description=ad.get("description"),
         )
-        entry["copyright"] = ad.get("copyright")
-        entry["caption_title"] = ad.get("title")
-        entry["caption_description"] = ad.get("description")
+        if want_landscape:
+            entry.landscape_url = ad.get("landscapeImage", {}).get("asset")
+        if want_portrait:
+            entry.portrait_url = ad.get("portraitImage", {}).get("asset")
         results.append(entry)
         if verbose:
-            print(f"Picture metadata {i+1}: {entry}")
+            print(f"Picture metadata {i+1}: {entry.as_dict()}")
     return results
 
 
@@ -51,6 +49,5 @@ def v4_helper(use_local=False, orientation="landscape", locale="en-us", verbose=
             f"&locale={locale}"
             f"&fmt=json"
         )
-        response = _get_session().get(url, timeout=10)
-        data = response.json()
+        data = cached_api_get(url)
     return parse_v4_data(data, orientation=orientation, verbose=verbose)
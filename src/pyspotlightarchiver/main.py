@@ -1,12 +1,112 @@
 """Main module for the pyspotlightarchiver tool"""
 
 import argparse
-from pyspotlightarchiver.utils.list_url import list_url
-from pyspotlightarchiver.utils.download_utils import (
-    download_single,
-    download_multiple_until_exhausted,
+import os
+
+# Only lightweight modules are imported here; the commands import what they
+# need when they run, so `--help` and argument errors stay fast.
+from pyspotlightarchiver.defaults import (
+    API_CACHE_MODES,
+    DEFAULT_API_CACHE_MODE,
+    DEFAULT_API_CACHE_TTL,
+    DEFAULT_EXIF_WRITER,
+    DEFAULT_EXIFTOOL_WORKERS,
+    DEFAULT_HASH_WORKERS,
+    DEFAULT_LOCALE_SCHEDULER,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_PER_HOST,
+    DEFAULT_PHASH_BACKEND,
+    DEFAULT_PHASH_THRESHOLD,
+    DEFAULT_STOP_BELOW,
+    EXIF_WRITERS,
+    LOCALE_SCHEDULERS,
+    PHASH_BACKENDS,
 )
-from pyspotlightarchiver.helpers.download_db import init_db
+
+
+def _int_range(low, high=None):
+    """Return an argparse type accepting integers from low to high (inclusive)."""
+
+    def parse(value):
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"'{value}' is not an integer") from None
+        if number < low or (high is not None and number > high):
+            bound = f"between {low} and {high}" if high is not None else f"at least {low}"
+            raise argparse.ArgumentTypeError(f"must be {bound}, got {number}")
+        return number
+
+    return parse
+
+
+def _add_api_cache_arguments(subparser):
+    """Add the API response cache options shared by list-url and download."""
+    subparser.add_argument(
+        "--api-cache",
+        type=str,
+        choices=list(API_CACHE_MODES),
+        default=DEFAULT_API_CACHE_MODE,
+        help="Cache of API responses in .cache/api_responses:\n"
+        "'use' (reuse responses younger than --api-cache-ttl), 'refresh' (always fetch\n"
+        f"and update the cache) or 'off'. Default: '{DEFAULT_API_CACHE_MODE}'",
+    )
+    subparser.add_argument(
+        "--api-cache-ttl",
+        type=int,
+        default=DEFAULT_API_CACHE_TTL,
+        help="Seconds a cached API response stays valid.\n"
+        f"Default: {DEFAULT_API_CACHE_TTL}",
+    )
+
+
+def _default_hash_workers():
+    """
+    One phash process per CPU core, up to DEFAULT_HASH_WORKERS. A single core
+    hashes in-process, since a worker process would only add overhead there.
+    """
+    cores = os.cpu_count() or 1
+    return min(DEFAULT_HASH_WORKERS, cores) if cores > 1 else 0
+
+
+def _add_phash_arguments(subparser, hash_workers_default):
+    """Add the perceptual hash options shared by download and rehash."""
+    subparser.add_argument(
+        "--phash-threshold",
+        type=_int_range(0, 64),
+        default=DEFAULT_PHASH_THRESHOLD,
+        help="Maximum pHash Hamming distance (0-64) reported as a potential duplicate.\n"
+        f"0 reports exact matches only. Default: {DEFAULT_PHASH_THRESHOLD}",
+    )
+    subparser.add_argument(
+        "--phash-backend",
+        type=str,
+        choices=list(PHASH_BACKENDS),
+        default=DEFAULT_PHASH_BACKEND,
+        help="How perceptual hashes are computed:\n"
+        "'exact' (built-in, full decode, identical to imagededup),\n"
+        "'builtin' (faster, decodes JPEGs at reduced size; hashes often differ\n"
+        "by a few bits, so run 'rehash' when switching to or from it) or\n"
+        "'imagededup' (requires the optional imagededup package).\n"
+        f"Default: '{DEFAULT_PHASH_BACKEND}'",
+    )
+    subparser.add_argument(
+        "--hash-workers",
+        type=_int_range(0),
+        default=hash_workers_default,
+        help="Processes computing pHashes, so hashing uses several CPU cores.\n"
+        f"0 hashes in this process. Default: {hash_workers_default}",
+    )
+
+
+def _add_restart_argument(subparser):
+    """Add the option that discards a checkpointed --locale all crawl."""
+    subparser.add_argument(
+        "--restart",
+        action="store_true",
+        help="With --locale all, start over instead of resuming an interrupted run\n"
+        "checkpointed in .cache/checkpoints. Default: false",
+    )
 
 
 def main():
@@ -50,11 +150,20 @@ def main():
         default="landscape",
         help="Image orientation to filter: 'landscape', 'portrait', or 'both'. Default: 'landscape'",
     )
+    list_parser.add_argument(
+        "--save-dir",
+        type=str,
+        help="Directory whose .cache (API responses, checkpoints) is used, so a later\n"
+        "download with the same --save-dir reuses the responses.\n"
+        "Default: the current working directory",
+    )
     list_parser.add_argument(
         "--verbose",
         action="store_true",
         help="Verbose output. Default: false",
     )
+    _add_api_cache_arguments(list_parser)
+    _add_restart_argument(list_parser)
 
     # Download subcommand
     download_parser = subparsers.add_parser(
@@ -120,19 +229,144 @@ def main():
         type=str,
         help="Path to the exiftool executable. Default: using the PATH environment variable",
     )
+    download_parser.add_argument(
+        "--exif-writer",
+        type=str,
+        choices=list(EXIF_WRITERS),
+        default=DEFAULT_EXIF_WRITER,
+        help="EXIF writer: 'native' (built-in, falls back to exiftool) or 'exiftool'.\n"
+        f"Default: '{DEFAULT_EXIF_WRITER}'",
+    )
+    download_parser.add_argument(
+        "--exiftool-workers",
+        type=_int_range(1),
+        default=DEFAULT_EXIFTOOL_WORKERS,
+        help="Number of persistent exiftool processes used for --embed-exif.\n"
+        f"Default: {DEFAULT_EXIFTOOL_WORKERS}",
+    )
+    _add_phash_arguments(download_parser, _default_hash_workers())
+    download_parser.add_argument(
+        "--engine",
+        type=str,
+        choices=["threads", "async"],
+        default="threads",
+        help="Download engine used with --multiple: 'threads' or 'async'.\n"
+        "'async' fetches many locales and images at once. Default: 'threads'",
+    )
+    download_parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"Maximum concurrent requests for the async engine. Default: {DEFAULT_MAX_CONCURRENCY}",
+    )
+    download_parser.add_argument(
+        "--max-per-host",
+        type=int,
+        default=DEFAULT_MAX_PER_HOST,
+        help=f"Maximum concurrent requests per host for the async engine. Default: {DEFAULT_MAX_PER_HOST}",
+    )
+    download_parser.add_argument(
+        "--every-locale",
+        action="store_true",
+        help="With --locale all, query every locale in each sweep instead of one locale\n"
+        "per learned group of locales that are served the same images. Default: false",
+    )
+    download_parser.add_argument(
+        "--scheduler",
+        type=str,
+        choices=list(LOCALE_SCHEDULERS),
+        default=DEFAULT_LOCALE_SCHEDULER,
+        help="How --multiple --locale all picks locales each round:\n"
+        "'bandit' (a few locales per round, favouring those that recently yielded\n"
+        "new images) or 'sweep' (every locale, every round).\n"
+        f"Default: '{DEFAULT_LOCALE_SCHEDULER}'",
+    )
+    download_parser.add_argument(
+        "--stop-below",
+        type=float,
+        default=DEFAULT_STOP_BELOW,
+        help="With --multiple, stop once the estimated number of new images per API call\n"
+        "falls below this value (0 disables the estimate; the loop then stops after 50\n"
+        f"rounds in a row without new images). Default: {DEFAULT_STOP_BELOW}",
+    )
+    _add_api_cache_arguments(download_parser)
+    _add_restart_argument(download_parser)
+
+    # Rehash subcommand
+    rehash_parser = subparsers.add_parser(
+        "rehash",
+        help="Recompute the pHashes of every downloaded image (e.g. after changing --phash-backend).",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    subparser_map["rehash"] = rehash_parser
+    rehash_parser.add_argument(
+        "--save-dir",
+        type=str,
+        help="Directory the images were saved to. Default: 'downloaded_spotlight' in the current working directory",
+    )
+    _add_phash_arguments(rehash_parser, os.cpu_count() or 1)
+    rehash_parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Verbose output. Default: false",
+    )
 
     args = parser.parse_args()
 
     if args.command == "download" and args.locale.lower() == "all":
-        if args.embed_exif:
+        if args.embed_exif and args.exif_writer == "exiftool":
             print(
-                "Warning: When --locale is 'all', --embed-exif is automatically set to false."
+                "Warning: When --locale is 'all' and --exif-writer is 'exiftool', "
+                "--embed-exif is automatically set to false."
             )
             args.embed_exif = False
 
     if args.command == "list-url":
-        list_url(args.api_ver, args.locale, args.orientation, args.verbose)
+        # pylint: disable=import-outside-toplevel
+        from pyspotlightarchiver.utils.list_url import list_url
+        from pyspotlightarchiver.helpers.api_cache import set_api_cache
+
+        try:
+            set_api_cache(args.api_cache, args.save_dir, args.api_cache_ttl)
+        except ValueError as e:
+            list_parser.error(str(e))
+        list_url(
+            args.api_ver,
+            args.locale,
+            args.orientation,
+            args.verbose,
+            args.restart,
+            args.save_dir,
+        )
     elif args.command == "download":
+        # pylint: disable=import-outside-toplevel
+        from pyspotlightarchiver.utils.download_utils import (
+            download_single,
+            download_multiple_until_exhausted,
+        )
+        from pyspotlightarchiver.utils.exif_utils import (
+            set_exif_writer,
+            set_exiftool_workers,
+        )
+        from pyspotlightarchiver.helpers.download_db import init_db
+        from pyspotlightarchiver.helpers.report_duplicates_helper import (
+            set_duplicate_threshold,
+        )
+        from pyspotlightarchiver.helpers.imagehash_helper import (
+            set_hash_workers,
+            set_phash_backend,
+        )
+        from pyspotlightarchiver.helpers.api_cache import set_api_cache
+
+        try:
+            set_phash_backend(args.phash_backend)
+            set_hash_workers(args.hash_workers)
+            set_api_cache(args.api_cache, args.save_dir, args.api_cache_ttl)
+        except (ImportError, ValueError) as e:
+            download_parser.error(str(e))
+        set_exif_writer(args.exif_writer)
+        set_exiftool_workers(args.exiftool_workers)
+        set_duplicate_threshold(args.phash_threshold)
         if args.single:
             init_db(args.save_dir)
             download_single(
@@ -154,7 +388,34 @@ def main():
                 args.save_dir,
                 args.embed_exif,
                 args.exiftool_path,
+                engine=args.engine,
+                max_concurrency=args.max_concurrency,
+                max_per_host=args.max_per_host,
+                every_locale=args.every_locale,
+                scheduler=args.scheduler,
+                stop_below=args.stop_below,
+                restart=args.restart,
             )
+    elif args.command == "rehash":
+        # pylint: disable=import-outside-toplevel
+        from pyspotlightarchiver.utils.rehash import rehash_images
+        from pyspotlightarchiver.helpers.download_db import init_db
+        from pyspotlightarchiver.helpers.report_duplicates_helper import (
+            set_duplicate_threshold,
+        )
+        from pyspotlightarchiver.helpers.imagehash_helper import (
+            set_hash_workers,
+            set_phash_backend,
+        )
+
+        try:
+            set_phash_backend(args.phash_backend)
+            set_hash_workers(args.hash_workers)
+        except (ImportError, ValueError) as e:
+            rehash_parser.error(str(e))
+        set_duplicate_threshold(args.phash_threshold)
+        init_db(args.save_dir)
+        rehash_images(args.save_dir, args.verbose)
     else:
         parser.print_help()
         print("\nAvailable Commands:\n")
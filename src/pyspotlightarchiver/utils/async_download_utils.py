@@ -0,0 +1,308 @@
+"""Module for downloading images from API concurrently with asyncio"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from rich import print as rprint
+
+from pyspotlightarchiver.helpers.download_helper import (
+    asset_id,
+    download_image_info,
+    image_metadata,
+)
+from pyspotlightarchiver.helpers.retry_helper import (
+    retry_operation,
+)
+from pyspotlightarchiver.helpers.v3_helper import (
+    v3_helper,
+)
+from pyspotlightarchiver.helpers.v4_helper import (
+    v4_helper,
+)
+from pyspotlightarchiver.helpers.download_db import (
+    get_archived_urls,
+    get_image_validators,
+    add_image_url_to_db,
+)
+from pyspotlightarchiver.helpers.locale_classes import (
+    record_locale_entries,
+    sweep_locales,
+)
+from pyspotlightarchiver.helpers.imagehash_helper import (
+    compute_phash,
+    get_image_size,
+)
+from pyspotlightarchiver.utils.locale_data import (
+    get_locale_codes,
+)
+from pyspotlightarchiver.helpers.http_client import (
+    set_http_pool_size,
+)
+from pyspotlightarchiver.defaults import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_PER_HOST,
+    HTTP_POOL_SIZE,
+)
+from pyspotlightarchiver.utils.exif_utils import (
+    embed_exif_metadata,
+    exif_fields,
+)
+
+
+def _api_call(api_ver, locale, orientation, verbose=False):
+    """Helper to call the API."""
+    return (
+        v3_helper(False, orientation, locale, verbose=verbose)
+        if api_ver == 3
+        else v4_helper(False, orientation, locale, verbose=verbose)
+    )
+
+
+def _api_host(api_ver):
+    """Host name the API calls for the given version go to."""
+    return f"fd.api.iris.microsoft.com/v{api_ver}"
+
+
+class _AsyncDownloader:
+    """Run API calls and image downloads concurrently, bounded globally and per host.
+
+    Blocking work (requests, DB reads, phash, exiftool) runs in a dedicated thread
+    pool sized to the global limit. Dedup decisions are made on the event loop
+    thread through the set of claimed asset ids, so they stay one at a time,
+    exactly like the sequential code path. DB writes are queued to the writer.
+    """
+
+    def __init__(
+        self,
+        api_ver,
+        orientation,
+        verbose=False,
+        save_dir=None,
+        embed_exif=True,
+        exiftool_path=None,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        max_per_host=DEFAULT_MAX_PER_HOST,
+        on_locale_done=None,
+    ):
+        self.api_ver = api_ver
+        self.orientation = orientation
+        self.verbose = verbose
+        self.save_dir = save_dir
+        self.embed_exif = embed_exif
+        self.exiftool_path = exiftool_path
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_per_host = max(1, max_per_host)
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._hosts = {}
+        # Asset ids claimed during this run, so two locales serving the same
+        # picture do not download it twice before the first one is recorded.
+        self._claimed = set()
+        self.downloaded = 0
+        self.already_downloaded = 0
+        # New images per locale whose API call succeeded
+        self.per_locale = {}
+        # Asset ids of every image the API returned
+        self.observed = []
+        self.on_locale_done = on_locale_done
+
+    def _host_semaphore(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+        return self._hosts[host]
+
+    async def _run_limited(self, host, func, *args, **kwargs):
+        """Run a blocking call in the pool, holding a global and a per-host slot."""
+        async with self._global, self._host_semaphore(host):
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def _download_url(self, entry, url, label, locale):
+        """Download, record and tag one image. Returns True if the local file was kept unchanged."""
+        try:
+            validators = await asyncio.to_thread(
+                get_image_validators, url, self.save_dir
+            )
+            info = await self._run_limited(
+                urlsplit(url).netloc,
+                download_image_info,
+                url,
+                save_dir=self.save_dir,
+                api_ver=self.api_ver,
+                expected_sha256=entry.sha256(url),
+                validators=validators,
+            )
+            path = info["path"]
+            phash = await asyncio.to_thread(compute_phash, path)
+            dimensions = await asyncio.to_thread(get_image_size, path)
+            filename = os.path.basename(path)
+            add_image_url_to_db(
+                url,
+                phash,
+                filename,
+                save_dir=self.save_dir,
+                metadata=image_metadata(
+                    info, entry, self.api_ver, locale, self.orientation, dimensions
+                ),
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # One failed image must not abort the other locales' downloads
+            self._claimed.discard(asset_id(url))
+            rprint(f"⚠️ [yellow]Failed to download {url}: {exc}[/yellow]")
+            return False
+        if not info["reused"]:
+            rprint(f"✅ [green]{label} saved:[/green] {filename}")
+        if self.embed_exif:
+            try:
+                if await asyncio.to_thread(
+                    embed_exif_metadata,
+                    path,
+                    exif_fields(entry),
+                    exiftool_path=self.exiftool_path,
+                    verbose=self.verbose,
+                ):
+                    rprint("✅ [green]EXIF metadata embedded[/green]")
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                rprint(f"⚠️ [yellow]Failed to embed EXIF metadata: {exc}[/yellow]")
+        if info["reused"]:
+            # Kept because the server confirmed it unchanged: not a new image
+            return True
+        if self.verbose:
+            rprint(
+                f"✅ [green]LOG: [async_download]Downloaded ({locale}):[/green] {url}"
+            )
+        self.downloaded += 1
+        self.per_locale[locale] += 1
+        return False
+
+    async def process_locale(self, locale):
+        """Fetch one locale and download every entry that is not archived yet."""
+        if self.verbose:
+            rprint(f"ℹ️ [gray]LOG: [async_download]--- {locale} ---[/gray]")
+        try:
+            entries = await self._run_limited(
+                _api_host(self.api_ver),
+                retry_operation,
+                self.api_ver,
+                locale,
+                self.orientation,
+                self.verbose,
+                operation=_api_call,
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # retry_operation re-raises whatever the last attempt raised
+            rprint(f"⚠️ [yellow]Locale {locale} failed: {exc}[/yellow]")
+            return
+        self.per_locale[locale] = 0
+        if entries:
+            record_locale_entries(
+                self.api_ver, locale, entries, self.orientation, self.save_dir
+            )
+
+        entry_pairs = [
+            (entry, entry.urls(self.orientation)) for entry in entries or []
+        ]
+        self.observed.extend(
+            asset_id(url) for _, pairs in entry_pairs for _, url in pairs
+        )
+        digests = {
+            url: entry.sha256(url)
+            for entry, pairs in entry_pairs
+            for _, url in pairs
+        }
+        archived = await asyncio.to_thread(
+            get_archived_urls, digests, self.save_dir, self.api_ver, digests
+        )
+        # Claims are checked and taken without awaiting, so locales running
+        # concurrently still never queue the same asset twice
+        tasks = []
+        already_downloaded = 0
+        for entry, pairs in entry_pairs:
+            for label, url in pairs:
+                if asset_id(url) in self._claimed or url in archived:
+                    if self.verbose:
+                        rprint(f"ℹ️ [gray]Already downloaded:[/gray] {url}")
+                    already_downloaded += 1
+                    continue
+                self._claimed.add(asset_id(url))
+                tasks.append(self._download_url(entry, url, label, locale))
+        if tasks:
+            already_downloaded += sum(1 for reused in await asyncio.gather(*tasks) if reused)
+        self.already_downloaded += already_downloaded
+        if self.on_locale_done is not None:
+            self.on_locale_done(locale, self.per_locale[locale], already_downloaded)
+
+    async def run(self, locales):
+        """Process all locales concurrently and return the totals."""
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        loop.set_default_executor(executor)
+        try:
+            await asyncio.gather(*(self.process_locale(loc) for loc in locales))
+        finally:
+            executor.shutdown(wait=True)
+        return {
+            "downloaded": self.downloaded,
+            "already_downloaded": self.already_downloaded,
+            "locales": self.per_locale,
+            "observed": self.observed,
+        }
+
+
+def download_multiple_async(
+    api_ver,
+    locale,
+    orientation,
+    verbose=False,
+    save_dir=None,
+    embed_exif=True,
+    exiftool_path=None,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    max_per_host=DEFAULT_MAX_PER_HOST,
+    every_locale=False,
+    locales=None,
+    on_locale_done=None,
+):
+    """
+    asyncio counterpart of download_multiple.
+    Fetches every requested locale and downloads new images concurrently.
+    With locale "all", the given locales are queried, or by default equivalent
+    locales are skipped as in download_multiple; on_locale_done is called as
+    each locale completes.
+    Returns the same {"downloaded", "already_downloaded", "locales", "observed"} dict.
+    """
+    all_locales = get_locale_codes(api_ver, save_dir)
+    locale = locale.lower()
+
+    if locale == "all":
+        if locales is None:
+            locales = sweep_locales(
+                all_locales, api_ver, save_dir, every_locale, verbose
+            )
+    else:
+        all_locales_lower = [l.lower() for l in all_locales]
+        if locale not in all_locales_lower:
+            rprint(
+                f"❗ [red]Locale '{locale}' is not valid.[/red] Use one of: {', '.join(all_locales)}"
+            )
+            return {
+                "downloaded": 0,
+                "already_downloaded": 0,
+                "locales": {},
+                "observed": [],
+            }
+        locales = [all_locales[all_locales_lower.index(locale)]]
+
+    # Keep a warm connection for every request that may run against a host at once
+    set_http_pool_size(max(HTTP_POOL_SIZE, max_per_host))
+    downloader = _AsyncDownloader(
+        api_ver,
+        orientation,
+        verbose=verbose,
+        save_dir=save_dir,
+        embed_exif=embed_exif,
+        exiftool_path=exiftool_path,
+        max_concurrency=max_concurrency,
+        max_per_host=max_per_host,
+        on_locale_done=on_locale_done,
+    )
+    return asyncio.run(downloader.run(locales))
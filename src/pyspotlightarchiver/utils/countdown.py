@@ -1,15 +1,26 @@
 """Countdown utility for inline display."""
 
 import time
-from rich.console import Console
 
-console = Console()
+_console = None
+
+
+def _get_console():
+    """Create the rich Console on first use."""
+    global _console  # pylint: disable=global-statement
+    if _console is None:
+        # pylint: disable=import-outside-toplevel
+        from rich.console import Console
+
+        _console = Console()
+    return _console
 
 
 def inline_countdown(delay):
     """Display a countdown in the same line."""
     if delay <= 0:
         return
+    console = _get_console()
     for remaining in range(delay, 0, -1):
         mins, secs = divmod(remaining, 60)
         timeformat = f"ℹ️ [bisque]Delaying to avoid rate limiting... {mins}:{secs:02d} remaining[/bisque]"
@@ -0,0 +1,349 @@
+"""Long-lived staged pipeline of the threads engine: download → hash → record → tag"""
+
+import os
+import queue
+import threading
+import time
+from rich import print as rprint
+
+from pyspotlightarchiver.helpers.download_helper import (
+    asset_id,
+    download_image_info,
+    image_metadata,
+)
+from pyspotlightarchiver.helpers.download_db import (
+    add_image_url_to_db,
+    get_image_validators,
+)
+from pyspotlightarchiver.helpers.imagehash_helper import (
+    compute_phash,
+    get_hash_workers,
+    get_image_size,
+)
+from pyspotlightarchiver.utils.exif_utils import (
+    embed_exif_metadata_batch,
+    exif_fields,
+)
+from pyspotlightarchiver.defaults import (
+    PIPELINE_DOWNLOAD_WORKERS,
+    PIPELINE_HASH_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_TAG_BATCH,
+    PIPELINE_TAG_WORKERS,
+)
+
+_STOP = object()
+
+
+class _Job:
+    """One image travelling through the stages."""
+
+    __slots__ = ("batch", "entry", "label", "url", "info", "phash", "dimensions")
+
+    def __init__(self, batch, entry, label, url):
+        self.batch = batch
+        self.entry = entry
+        self.label = label
+        self.url = url
+        self.info = None
+        self.phash = None
+        self.dimensions = None
+
+
+class _LocaleBatch:
+    """The images queued for one locale; on_done fires once the last is through."""
+
+    __slots__ = ("locale", "pending", "downloaded", "already_downloaded", "on_done")
+
+    def __init__(self, locale, pending, already_downloaded, on_done):
+        self.locale = locale
+        self.pending = pending
+        self.downloaded = 0
+        self.already_downloaded = already_downloaded
+        self.on_done = on_done
+
+
+class _Stage:
+    """
+    A bounded queue served by its own worker threads. put blocks while the
+    queue is full, so a slow stage holds back the ones feeding it.
+    Workers take up to batch_size queued jobs at a time.
+    """
+
+    def __init__(self, name, func, workers, maxsize=PIPELINE_QUEUE_SIZE, batch_size=1):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize)
+        self.peak = 0
+        self.processed = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"pipeline-{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, job):
+        """Queue a job, waiting for room."""
+        self.queue.put(job)
+        depth = self.queue.qsize()
+        with self._lock:
+            self.peak = max(self.peak, depth)
+
+    def _take(self):
+        jobs = [self.queue.get()]
+        while jobs[-1] is not _STOP and len(jobs) < self.batch_size:
+            try:
+                jobs.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return jobs
+
+    def _work(self):
+        while True:
+            jobs = self._take()
+            stop = jobs[-1] is _STOP
+            if stop:
+                jobs.pop()
+            if jobs:
+                start = time.monotonic()
+                try:
+                    self.func(jobs)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    # Stage functions settle their own jobs; keep the worker alive
+                    rprint(f"⚠️ [yellow]Pipeline {self.name} stage failed: {exc}[/yellow]")
+                with self._lock:
+                    self.processed += len(jobs)
+                    self.busy += time.monotonic() - start
+            if stop:
+                return
+
+    def stop(self):
+        """Let the workers finish the queued jobs, then end them."""
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+
+class DownloadPipeline:
+    """
+    Stages with their own bounded queue and workers, kept for a whole run:
+    download (network), hash (pHash and size, CPU), record (database) and,
+    with embed_exif, tag (EXIF, in batches). The caller fetches the API and
+    submits each locale's new images; every stage works on a different image
+    at the same time, and submit blocks while the download queue is full.
+    """
+
+    def __init__(
+        self,
+        api_ver,
+        orientation,
+        save_dir=None,
+        embed_exif=True,
+        exiftool_path=None,
+        verbose=False,
+    ):
+        self.api_ver = api_ver
+        self.orientation = orientation
+        self.save_dir = save_dir
+        self.exiftool_path = exiftool_path
+        self.verbose = verbose
+        # Asset ids queued during this run, so two locales serving the same
+        # picture do not download it twice before the first one is recorded
+        self._claimed = set()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._started = time.monotonic()
+        self._tag = (
+            _Stage("tag", self._tag_jobs, PIPELINE_TAG_WORKERS, batch_size=PIPELINE_TAG_BATCH)
+            if embed_exif
+            else None
+        )
+        self._record = _Stage("record", self._record_jobs, 1)
+        # Enough threads to keep every phash worker process busy
+        self._hash = _Stage(
+            "hash", self._hash_jobs, max(PIPELINE_HASH_WORKERS, get_hash_workers())
+        )
+        self._download = _Stage(
+            "download", self._download_jobs, PIPELINE_DOWNLOAD_WORKERS
+        )
+        self.stages = [self._download, self._hash, self._record]
+        if self._tag is not None:
+            self.stages.append(self._tag)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def claim(self, url):
+        """Reserve url's asset for this run. False if it is already queued."""
+        key = asset_id(url)
+        with self._lock:
+            if key in self._claimed:
+                return False
+            self._claimed.add(key)
+            return True
+
+    def submit(self, locale, jobs, already_downloaded=0, on_done=None):
+        """
+        Queue the (entry, label, url) images found for locale.
+        on_done(locale, downloaded, already_downloaded) is called, from a worker
+        thread, once all of them are through; calls never overlap.
+        """
+        batch = _LocaleBatch(locale, len(jobs), already_downloaded, on_done)
+        with self._lock:
+            self._outstanding += len(jobs)
+            if not jobs:
+                self._locale_done(batch)
+        queued = 0
+        try:
+            for entry, label, url in jobs:
+                self._download.put(_Job(batch, entry, label, url))
+                queued += 1
+        except BaseException:
+            # Interrupted while waiting for room (Ctrl-C): forget the jobs that
+            # were never queued so join() does not wait for them, and do not
+            # report the locale as done, so a resumed run fetches it again
+            with self._lock:
+                unqueued = jobs[queued:]
+                for _, _, url in unqueued:
+                    self._claimed.discard(asset_id(url))
+                batch.on_done = None
+                batch.pending -= len(unqueued)
+                self._outstanding -= len(unqueued)
+                if not self._outstanding:
+                    self._idle.notify_all()
+            raise
+
+    def _locale_done(self, batch):
+        # Called with self._lock held
+        if batch.on_done is None:
+            return
+        try:
+            batch.on_done(batch.locale, batch.downloaded, batch.already_downloaded)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            rprint(f"⚠️ [yellow]Locale {batch.locale} bookkeeping failed: {exc}[/yellow]")
+
+    def _finish(self, job, downloaded):
+        with self._lock:
+            batch = job.batch
+            batch.pending -= 1
+            if downloaded and job.info["reused"]:
+                # Kept because the server confirmed it unchanged: not a new image
+                batch.already_downloaded += 1
+            else:
+                batch.downloaded += downloaded
+            if not batch.pending:
+                self._locale_done(batch)
+            self._outstanding -= 1
+            if not self._outstanding:
+                self._idle.notify_all()
+
+    def _drop(self, job, exc):
+        # Every stage drops a job it cannot finish, whatever the error, so
+        # join() never waits for an image no worker will complete
+        rprint(f"⚠️ [yellow]Failed to download {job.url}: {exc}[/yellow]")
+        with self._lock:
+            self._claimed.discard(asset_id(job.url))
+        self._finish(job, 0)
+
+    def _download_jobs(self, jobs):
+        for job in jobs:
+            try:
+                job.info = download_image_info(
+                    job.url,
+                    self.save_dir,
+                    self.api_ver,
+                    expected_sha256=job.entry.sha256(job.url),
+                    validators=get_image_validators(job.url, self.save_dir),
+                )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._drop(job, exc)
+                continue
+            self._hash.put(job)
+
+    def _hash_jobs(self, jobs):
+        for job in jobs:
+            path = job.info["path"]
+            try:
+                job.phash = compute_phash(path)
+                job.dimensions = get_image_size(path)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._drop(job, exc)
+                continue
+            self._record.put(job)
+
+    def _record_jobs(self, jobs):
+        for job in jobs:
+            filename = os.path.basename(job.info["path"])
+            try:
+                add_image_url_to_db(
+                    job.url,
+                    job.phash,
+                    filename,
+                    save_dir=self.save_dir,
+                    metadata=image_metadata(
+                        job.info,
+                        job.entry,
+                        self.api_ver,
+                        job.batch.locale,
+                        self.orientation,
+                        job.dimensions,
+                    ),
+                )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._drop(job, exc)
+                continue
+            if not job.info["reused"]:
+                rprint(f"✅ [green]{job.label} saved:[/green] {filename}")
+            if self.verbose:
+                rprint(
+                    f"✅ [green]LOG: [download_pipeline]Downloaded ({job.batch.locale}):[/green] {job.url}"
+                )
+            if self._tag is not None:
+                self._tag.put(job)
+            else:
+                self._finish(job, 1)
+
+    def _tag_jobs(self, jobs):
+        try:
+            embedded = embed_exif_metadata_batch(
+                [(job.info["path"], exif_fields(job.entry)) for job in jobs],
+                exiftool_path=self.exiftool_path,
+                verbose=self.verbose,
+            )
+            if embedded:
+                rprint(f"✅ [green]EXIF metadata embedded in {embedded} image(s)[/green]")
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            rprint(f"⚠️ [yellow]Failed to embed EXIF metadata: {exc}[/yellow]")
+        finally:
+            for job in jobs:
+                self._finish(job, 1)
+
+    def join(self):
+        """Wait until every submitted image has been through all stages."""
+        with self._idle:
+            self._idle.wait_for(lambda: not self._outstanding)
+
+    def close(self):
+        """Finish the submitted images and end the workers."""
+        self.join()
+        for stage in self.stages:
+            stage.stop()
+
+    def format_stats(self):
+        """One-line summary of each stage's queue depth and busy time."""
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return ", ".join(
+            f"{stage.name} {stage.queue.qsize()} queued (peak {stage.peak}), "
+            f"{stage.processed} done, {stage.busy / (stage.workers * elapsed):.0%} busy"
+            for stage in self.stages
+        )
@@ -2,17 +2,35 @@
 
 import os
 import random
-import time
+from functools import partial
 from concurrent.futures import ThreadPoolExecutor
 import requests
 from rich import print as rprint
 
 from pyspotlightarchiver.helpers.download_helper import (
-    download_image,
-    download_images,
+    asset_id,
+    download_image_info,
+    image_metadata,
+    refresh_saved_files,
 )
 from pyspotlightarchiver.helpers.retry_helper import (
+    DEFAULT_RETRY_POLICY,
     retry_operation,
+    wait_with_countdown,
+)
+from pyspotlightarchiver.helpers.circuit_breaker import (
+    get_open_circuit_wait,
+)
+from pyspotlightarchiver.helpers.rate_limiter import (
+    format_rate_stats,
+)
+from pyspotlightarchiver.helpers.http_client import (
+    format_connection_stats,
+)
+from pyspotlightarchiver.helpers.api_cache import (
+    get_api_cache_mode,
+    get_api_cache_ttl,
+    set_api_cache,
 )
 from pyspotlightarchiver.helpers.v3_helper import (
     v3_helper,
@@ -21,42 +39,70 @@ from pyspotlightarchiver.helpers.v4_helper import (
     v4_helper,
 )
 from pyspotlightarchiver.helpers.download_db import (
-    get_image_url_from_db,
+    get_archived_urls,
+    get_image_validators,
+    get_seen_url_stats,
     add_image_url_to_db,
-    is_file_on_disk,
+)
+from pyspotlightarchiver.helpers.locale_classes import (
+    record_locale_entries,
+    sweep_locales,
+)
+from pyspotlightarchiver.helpers.checkpoint import (
+    CrawlCheckpoint,
+)
+from pyspotlightarchiver.helpers.coverage import (
+    UnseenEstimator,
+)
+from pyspotlightarchiver.helpers.locale_scheduler import (
+    LocaleScheduler,
 )
 from pyspotlightarchiver.helpers.report_duplicates_helper import (
     report_duplicates,
     get_report_path,
 )
+from pyspotlightarchiver.helpers.seen_urls import (
+    format_memory_stats,
+)
 from pyspotlightarchiver.helpers.imagehash_helper import (
     compute_phash,
+    get_image_size,
 )
 from pyspotlightarchiver.utils.locale_data import (
     get_locale_codes,
 )
 from pyspotlightarchiver.utils.exif_utils import (
-    set_exif_metadata_exiftool,
+    embed_exif_metadata,
+    exif_fields,
+)
+from pyspotlightarchiver.utils.download_pipeline import (
+    DownloadPipeline,
 )
-from pyspotlightarchiver.utils.countdown import (
-    inline_countdown,
+from pyspotlightarchiver.utils.async_download_utils import (
+    download_multiple_async,
+)
+from pyspotlightarchiver.defaults import (
+    DEFAULT_LOCALE_SCHEDULER,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_PER_HOST,
+    DEFAULT_STOP_BELOW,
+    MIN_ROUNDS_BEFORE_STOP,
 )
 
 CONSECUTIVE_MAX = 50
-MAX_DOWNLOAD_WORKERS = 8
 
+# Fetches both orientations of an entry at once; kept for the whole process
+# (threads start on first use) instead of a new pool per entry
+_orientation_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="download-orientation"
+)
 
-def _download_entry(entry, orientation, api_ver, save_dir):
-    """Worker: download image(s) for one entry and compute phash.
-    Returns (entry, list of (url, path, filename, phash)).
-    """
-    paths = download_images(entry, orientation, api_ver=api_ver, save_dir=save_dir)
-    results = []
-    for url, path in paths.items():
-        if path:
-            phash = compute_phash(path)
-            results.append((url, path, os.path.basename(path), phash))
-    return entry, results
+
+def _entry_digests(entry_pairs):
+    """Map each URL of [(entry, [(label, url)])] to its announced SHA-256, if any."""
+    return {
+        url: entry.sha256(url) for entry, pairs in entry_pairs for _, url in pairs
+    }
 
 
 def _api_call(api_ver, locale, orientation, verbose=False):
@@ -69,45 +115,58 @@ def _api_call(api_ver, locale, orientation, verbose=False):
 
 
 def _download_both_orientations(
-    entry, api_ver, save_dir=None, embed_exif=True, exiftool_path=None, verbose=False
+    entry,
+    api_ver,
+    save_dir=None,
+    embed_exif=True,
+    exiftool_path=None,
+    verbose=False,
+    locale=None,
 ):
     found = False
+    pairs = entry.urls("both")
+    digests = _entry_digests([(entry, pairs)])
+    archived = get_archived_urls(digests, save_dir, api_ver, digests)
     urls_to_download = []
-    for key in ["image_url_landscape", "image_url_portrait"]:
-        url = entry.get(key)
-        if not url:
-            continue
-        record = get_image_url_from_db(url, save_dir)
-        if record and is_file_on_disk(record[2], save_dir, api_ver):
-            rprint(f"ℹ️ [gray]Already downloaded:[/gray] {record[2]}")
+    for label, url in pairs:
+        if url in archived:
+            rprint(f"ℹ️ [gray]Already downloaded:[/gray] {asset_id(url)}")
             continue
-        urls_to_download.append((key, url))
+        urls_to_download.append((label, url))
 
     if not urls_to_download:
         return found
 
-    def _fetch(key_url):
-        key, url = key_url
-        return key, url, download_image(url, api_ver=api_ver, save_dir=save_dir)
-
-    with ThreadPoolExecutor(max_workers=len(urls_to_download)) as executor:
-        for key, url, path in executor.map(_fetch, urls_to_download):
-            label = "Landscape" if key == "image_url_landscape" else "Portrait"
-            rprint(f"✅ [green]{label} image saved:[/green] {os.path.basename(path)}")
-            filename = os.path.basename(path)
-            add_image_url_to_db(url, compute_phash(path), filename, save_dir=save_dir)
-            if embed_exif:
-                set_exif_metadata_exiftool(
-                    path,
-                    title=entry.get("title") or entry.get("picture_title"),
-                    copyright_text=entry.get("copyright"),
-                    caption_title=entry.get("caption_title"),
-                    caption_description=entry.get("caption_description"),
-                    exiftool_path=exiftool_path,
-                    verbose=verbose,
-                )
+    def _fetch(label_url):
+        label, url = label_url
+        return label, url, download_image_info(
+            url,
+            api_ver=api_ver,
+            save_dir=save_dir,
+            expected_sha256=entry.sha256(url),
+            validators=get_image_validators(url, save_dir),
+        )
+
+    for label, url, info in _orientation_executor.map(_fetch, urls_to_download):
+        path = info["path"]
+        if not info["reused"]:
+            rprint(f"✅ [green]{label} saved:[/green] {os.path.basename(path)}")
+        filename = os.path.basename(path)
+        add_image_url_to_db(
+            url,
+            compute_phash(path),
+            filename,
+            save_dir=save_dir,
+            metadata=image_metadata(
+                info, entry, api_ver, locale, "both", get_image_size(path)
+            ),
+        )
+        if embed_exif:
+            if embed_exif_metadata(
+                path, exif_fields(entry), exiftool_path=exiftool_path, verbose=verbose
+            ):
                 rprint("✅ [green]EXIF metadata embedded[/green]")
-            found = True
+        found = True
     return found
 
 
@@ -140,38 +199,51 @@ def _download_for_locale(
 
     if orientation == "both":
         return _download_both_orientations(
-            entry, api_ver, save_dir, embed_exif, exiftool_path
+            entry, api_ver, save_dir, embed_exif, exiftool_path, locale=real_locale
         )
-    url = entry.get("image_url")
+    url = next((url for _, url in entry.urls(orientation)), None)
     if url:
-        record = get_image_url_from_db(url, save_dir)
-        if record:
-            filename = record[2]
-            if is_file_on_disk(filename, save_dir, api_ver):
-                rprint(f"ℹ️ [gray]Already downloaded:[/gray] {filename}")
-                return True
-        path = download_image(url, api_ver=api_ver, save_dir=save_dir)
-        rprint(f"✨ [green]New image found:[/green] {os.path.basename(url.split('?')[0])}")
-        rprint(f"✅ [green]Image saved:[/green] {os.path.basename(path)}")
+        digest = entry.sha256(url)
+        if get_archived_urls([url], save_dir, api_ver, {url: digest}):
+            rprint(f"ℹ️ [gray]Already downloaded:[/gray] {asset_id(url)}")
+            return True
+        info = download_image_info(
+            url,
+            api_ver=api_ver,
+            save_dir=save_dir,
+            expected_sha256=digest,
+            validators=get_image_validators(url, save_dir),
+        )
+        path = info["path"]
+        if not info["reused"]:
+            rprint(f"✨ [green]New image found:[/green] {asset_id(url)}")
+            rprint(f"✅ [green]Image saved:[/green] {os.path.basename(path)}")
         filename = os.path.basename(path)
-        add_image_url_to_db(url, compute_phash(path), filename, save_dir=save_dir)
+        add_image_url_to_db(
+            url,
+            compute_phash(path),
+            filename,
+            save_dir=save_dir,
+            metadata=image_metadata(
+                info, entry, api_ver, real_locale, orientation, get_image_size(path)
+            ),
+        )
         if embed_exif:
-            set_exif_metadata_exiftool(
-                path,
-                title=entry.get("title") or entry.get("picture_title"),
-                copyright_text=entry.get("copyright"),
-                caption_title=entry.get("caption_title"),
-                caption_description=entry.get("caption_description"),
-                exiftool_path=exiftool_path,
-                verbose=verbose,
-            )
-            rprint("✅ [green]EXIF metadata embedded[/green]")
+            if embed_exif_metadata(
+                path, exif_fields(entry), exiftool_path=exiftool_path, verbose=verbose
+            ):
+                rprint("✅ [green]EXIF metadata embedded[/green]")
         return True
     return False
 
 
 def _download_for_all_locales(
-    api_ver, orientation, verbose=False, save_dir=None, exiftool_path=None
+    api_ver,
+    orientation,
+    verbose=False,
+    save_dir=None,
+    embed_exif=True,
+    exiftool_path=None,
 ):
     all_locales = get_locale_codes(api_ver, save_dir)
     locales_shuffled = all_locales[:]
@@ -188,6 +260,7 @@ def _download_for_all_locales(
             verbose,
             operation=download_single,
             save_dir=save_dir,
+            embed_exif=embed_exif,
             exiftool_path=exiftool_path,
         ):
             return True
@@ -213,12 +286,12 @@ def download_single(
     """
     locale = locale.lower()
     if locale == "all":
-        embed_exif = False
         return _download_for_all_locales(
             api_ver,
             orientation,
             verbose=verbose,
             save_dir=save_dir,
+            embed_exif=embed_exif,
             exiftool_path=exiftool_path,
         )
     result = _download_for_locale(
@@ -237,10 +310,15 @@ def _download_multiple_for_locale(
     orientation,
     verbose=False,
     save_dir=None,
-    embed_exif=True,
-    exiftool_path=None,
+    pipeline=None,
+    on_done=None,
 ):
-    """Helper to download all images for a single locale. Returns count."""
+    """
+    Helper to fetch a single locale and queue its new images on pipeline;
+    on_done(locale, downloaded, already_downloaded) is called once they are
+    all through (see DownloadPipeline.submit).
+    Returns the asset ids of every image the API returned.
+    """
     entries = _api_call(api_ver, locale, orientation, verbose)
 
     if not entries:
@@ -248,65 +326,33 @@ def _download_multiple_for_locale(
             rprint(
                 "ℹ️ [gray]LOG: [download_multiple_for_locale]No entries found to download.[/gray]"
             )
-        return 0, 0
+        pipeline.submit(locale, [], on_done=on_done)
+        return []
+    record_locale_entries(api_ver, locale, entries, orientation, save_dir)
 
-    downloaded = 0
     already_downloaded = 0
 
-    # Pre-filter entries already in DB (only works for single-orientation where image_url exists)
-    new_entries = []
-    for entry in entries:
-        url = entry.get("image_url")
-        if url:
-            record = get_image_url_from_db(url, save_dir)
-            if record:
-                filename = record[2]
-                if is_file_on_disk(filename, save_dir, api_ver):
-                    if verbose:
-                        rprint(f"ℹ️ [gray]Already downloaded:[/gray] {filename}")
-                    already_downloaded += 1
-                    continue
-        new_entries.append(entry)
+    # Pre-filter assets already archived with one batch lookup (every orientation)
+    entry_pairs = [(entry, entry.urls(orientation)) for entry in entries]
+    observed = [asset_id(url) for _, pairs in entry_pairs for _, url in pairs]
+    digests = _entry_digests(entry_pairs)
+    archived = get_archived_urls(digests, save_dir, api_ver, digests)
+    jobs = []
+    for entry, pairs in entry_pairs:
+        for label, url in pairs:
+            # Assets queued by an earlier locale (or twice in this one) count as downloaded
+            if url in archived or not pipeline.claim(url):
+                if verbose:
+                    rprint(f"ℹ️ [gray]Already downloaded:[/gray] {url}")
+                already_downloaded += 1
+            else:
+                jobs.append((entry, label, url))
 
     if already_downloaded and not verbose:
         rprint(f"ℹ️ [gray]Skipped {already_downloaded} already downloaded image(s).[/gray]")
 
-    if not new_entries:
-        return downloaded, already_downloaded
-
-    # Parallel download + phash
-    workers = min(len(new_entries), MAX_DOWNLOAD_WORKERS)
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = [
-            executor.submit(_download_entry, entry, orientation, api_ver, save_dir)
-            for entry in new_entries
-        ]
-        for i, future in enumerate(futures):
-            try:
-                entry, results = future.result()
-            except (requests.exceptions.RequestException, OSError) as exc:
-                rprint(f"⚠️ [yellow]Failed to download entry {i + 1}: {exc}[/yellow]")
-                continue
-            for url, path, filename, phash in results:
-                add_image_url_to_db(url, phash, filename, save_dir=save_dir)
-                if embed_exif and locale != "all":
-                    set_exif_metadata_exiftool(
-                        path,
-                        title=entry.get("title") or entry.get("picture_title"),
-                        copyright_text=entry.get("copyright"),
-                        caption_title=entry.get("caption_title"),
-                        caption_description=entry.get("caption_description"),
-                        exiftool_path=exiftool_path,
-                        verbose=verbose,
-                    )
-                    rprint("✅ [green]EXIF metadata embedded[/green]")
-                if verbose:
-                    rprint(
-                        f"✅ [green]LOG: [download_multiple_for_locale]"
-                        f"Downloaded entry {i + 1}:[/green] {url}"
-                    )
-                downloaded += 1
-    return downloaded, already_downloaded
+    pipeline.submit(locale, jobs, already_downloaded, on_done)
+    return observed
 
 
 def download_multiple(
@@ -317,64 +363,126 @@ def download_multiple(
     save_dir=None,
     embed_exif=True,
     exiftool_path=None,
+    every_locale=False,
+    locales=None,
+    on_locale_done=None,
+    pipeline=None,
 ):
     """
     Download multiple images (all entries) from the specified API version.
-    Returns the number of images downloaded.
+    With locale "all", the given locales are queried, or by default only one
+    locale per learned equivalence class (others now and then) unless
+    every_locale is set; on_locale_done(locale, downloaded, already_downloaded)
+    is called as each of them completes.
+    New images go through pipeline (a DownloadPipeline kept for the whole run)
+    or, by default, one created for this call.
+    Returns {"downloaded", "already_downloaded", "locales", "observed"}, where
+    "locales" maps each locale queried to its number of new images and
+    "observed" lists the asset ids of every image the API returned.
     """
 
     all_locales = get_locale_codes(api_ver, save_dir)
     locale = locale.lower()
 
     if locale == "all":
-        embed_exif = False
+        if locales is None:
+            locales = sweep_locales(
+                all_locales, api_ver, save_dir, every_locale, verbose
+            )
+    else:
+        all_locales_lower = [l.lower() for l in all_locales]
+        if locale not in all_locales_lower:
+            rprint(
+                f"❗ [red]Locale '{locale}' is not valid.[/red] Use one of: {', '.join(all_locales)}"
+            )
+            return {
+                "downloaded": 0,
+                "already_downloaded": 0,
+                "locales": {},
+                "observed": [],
+            }
+        # Use the correctly-cased locale from all_locales
+        locales = [all_locales[all_locales_lower.index(locale)]]
+
+    status = {
+        "downloaded": 0,
+        "already_downloaded": 0,
+        "locales": {},
+        "observed": [],
+    }
+
+    def _locale_done(loc, downloaded, already_downloaded):
+        # Called by the pipeline's workers, one locale at a time
+        status["downloaded"] += downloaded
+        status["already_downloaded"] += already_downloaded
+        status["locales"][loc] = downloaded
+        if on_locale_done is not None:
+            on_locale_done(loc, downloaded, already_downloaded)
+
+    own_pipeline = pipeline is None
+    if own_pipeline:
+        pipeline = DownloadPipeline(
+            api_ver, orientation, save_dir, embed_exif, exiftool_path, verbose
+        )
+    try:
         chunk_size = 15
-        total_downloaded = 0
-        total_already_downloaded = 0
-        for chunk_index, i in enumerate(range(0, len(all_locales), chunk_size)):
-            chunk = all_locales[i : i + chunk_size]
+        for i in range(0, len(locales), chunk_size):
+            chunk = locales[i : i + chunk_size]
             for loc in chunk:
-                if verbose:
+                if verbose and locale == "all":
                     rprint(f"ℹ️ [gray]LOG: [download_multiple]--- {loc} ---[/gray]")
-                downloaded, already_downloaded = retry_operation(
-                    api_ver,
-                    loc,
-                    orientation,
-                    verbose,
-                    operation=_download_multiple_for_locale,
-                    save_dir=save_dir,
-                    exiftool_path=exiftool_path,
-                    embed_exif=embed_exif,
+                try:
+                    status["observed"].extend(
+                        retry_operation(
+                            api_ver,
+                            loc,
+                            orientation,
+                            verbose,
+                            operation=_download_multiple_for_locale,
+                            save_dir=save_dir,
+                            pipeline=pipeline,
+                            on_done=_locale_done,
+                        )
+                    )
+                except requests.exceptions.RequestException as exc:
+                    if locale != "all":
+                        raise
+                    # Permanent errors and open circuits are not retried: move on
+                    rprint(f"⚠️ [yellow]Locale {loc} failed: {exc}[/yellow]")
+            if i + chunk_size < len(locales):
+                rprint(
+                    f"ℹ️ [gray]Locales {i + len(chunk)}/{len(locales)} done. "
+                    f"Request rate: {format_rate_stats()}[/gray]"
                 )
-                total_downloaded += downloaded
-                total_already_downloaded += already_downloaded
-            if i + chunk_size < len(all_locales):
-                max_delay = 180  # maximum delay in seconds
-                delay = min(5 * (chunk_index + 1), max_delay)
-                inline_countdown(delay)
-
-        if report_duplicates(save_dir):
-            rprint(
-                f"⚠️ [yellow]Potential duplicates found.[/yellow] Reports are written to [orange]{get_report_path(save_dir)}[/orange]"
-            )
-        return {
-            "downloaded": total_downloaded,
-            "already_downloaded": total_already_downloaded,
-        }
+        pipeline.join()
+    finally:
+        if own_pipeline:
+            pipeline.close()
 
-    all_locales_lower = [l.lower() for l in all_locales]
-    if locale not in all_locales_lower:
+    if locale == "all" and report_duplicates(save_dir):
         rprint(
-            f"❗ [red]Locale '{locale}' is not valid.[/red] Use one of: {', '.join(all_locales)}"
+            f"⚠️ [yellow]Potential duplicates found.[/yellow] Reports are written to [orange]{get_report_path(save_dir)}[/orange]"
         )
-        return {"downloaded": 0, "already_downloaded": 0}
+    return status
 
-    # Use the correctly-cased locale from all_locales
-    real_locale = all_locales[all_locales_lower.index(locale)]
-    downloaded, already_downloaded = _download_multiple_for_locale(
-        api_ver, real_locale, orientation, verbose, save_dir, embed_exif, exiftool_path
+
+def _checkpoint_locale(checkpoint, progress, locale, downloaded, already_downloaded):
+    """on_locale_done callback: record a completed locale in the round checkpoint."""
+    progress["done"][locale] = [downloaded, already_downloaded]
+    checkpoint.save(progress)
+
+
+def _wait_after_failed_call(failures):
+    """
+    Pause after the given number of consecutive calls in which no locale could
+    be fetched: until an open circuit lets a trial request through, or else
+    with the retry backoff.
+    """
+    delay = get_open_circuit_wait() or DEFAULT_RETRY_POLICY.backoff(failures - 1)
+    rprint(
+        f"⚠️ [yellow]No locale could be fetched, waiting {delay:.1f} seconds before the next call[/yellow]"
     )
-    return {"downloaded": downloaded, "already_downloaded": already_downloaded}
+    wait_with_countdown(delay)
 
 
 def download_multiple_until_exhausted(
@@ -386,53 +494,209 @@ def download_multiple_until_exhausted(
     embed_exif=True,
     exiftool_path=None,
     max_consecutive=CONSECUTIVE_MAX,
+    engine="threads",
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    max_per_host=DEFAULT_MAX_PER_HOST,
+    every_locale=False,
+    scheduler=DEFAULT_LOCALE_SCHEDULER,
+    stop_below=DEFAULT_STOP_BELOW,
+    restart=False,
 ):
     """
-    Repeatedly call download_multiple until all images are already downloaded
-    for max_consecutive times in a row. Delays between every 10 calls to avoid rate limiting.
+    Repeatedly call download_multiple until the expected number of new images
+    per API call (see UnseenEstimator) drops below stop_below, after at least
+    MIN_ROUNDS_BEFORE_STOP calls, or until all images are already downloaded for
+    max_consecutive times in a row. stop_below=0 keeps only the latter rule.
+    Pacing is left to the shared rate limiter, whose current rate is reported
+    every 10 calls.
+    With engine="async", each call runs through download_multiple_async instead.
+    Only the first call may be served from the API response cache: each later
+    call needs a fresh batch from the API.
+    A call in which no locale could be fetched (for example while the API
+    host's circuit is open) is not counted: the loop waits and tries again.
+    With locale "all", new images per locale are recorded in the database;
+    scheduler="bandit" queries a LocaleScheduler-chosen subset of locales each
+    call instead of sweeping all of them.
+    With locale "all", progress is checkpointed in .cache/checkpoints (totals
+    after each call, completed locales during a call), so an interrupted run
+    resumes where it stopped unless restart is set.
     """
-    consecutive = 0
-    call_count = 0
-    delays = [5, 10, 15, 20, 30, 45, 60, 90, 120, 180]  # seconds
-    total_downloaded = 0
-    total_already_downloaded = 0
-    while consecutive < max_consecutive:
-        time.sleep(2)
-        try:
-            status = download_multiple(
-                api_ver,
-                locale,
-                orientation,
-                verbose=verbose,
-                save_dir=save_dir,
-                embed_exif=embed_exif,
-                exiftool_path=exiftool_path,
-            )
-        except requests.exceptions.RequestException as e:
-            rprint(f"⚠️ [yellow]Network error, retrying: {e}[/yellow]")
-            call_count += 1
-            continue
-        downloaded = status.get("downloaded", 0)
-        already_downloaded = status.get("already_downloaded", 0)
-        total_downloaded += downloaded
-        total_already_downloaded += already_downloaded
-        if downloaded == 0 and already_downloaded > 0:
-            consecutive += 1
-            rprint(
-                f"😐 [powderblue]Number of consecutive calls with no new downloads:[/powderblue] [orange]{consecutive}/{max_consecutive}[/orange]"
-            )
-        else:
-            consecutive = 0
-
-        call_count += 1
+    # Take a fresh listing of the save directories for this run
+    refresh_saved_files()
+    cache_mode = get_api_cache_mode()
+    cache_ttl = get_api_cache_ttl()
+    locale_scheduler = None
+    run_checkpoint = round_checkpoint = None
+    if locale.lower() == "all":
+        locale_scheduler = LocaleScheduler(api_ver, save_dir)
+        name = f"download_v{api_ver}_{orientation}"
+        params = {"api_ver": api_ver, "orientation": orientation}
+        run_checkpoint = CrawlCheckpoint(name, save_dir, **params)
+        round_checkpoint = CrawlCheckpoint(f"{name}_round", save_dir, **params)
+        if restart:
+            run_checkpoint.clear()
+            round_checkpoint.clear()
+    saved = run_checkpoint.load() if run_checkpoint is not None else None
+    if saved:
+        estimator = UnseenEstimator.from_dict(saved["estimator"])
+        consecutive = saved["consecutive"]
+        call_count = saved["round"]
+        total_downloaded = saved["downloaded"]
+        total_already_downloaded = saved["already_downloaded"]
+        rprint(
+            f"⏯️ [powderblue]Resuming an interrupted run after {call_count} call(s)[/powderblue] "
+            "(use --restart to start over)"
+        )
+    else:
+        estimator = UnseenEstimator()
+        consecutive = 0
+        call_count = 0
+        total_downloaded = 0
+        total_already_downloaded = 0
+    failures = 0
+    # One pipeline for the whole run, so its stages never start cold
+    pipeline = (
+        DownloadPipeline(
+            api_ver, orientation, save_dir, embed_exif, exiftool_path, verbose
+        )
+        if engine != "async"
+        else None
+    )
+    try:
+        while consecutive < max_consecutive:
+            round_locales = None
+            progress = None
+            on_locale_done = None
+            if round_checkpoint is not None:
+                progress = round_checkpoint.load()
+                if progress and progress["round"] == call_count:
+                    round_locales = [
+                        loc for loc in progress["locales"] if loc not in progress["done"]
+                    ]
+                    rprint(
+                        f"⏯️ [powderblue]Resuming the interrupted call:[/powderblue] "
+                        f"{len(progress['done'])}/{len(progress['locales'])} locales already done"
+                    )
+                else:
+                    round_locales = sweep_locales(
+                        get_locale_codes(api_ver, save_dir),
+                        api_ver,
+                        save_dir,
+                        every_locale,
+                        verbose,
+                    )
+                    if scheduler == "bandit":
+                        round_locales = locale_scheduler.choose(round_locales)
+                    progress = {"round": call_count, "locales": round_locales, "done": {}}
+                    round_checkpoint.save(progress)
+                on_locale_done = partial(_checkpoint_locale, round_checkpoint, progress)
+            try:
+                if engine == "async":
+                    status = download_multiple_async(
+                        api_ver,
+                        locale,
+                        orientation,
+                        verbose=verbose,
+                        save_dir=save_dir,
+                        embed_exif=embed_exif,
+                        exiftool_path=exiftool_path,
+                        max_concurrency=max_concurrency,
+                        max_per_host=max_per_host,
+                        every_locale=every_locale,
+                        locales=round_locales,
+                        on_locale_done=on_locale_done,
+                    )
+                else:
+                    status = download_multiple(
+                        api_ver,
+                        locale,
+                        orientation,
+                        verbose=verbose,
+                        save_dir=save_dir,
+                        embed_exif=embed_exif,
+                        exiftool_path=exiftool_path,
+                        every_locale=every_locale,
+                        locales=round_locales,
+                        on_locale_done=on_locale_done,
+                        pipeline=pipeline,
+                    )
+            except requests.exceptions.RequestException as e:
+                rprint(f"⚠️ [yellow]Network error, retrying: {e}[/yellow]")
+                failures += 1
+                _wait_after_failed_call(failures)
+                continue
+            finally:
+                if cache_mode == "use":
+                    set_api_cache("refresh", save_dir, cache_ttl)
+            if round_locales and not status.get("locales"):
+                # Every locale failed: keep the round checkpoint and try it again
+                failures += 1
+                _wait_after_failed_call(failures)
+                continue
+            failures = 0
+            if progress is not None:
+                # Count the locales done before an interruption too
+                done = progress["done"]
+                status["downloaded"] = sum(new for new, _ in done.values())
+                status["already_downloaded"] = sum(already for _, already in done.values())
+                status["locales"] = {loc: new for loc, (new, _) in done.items()}
+            if locale_scheduler is not None:
+                locale_scheduler.update(status.get("locales", {}))
+            downloaded = status.get("downloaded", 0)
+            already_downloaded = status.get("already_downloaded", 0)
+            total_downloaded += downloaded
+            total_already_downloaded += already_downloaded
+            if downloaded == 0 and already_downloaded > 0:
+                consecutive += 1
+                rprint(
+                    f"😐 [powderblue]Number of consecutive calls with no new downloads:[/powderblue] [orange]{consecutive}/{max_consecutive}[/orange]"
+                )
+            else:
+                consecutive = 0
 
-        if call_count % 10 == 0 and consecutive < max_consecutive:
-            delay = (
-                delays[min(call_count // 10 - 1, len(delays) - 1)]
-                if call_count // 10 <= len(delays)
-                else 180
+            call_count += 1
+            estimator.update(
+                status.get("observed", []), len(status.get("locales", {})), downloaded
             )
-            inline_countdown(delay)
+            rprint(f"📈 [gray]Estimate: {estimator.format()}[/gray]")
+            if run_checkpoint is not None:
+                run_checkpoint.save(
+                    {
+                        "round": call_count,
+                        "consecutive": consecutive,
+                        "downloaded": total_downloaded,
+                        "already_downloaded": total_already_downloaded,
+                        "estimator": estimator.as_dict(),
+                    }
+                )
+                round_checkpoint.clear()
+            if (
+                stop_below > 0
+                and call_count >= MIN_ROUNDS_BEFORE_STOP
+                and estimator.expected_new_per_call() < stop_below
+            ):
+                rprint(
+                    f"🛑 [powderblue]Expected new images per call fell below "
+                    f"{stop_below}, stopping.[/powderblue]"
+                )
+                break
+
+            if call_count % 10 == 0 and consecutive < max_consecutive:
+                rprint(f"ℹ️ [gray]Request rate: {format_rate_stats()}[/gray]")
+                rprint(f"ℹ️ [gray]Connections: {format_connection_stats()}[/gray]")
+                if pipeline is not None:
+                    rprint(f"ℹ️ [gray]Pipeline: {pipeline.format_stats()}[/gray]")
+                if locale_scheduler is not None:
+                    rprint(f"ℹ️ [gray]Yield: {locale_scheduler.format_yield()}[/gray]")
+                seen_stats = get_seen_url_stats(save_dir, api_ver)
+                if verbose and seen_stats:
+                    rprint(f"ℹ️ [gray]LOG: Seen-URL set: {format_memory_stats(seen_stats)}[/gray]")
+    finally:
+        if pipeline is not None:
+            pipeline.close()
+    set_api_cache(cache_mode, save_dir, cache_ttl)
+    if run_checkpoint is not None:
+        run_checkpoint.clear()
 
     rprint(
         f"[bold magenta]=== Result ===[/bold magenta]\n"
@@ -440,6 +704,11 @@ def download_multiple_until_exhausted(
         f"✨ [green]New images downloaded:[/green] [orange]{total_downloaded}[/orange]\n"
         f"🆗 [green]Already downloaded:[/green] [orange]{total_already_downloaded}[/orange]"
     )
+    if locale_scheduler is not None:
+        rprint(f"ℹ️ [gray]Yield: {locale_scheduler.format_yield()}[/gray]")
+    rprint(f"ℹ️ [gray]Connections: {format_connection_stats()}[/gray]")
+    if pipeline is not None:
+        rprint(f"ℹ️ [gray]Pipeline: {pipeline.format_stats()}[/gray]")
 
     if report_duplicates(save_dir):
         rprint(
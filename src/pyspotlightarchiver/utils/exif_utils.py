@@ -1,13 +1,34 @@
-"""Module to set EXIF metadata using exiftool."""
+"""Module to set EXIF metadata, natively or using exiftool."""
 
+import atexit
+import functools
+import itertools
+import queue
 import subprocess
 import shutil
 import os
 import platform
-import tempfile
+import threading
 from rich import print as rprint
 
+from pyspotlightarchiver.defaults import (
+    DEFAULT_EXIF_WRITER,
+    DEFAULT_EXIFTOOL_WORKERS,
+    EXIF_WRITERS,
+)
+from pyspotlightarchiver.utils.native_exif import write_jpeg_metadata
 
+# Commands written to one exiftool process before reading their results back,
+# small enough that neither pipe buffer can fill up and deadlock
+_PIPELINE_DEPTH = 32
+
+_exif_writer = DEFAULT_EXIF_WRITER
+_exiftool_workers = DEFAULT_EXIFTOOL_WORKERS
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
 def _exiftool_exists(exiftool_path=None):
     if exiftool_path:
         # If a directory is provided, look for exiftool executable inside it
@@ -32,26 +53,141 @@ def _exiftool_exists(exiftool_path=None):
     return shutil.which("exiftool")
 
 
-def set_exif_metadata_exiftool(
-    image_path,
-    title=None,
-    copyright_text=None,
-    caption_title=None,
-    caption_description=None,
-    exiftool_path=None,
-    verbose=False,
-):
-    """Method to set EXIF metadata using exiftool.
-    Args:
-        image_path (str): The path to the image file.
-        title (str): The title of the image.
-        copyright_text (str): The copyright text of the image.
-        caption_title (str): The title of the caption (v4 only). Stored as comment.
-        caption_description (str): The description of the caption (v4 only). Stored as comment.
-        exiftool_path (str): The path to the exiftool executable or directory containing it.
+class ExifToolProcess:
+    """A long-lived `exiftool -stay_open True -@ -` process.
+
+    Arguments are written to stdin one per line and each command is terminated
+    with -executeNUM; exiftool answers with its output followed by {readyNUM}.
     """
-    exiftool_cmd = _exiftool_exists(exiftool_path)
 
+    def __init__(self, exiftool_cmd):
+        self._counter = itertools.count(1)
+        self.process = subprocess.Popen(
+            [exiftool_cmd, "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            encoding="utf-8",
+        )
+
+    def _read_until(self, sentinel):
+        lines = []
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError("exiftool exited unexpectedly")
+            if line.rstrip() == sentinel:
+                return "".join(lines)
+            lines.append(line)
+
+    def execute_many(self, arg_sets):
+        """Run several commands, pipelining them. Returns one output string per command."""
+        outputs = []
+        for start in range(0, len(arg_sets), _PIPELINE_DEPTH):
+            nums = []
+            payload = []
+            for args in arg_sets[start : start + _PIPELINE_DEPTH]:
+                num = next(self._counter)
+                nums.append(num)
+                payload.append("\n".join(args) + f"\n-execute{num}\n")
+            self.process.stdin.write("".join(payload))
+            self.process.stdin.flush()
+            outputs.extend(self._read_until(f"{{ready{num}}}") for num in nums)
+        return outputs
+
+    def close(self):
+        """Ask exiftool to exit, killing it if it does not."""
+        try:
+            self.process.stdin.write("-stay_open\nFalse\n")
+            self.process.stdin.flush()
+            self.process.wait(timeout=10)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class ExifToolPool:
+    """A fixed-size pool of ExifToolProcess workers, started on first use."""
+
+    def __init__(self, exiftool_cmd, workers=DEFAULT_EXIFTOOL_WORKERS):
+        self.exiftool_cmd = exiftool_cmd
+        self.workers = max(1, workers)
+        self._idle = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if len(self._all) < self.workers:
+                    worker = ExifToolProcess(self.exiftool_cmd)
+                    self._all.append(worker)
+                    return worker
+            try:
+                # Time out now and then in case a broken worker freed a slot
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def execute_many(self, arg_sets):
+        """Run a batch of commands on one worker. Returns the outputs in order."""
+        worker = self._acquire()
+        try:
+            outputs = worker.execute_many(arg_sets)
+        except (OSError, RuntimeError):
+            # Drop a broken worker so a later batch starts a fresh process
+            with self._lock:
+                self._all.remove(worker)
+            worker.close()
+            raise
+        self._idle.put(worker)
+        return outputs
+
+    def execute_batches(self, arg_sets):
+        """Spread commands over all workers in parallel. Returns the outputs in order."""
+        if len(arg_sets) <= 1 or self.workers == 1:
+            return self.execute_many(arg_sets)
+        size = -(-len(arg_sets) // self.workers)
+        chunks = [arg_sets[i : i + size] for i in range(0, len(arg_sets), size)]
+        results = [None] * len(chunks)
+        errors = []
+
+        def _run(index):
+            try:
+                results[index] = self.execute_many(chunks[index])
+            except (OSError, RuntimeError) as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=_run, args=(i,)) for i in range(len(chunks))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            raise errors[0]
+        return [output for chunk in results for output in chunk]
+
+    def close(self):
+        """Stop every worker process."""
+        with self._lock:
+            workers, self._all = self._all, []
+        for worker in workers:
+            worker.close()
+
+
+def set_exiftool_workers(workers):
+    """Set the number of exiftool processes used by pools created from now on."""
+    global _exiftool_workers  # pylint: disable=global-statement
+    _exiftool_workers = max(1, workers)
+
+
+def get_exiftool_pool(exiftool_path=None):
+    """Return the shared pool for the resolved exiftool, or None if it cannot be found."""
+    exiftool_cmd = _exiftool_exists(exiftool_path)
     if not exiftool_cmd:
         if exiftool_path:
             rprint(
@@ -61,15 +197,56 @@ def set_exif_metadata_exiftool(
             rprint(
                 "❌ [red]ExifTool cannot be found. Please install it from https://exiftool.org/, or specify the path with --exiftool-path.[/red]"
             )
-        return
+        return None
+    with _pools_lock:
+        pool = _pools.get(exiftool_cmd)
+        if pool is None:
+            pool = ExifToolPool(exiftool_cmd, _exiftool_workers)
+            _pools[exiftool_cmd] = pool
+        return pool
+
+
+@atexit.register
+def shutdown_exiftool_pools():
+    """Stop all exiftool processes. Registered to run at interpreter exit."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
 
-    args = [exiftool_cmd, "-overwrite_original", "-charset", "utf8"]
+
+def exif_fields(entry):
+    """Map a v3/v4 SpotlightEntry to the keyword arguments of the EXIF writers."""
+    return {
+        "title": entry.title,
+        "copyright_text": entry.copyright_text,
+        "caption_title": entry.caption_title,
+        "caption_description": entry.caption_description,
+    }
+
+
+def _escape(value):
+    """Escape a value for an argfile line; exiftool unescapes it because of -ec."""
+    return value.replace("\\", "\\\\").replace("\r", "\\r").replace("\n", "\\n")
+
+
+def _build_exiftool_args(
+    image_path,
+    title=None,
+    copyright_text=None,
+    caption_title=None,
+    caption_description=None,
+    verbose=False,
+):
+    """Build the argfile lines for one image (without the exiftool executable)."""
+    args = ["-overwrite_original", "-charset", "utf8", "-ec"]
     if title:
-        args.append(f"-ImageDescription={title}")
+        args.append(f"-ImageDescription={_escape(title)}")
         if verbose:
             rprint(f"ℹ️ [gray]LOG: [exiftool] Title:[/gray] {title}")
     if copyright_text:
-        args.append(f"-Copyright={copyright_text}")
+        args.append(f"-Copyright={_escape(copyright_text)}")
         if verbose:
             rprint(f"ℹ️ [gray]LOG: [exiftool] Copyright:[/gray] {copyright_text}")
     if caption_title or caption_description:
@@ -80,32 +257,126 @@ def set_exif_metadata_exiftool(
             if comment:
                 comment += "\n\n"
             comment += f"Description: {caption_description}"
-
-        # Write comment to a temporary file (UTF-8 encoding)
-        with tempfile.NamedTemporaryFile(
-            "w", delete=False, encoding="utf-8", suffix=".txt"
-        ) as tf:
-            tf.write(comment)
-            temp_comment_path = tf.name
-
-        args.append(f"-UserComment<={temp_comment_path}")
-        args.append(f"-XPComment<={temp_comment_path}")
+        # Comments span lines, which the argfile only accepts escaped
+        args.append(f"-UserComment={_escape(comment)}")
+        args.append(f"-XPComment={_escape(comment)}")
         if verbose:
             rprint(f"ℹ️ [gray]LOG: [exiftool] Comment:[/gray] {comment}")
-    else:
-        temp_comment_path = None
-
     args.append(image_path)
+    return args
+
+
+def _written(output):
+    """True if exiftool reported the image as updated."""
+    return "1 image files updated" in output
+
 
+def set_exif_metadata_batch(jobs, exiftool_path=None, verbose=False):
+    """Write EXIF metadata for many images through the shared exiftool pool.
+    Args:
+        jobs (list): (image_path, fields) pairs, fields as returned by exif_fields().
+        exiftool_path (str): The path to the exiftool executable or directory containing it.
+    Returns the number of images written.
+    """
+    if not jobs:
+        return 0
+    pool = get_exiftool_pool(exiftool_path)
+    if pool is None:
+        return 0
+    arg_sets = [
+        _build_exiftool_args(path, verbose=verbose, **fields) for path, fields in jobs
+    ]
     try:
-        result = subprocess.run(args, capture_output=True, text=True, check=True)
-        if verbose:
-            rprint(
-                f"✅ [green]LOG: [exiftool] EXIF metadata written to:[/green] {image_path} using exiftool. Output: {result.stdout}"
-            )
-    except subprocess.CalledProcessError as e:
-        if verbose:
-            rprint(f"❌ [red]LOG: [exiftool] ExifTool error:[/red] {e.stderr}")
-    except Exception as e:  # pylint: disable=broad-exception-caught
-        # We don't know what kind of exception until runtime
+        outputs = pool.execute_batches(arg_sets)
+    except (OSError, RuntimeError) as e:
         rprint(f"❌ [red]LOG: [exiftool] Unexpected error ({type(e).__name__}):[/red] {e}")
+        return 0
+    written = 0
+    for (path, _), output in zip(jobs, outputs):
+        if _written(output):
+            written += 1
+            if verbose:
+                rprint(
+                    f"✅ [green]LOG: [exiftool] EXIF metadata written to:[/green] {path} using exiftool. Output: {output}"
+                )
+        elif verbose:
+            rprint(f"❌ [red]LOG: [exiftool] ExifTool error:[/red] {output}")
+    return written
+
+
+def set_exif_metadata_exiftool(
+    image_path,
+    title=None,
+    copyright_text=None,
+    caption_title=None,
+    caption_description=None,
+    exiftool_path=None,
+    verbose=False,
+):
+    """Method to set EXIF metadata using exiftool.
+    Args:
+        image_path (str): The path to the image file.
+        title (str): The title of the image.
+        copyright_text (str): The copyright text of the image.
+        caption_title (str): The title of the caption (v4 only). Stored as comment.
+        caption_description (str): The description of the caption (v4 only). Stored as comment.
+        exiftool_path (str): The path to the exiftool executable or directory containing it.
+    Returns True if the metadata was written.
+    """
+    fields = {
+        "title": title,
+        "copyright_text": copyright_text,
+        "caption_title": caption_title,
+        "caption_description": caption_description,
+    }
+    return (
+        set_exif_metadata_batch(
+            [(image_path, fields)], exiftool_path=exiftool_path, verbose=verbose
+        )
+        == 1
+    )
+
+
+def set_exif_writer(writer):
+    """Select the EXIF writer: 'native' (built-in, exiftool as fallback) or 'exiftool'."""
+    global _exif_writer  # pylint: disable=global-statement
+    if writer not in EXIF_WRITERS:
+        raise ValueError(f"Unknown EXIF writer '{writer}'")
+    _exif_writer = writer
+
+
+def embed_exif_metadata_batch(jobs, exiftool_path=None, verbose=False):
+    """Write EXIF metadata for many images with the selected writer.
+    Args:
+        jobs (list): (image_path, fields) pairs, fields as returned by exif_fields().
+        exiftool_path (str): The path to the exiftool executable or directory containing it.
+    With the native writer, images it cannot handle fall back to exiftool.
+    Returns the number of images written.
+    """
+    if _exif_writer == "exiftool":
+        return set_exif_metadata_batch(jobs, exiftool_path=exiftool_path, verbose=verbose)
+    written = 0
+    fallback = []
+    for path, fields in jobs:
+        try:
+            if write_jpeg_metadata(path, **fields):
+                written += 1
+                if verbose:
+                    rprint(f"✅ [green]LOG: [exif] EXIF metadata written to:[/green] {path}")
+        except (OSError, ValueError) as e:
+            if verbose:
+                rprint(f"ℹ️ [gray]LOG: [exif] Native writer failed ({e}), using exiftool:[/gray] {path}")
+            fallback.append((path, fields))
+    return written + set_exif_metadata_batch(
+        fallback, exiftool_path=exiftool_path, verbose=verbose
+    )
+
+
+def embed_exif_metadata(image_path, fields, exiftool_path=None, verbose=False):
+    """Write EXIF metadata for one image with the selected writer. Returns True if written."""
+    return (
+        embed_exif_metadata_batch(
+            [(image_path, fields)], exiftool_path=exiftool_path, verbose=verbose
+        )
+        == 1
+    )
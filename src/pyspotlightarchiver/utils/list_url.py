@@ -1,12 +1,14 @@
 """Module to list URLs for a given API version, locale, and orientation"""
 
+import requests
 from rich import print as rprint
 
 from pyspotlightarchiver.helpers.v3_helper import v3_helper
 from pyspotlightarchiver.helpers.v4_helper import v4_helper
 from pyspotlightarchiver.helpers.retry_helper import retry_operation
 from pyspotlightarchiver.utils.locale_data import get_locale_codes
-from pyspotlightarchiver.utils.countdown import inline_countdown
+from pyspotlightarchiver.helpers.rate_limiter import format_rate_stats
+from pyspotlightarchiver.helpers.checkpoint import CrawlCheckpoint
 
 
 def print_results(results, orientation, verbose=False):
@@ -14,13 +16,7 @@ def print_results(results, orientation, verbose=False):
     if verbose:
         rprint(f"ℹ️ [gray]LOG: [list_url]Found {len(results)} URLs[/gray]")
     for entry in results:
-        if orientation == "both":
-            rprint(
-                entry.get("image_url_landscape"),
-                entry.get("image_url_portrait"),
-            )
-        else:
-            rprint(entry.get("image_url"))
+        rprint(*(url for _, url in entry.urls(orientation)))
     rprint(f"✅ [green]Found {len(results)} URLs[/green]")
 
 
@@ -31,27 +27,81 @@ def get_results(api_ver, locale, orientation):
     return v4_helper(locale=locale, orientation=orientation)
 
 
-def process_all_locales(api_ver, all_locales, orientation, verbose):
-    """Process all locales in chunks to avoid rate limiting"""
+def process_all_locales(
+    api_ver, all_locales, orientation, verbose, restart=False, save_dir=None
+):
+    """
+    Process all locales in chunks, reporting the request rate after each chunk.
+    Completed locales are checkpointed in .cache/checkpoints (in save_dir, or
+    the current directory), so an interrupted listing resumes after the last
+    completed locale unless restart is set.
+    Returns the number of URLs found.
+    """
+    checkpoint = CrawlCheckpoint(
+        f"list-url_v{api_ver}_{orientation}",
+        save_dir,
+        api_ver=api_ver,
+        orientation=orientation,
+    )
+    if restart:
+        checkpoint.clear()
+    state = checkpoint.load()
+    if state:
+        rprint(
+            f"⏯️ [powderblue]Resuming an interrupted listing:[/powderblue] "
+            f"{len(state['done'])}/{len(state['locales'])} locales already listed "
+            "(use --restart to start over)"
+        )
+    else:
+        state = {"locales": all_locales, "done": [], "urls": 0}
+    done = set(state["done"])
+    locales = [loc for loc in state["locales"] if loc not in done]
+
+    failed = 0
     chunk_size = 15
-    for chunk_index, i in enumerate(range(0, len(all_locales), chunk_size)):
-        chunk = all_locales[i : i + chunk_size]
+    for i in range(0, len(locales), chunk_size):
+        chunk = locales[i : i + chunk_size]
         for loc in chunk:
             if verbose:
                 rprint(f"ℹ️ [gray]LOG: [list_url]--- {loc} ---[/gray]")
-            results = retry_operation(api_ver, loc, orientation, operation=get_results)
+            try:
+                results = retry_operation(
+                    api_ver, loc, orientation, operation=get_results
+                )
+            except requests.exceptions.RequestException as exc:
+                # Left out of the checkpoint, so running again retries it
+                rprint(f"⚠️ [yellow]Locale {loc} failed: {exc}[/yellow]")
+                failed += 1
+                continue
             print_results(results, orientation)
+            state["done"].append(loc)
+            state["urls"] += len(results)
+            checkpoint.save(state)
 
-        # Calculate delay: group = chunk_index // 10, delay = 5 * (chunk_index + 1)
-        if i + chunk_size < len(all_locales):
-            max_delay = 180  # maximum delay in seconds
-            delay = min(5 * (chunk_index + 1), max_delay)
-            inline_countdown(delay)
+        # Pacing is handled by the shared rate limiter in http_get
+        if i + chunk_size < len(locales):
+            rprint(
+                f"ℹ️ [gray]Locales {len(state['done'])}/{len(state['locales'])} done. "
+                f"Request rate: {format_rate_stats()}[/gray]"
+            )
+    if failed:
+        checkpoint.save(state)
+        rprint(
+            f"⚠️ [yellow]{failed} locale(s) failed.[/yellow] "
+            "Run the same command again to retry only those."
+        )
+    else:
+        checkpoint.clear()
+    return state["urls"]
 
 
-def list_url(api_ver, locale, orientation, verbose=False):
-    """List URLs for a given API version, locale, and orientation"""
-    all_locales = get_locale_codes(api_ver)
+def list_url(api_ver, locale, orientation, verbose=False, restart=False, save_dir=None):
+    """
+    List URLs for a given API version, locale, and orientation.
+    restart discards the checkpoint of an interrupted --locale all listing.
+    save_dir selects the .cache directory (locales, checkpoints), as with download.
+    """
+    all_locales = get_locale_codes(api_ver, save_dir)
     locale = locale.lower()
     orientation = orientation.lower()
 
@@ -60,7 +110,9 @@ def list_url(api_ver, locale, orientation, verbose=False):
     rprint("ℹ️ [gray]Listing URLs...[/gray]")
 
     if locale == "all":
-        process_all_locales(api_ver, all_locales, orientation, verbose)
+        total_urls = process_all_locales(
+            api_ver, all_locales, orientation, verbose, restart, save_dir
+        )
     else:
         if locale not in [l.lower() for l in all_locales]:
             rprint(
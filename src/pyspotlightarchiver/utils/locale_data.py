@@ -3,13 +3,16 @@
 import json
 import os
 import re
-from babel import localedata
-from babel.core import Locale, UnknownLocaleError
 from pyspotlightarchiver.utils.exclude_locale import is_excluded
 
 
 def generate_locale_codes():
     """Generate all valid xx-XX locale codes."""
+    # babel is only needed when the locale cache has to be (re)built
+    # pylint: disable=import-outside-toplevel
+    from babel import localedata
+    from babel.core import Locale, UnknownLocaleError
+
     pattern = re.compile(r"^[a-z]{2}-[A-Z]{2}$")
     locale_codes = set()
 
@@ -0,0 +1,301 @@
+"""Module to write EXIF and XMP metadata into JPEG files without external tools."""
+
+import os
+import shutil
+import struct
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+EXIF_HEADER = b"Exif\x00\x00"
+XMP_HEADER = b"http://ns.adobe.com/xap/1.0/\x00"
+# Largest payload a JPEG segment can carry (the 2 length bytes count too)
+MAX_SEGMENT_PAYLOAD = 0xFFFF - 2
+
+# TIFF field types
+_BYTE = 1
+_ASCII = 2
+_LONG = 4
+_UNDEFINED = 7
+
+# Tags
+_IMAGE_DESCRIPTION = 0x010E
+_COPYRIGHT = 0x8298
+_EXIF_IFD_POINTER = 0x8769
+_XP_COMMENT = 0x9C9C
+_EXIF_VERSION = 0x9000
+_USER_COMMENT = 0x9286
+
+# The only tags this module writes: EXIF/XMP segments holding anything else
+# came from elsewhere (camera, editor) and are left to exiftool, which merges
+_OWN_IFD0_TAGS = {_IMAGE_DESCRIPTION, _COPYRIGHT, _XP_COMMENT, _EXIF_IFD_POINTER}
+_OWN_EXIF_TAGS = {_EXIF_VERSION, _USER_COMMENT}
+_OWN_XMP_TAGS = {
+    "{http://purl.org/dc/elements/1.1/}description",
+    "{http://purl.org/dc/elements/1.1/}rights",
+    "{http://ns.adobe.com/exif/1.0/}UserComment",
+}
+_RDF = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+
+# Markers
+_SOI = 0xD8
+_SOS = 0xDA
+_APP0 = 0xE0
+_APP1 = 0xE1
+
+
+def _entry_value(field_type, value):
+    """Encode one IFD value. Returns (field type, count, raw bytes)."""
+    if field_type == _ASCII:
+        raw = value.encode("utf-8") + b"\x00"
+        return field_type, len(raw), raw
+    if field_type == _LONG:
+        return field_type, 1, struct.pack("<I", value)
+    return field_type, len(value), value
+
+
+def _build_ifd(entries, offset, next_ifd=0):
+    """
+    Build a little-endian IFD placed at `offset` within the TIFF block.
+    entries is a list of (tag, field type, value), written in tag order.
+    Returns the IFD bytes followed by the out-of-line value area.
+    """
+    entries = sorted(entries)
+    data_offset = offset + 2 + 12 * len(entries) + 4
+    table = [struct.pack("<H", len(entries))]
+    data = []
+    for tag, field_type, value in entries:
+        field_type, count, raw = _entry_value(field_type, value)
+        if len(raw) <= 4:
+            table.append(struct.pack("<HHI", tag, field_type, count) + raw.ljust(4, b"\x00"))
+            continue
+        table.append(struct.pack("<HHII", tag, field_type, count, data_offset))
+        if len(raw) % 2:
+            raw += b"\x00"  # values start on word boundaries
+        data.append(raw)
+        data_offset += len(raw)
+    table.append(struct.pack("<I", next_ifd))
+    return b"".join(table) + b"".join(data)
+
+
+def _user_comment(comment):
+    """Encode an EXIF UserComment with its 8-byte character code prefix."""
+    try:
+        return b"ASCII\x00\x00\x00" + comment.encode("ascii")
+    except UnicodeEncodeError:
+        return b"UNICODE\x00" + comment.encode("utf-16-le")
+
+
+def build_exif_segment(title=None, copyright_text=None, comment=None):
+    """Build the APP1 EXIF payload (including the 'Exif' header). None if nothing to write."""
+    ifd0 = []
+    if title:
+        ifd0.append((_IMAGE_DESCRIPTION, _ASCII, title))
+    if copyright_text:
+        ifd0.append((_COPYRIGHT, _ASCII, copyright_text))
+    exif_ifd = []
+    if comment:
+        ifd0.append((_XP_COMMENT, _BYTE, comment.encode("utf-16-le") + b"\x00\x00"))
+        exif_ifd.append((_EXIF_VERSION, _UNDEFINED, b"0232"))
+        exif_ifd.append((_USER_COMMENT, _UNDEFINED, _user_comment(comment)))
+    if not ifd0:
+        return None
+
+    header = b"II*\x00" + struct.pack("<I", 8)
+    if exif_ifd:
+        # The pointer's value depends on IFD0's size, which does not depend on it
+        ifd0.append((_EXIF_IFD_POINTER, _LONG, 0))
+        exif_offset = 8 + len(_build_ifd(ifd0, 8))
+        ifd0[-1] = (_EXIF_IFD_POINTER, _LONG, exif_offset)
+        tiff = header + _build_ifd(ifd0, 8) + _build_ifd(exif_ifd, exif_offset)
+    else:
+        tiff = header + _build_ifd(ifd0, 8)
+    return EXIF_HEADER + tiff
+
+
+def _xmp_alt(tag, value):
+    return (
+        f"   <{tag}><rdf:Alt><rdf:li xml:lang=\"x-default\">"
+        f"{escape(value)}</rdf:li></rdf:Alt></{tag}>\n"
+    )
+
+
+def build_xmp_segment(title=None, copyright_text=None, comment=None):
+    """Build the APP1 XMP payload (including the namespace header). None if nothing to write."""
+    fields = ""
+    if title:
+        fields += _xmp_alt("dc:description", title)
+    if copyright_text:
+        fields += _xmp_alt("dc:rights", copyright_text)
+    if comment:
+        fields += _xmp_alt("exif:UserComment", comment)
+    if not fields:
+        return None
+    packet = (
+        '<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>\n'
+        '<x:xmpmeta xmlns:x="adobe:ns:meta/">\n'
+        ' <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">\n'
+        '  <rdf:Description rdf:about=""\n'
+        '    xmlns:dc="http://purl.org/dc/elements/1.1/"\n'
+        '    xmlns:exif="http://ns.adobe.com/exif/1.0/">\n'
+        f"{fields}"
+        "  </rdf:Description>\n"
+        " </rdf:RDF>\n"
+        "</x:xmpmeta>\n"
+        '<?xpacket end="w"?>'
+    )
+    return XMP_HEADER + packet.encode("utf-8")
+
+
+def _ifd_tags(tiff, offset, endian):
+    """Read an IFD's entries. Returns ({tag: raw 4-byte value}, next IFD offset)."""
+    (count,) = struct.unpack_from(f"{endian}H", tiff, offset)
+    entries = {}
+    for i in range(count):
+        tag, _, _, value = struct.unpack_from(f"{endian}HHII", tiff, offset + 2 + 12 * i)
+        entries[tag] = value
+    (next_ifd,) = struct.unpack_from(f"{endian}I", tiff, offset + 2 + 12 * count)
+    return entries, next_ifd
+
+
+def _is_own_exif(payload):
+    """True if an EXIF payload only holds tags this module writes."""
+    tiff = payload[len(EXIF_HEADER) :]
+    endian = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if endian is None:
+        return False
+    try:
+        (ifd0_offset,) = struct.unpack_from(f"{endian}I", tiff, 4)
+        ifd0, next_ifd = _ifd_tags(tiff, ifd0_offset, endian)
+        if next_ifd or not ifd0.keys() <= _OWN_IFD0_TAGS:
+            return False  # a thumbnail (IFD1) or foreign tags
+        if _EXIF_IFD_POINTER in ifd0:
+            exif_ifd, _ = _ifd_tags(tiff, ifd0[_EXIF_IFD_POINTER], endian)
+            return exif_ifd.keys() <= _OWN_EXIF_TAGS
+    except struct.error:
+        return False
+    return True
+
+
+def _is_own_xmp(payload):
+    """True if an XMP payload only holds the properties this module writes."""
+    try:
+        root = ET.fromstring(payload[len(XMP_HEADER) :].decode("utf-8").strip())
+    except (ET.ParseError, UnicodeDecodeError):
+        return False
+    for description in root.iter(f"{_RDF}Description"):
+        if set(description.attrib) - {f"{_RDF}about"}:
+            return False
+        if any(child.tag not in _OWN_XMP_TAGS for child in description):
+            return False
+    return True
+
+
+def _segment(marker, payload):
+    if len(payload) > MAX_SEGMENT_PAYLOAD:
+        raise ValueError("Metadata is too large for a single JPEG segment")
+    return struct.pack(">BBH", 0xFF, marker, len(payload) + 2) + payload
+
+
+def _read_header_segments(f):
+    """
+    Read the marker segments that precede the scan data.
+    Returns (segments, sos_marker_bytes): segments is a list of (marker, payload).
+    """
+    if f.read(2) != b"\xff\xd8":
+        raise ValueError("Not a JPEG file")
+    segments = []
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise ValueError("Unexpected end of JPEG header")
+        if byte != b"\xff":
+            raise ValueError("Corrupt JPEG marker")
+        marker = f.read(1)
+        while marker == b"\xff":  # fill bytes
+            marker = f.read(1)
+        if not marker:
+            raise ValueError("Unexpected end of JPEG header")
+        marker = marker[0]
+        if marker == _SOS:
+            return segments, b"\xff\xda"
+        if marker == _SOI or 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            continue  # standalone markers carry no length
+        (length,) = struct.unpack(">H", f.read(2))
+        payload = f.read(length - 2)
+        if len(payload) != length - 2:
+            raise ValueError("Unexpected end of JPEG header")
+        segments.append((marker, payload))
+
+
+def write_jpeg_metadata(
+    image_path,
+    title=None,
+    copyright_text=None,
+    caption_title=None,
+    caption_description=None,
+):
+    """
+    Splice EXIF (ImageDescription, Copyright, UserComment, XPComment) and XMP
+    segments into a JPEG without touching the compressed image data.
+    EXIF/XMP segments written by an earlier call are replaced. The file is
+    rewritten with a single streamed copy into a temp file that atomically
+    replaces the original.
+    Raises ValueError if the file is not a JPEG it can handle, or if it carries
+    other EXIF/XMP metadata (camera, orientation, ...), which exiftool merges
+    instead of dropping.
+    Returns True if anything was written.
+    """
+    comment = ""
+    if caption_title:
+        comment += f"Title: {caption_title}"
+    if caption_description:
+        if comment:
+            comment += "\n\n"
+        comment += f"Description: {caption_description}"
+
+    exif = build_exif_segment(title, copyright_text, comment or None)
+    xmp = build_xmp_segment(title, copyright_text, comment or None)
+    if exif is None and xmp is None:
+        return False
+
+    temp_path = f"{image_path}.{os.getpid()}.exif.part"
+    try:
+        with open(image_path, "rb") as src, open(temp_path, "wb") as dst:
+            segments, sos = _read_header_segments(src)
+            for marker, payload in segments:
+                if marker != _APP1:
+                    continue
+                if (payload.startswith(EXIF_HEADER) and not _is_own_exif(payload)) or (
+                    payload.startswith(XMP_HEADER) and not _is_own_xmp(payload)
+                ):
+                    raise ValueError("The image already has EXIF/XMP metadata of its own")
+            kept = [
+                (marker, payload)
+                for marker, payload in segments
+                if not (
+                    marker == _APP1
+                    and (payload.startswith(EXIF_HEADER) or payload.startswith(XMP_HEADER))
+                )
+            ]
+            # JFIF (APP0) stays first; the new APP1 segments follow it
+            leading = 0
+            while leading < len(kept) and kept[leading][0] == _APP0:
+                leading += 1
+            dst.write(b"\xff\xd8")
+            for marker, payload in kept[:leading]:
+                dst.write(_segment(marker, payload))
+            if exif is not None:
+                dst.write(_segment(_APP1, exif))
+            if xmp is not None:
+                dst.write(_segment(_APP1, xmp))
+            for marker, payload in kept[leading:]:
+                dst.write(_segment(marker, payload))
+            dst.write(sos)
+            shutil.copyfileobj(src, dst)
+        shutil.copymode(image_path, temp_path)
+        os.replace(temp_path, image_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return True
@@ -0,0 +1,74 @@
+"""Module to recompute the perceptual hashes of every archived image"""
+
+import os
+import time
+from rich import print as rprint
+
+from pyspotlightarchiver.helpers.download_db import (
+    iter_image_files,
+    update_image_phashes,
+)
+from pyspotlightarchiver.helpers.download_helper import get_save_dir
+from pyspotlightarchiver.helpers.imagehash_helper import (
+    compute_phashes,
+    get_hash_workers,
+)
+from pyspotlightarchiver.helpers.report_duplicates_helper import (
+    get_report_path,
+    rebuild_duplicates,
+)
+
+PROGRESS_EVERY = 500
+
+
+def _image_path(filename, api_ver, save_dir):
+    """Path of an archived image, looking in both folders if its API version is unknown."""
+    for ver in (api_ver,) if api_ver in (3, 4) else (3, 4):
+        path = os.path.join(get_save_dir(ver, save_dir), filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def rehash_images(save_dir=None, verbose=False):
+    """
+    Recompute the phash of every image in the database with the selected phash
+    backend (spread over the hash worker processes, if any), store the ones
+    that changed and rebuild the duplicate groups and report.
+    """
+    images = []
+    missing = 0
+    for url, phash, filename, api_ver in iter_image_files(save_dir):
+        path = _image_path(filename, api_ver, save_dir)
+        if path is None:
+            missing += 1
+            if verbose:
+                rprint(f"ℹ️ [gray]LOG: [rehash]Not on disk:[/gray] {filename}")
+            continue
+        images.append((url, phash, path))
+
+    workers = get_hash_workers()
+    rprint(
+        f"ℹ️ [gray]Rehashing {len(images)} image(s) "
+        f"{f'in {workers} process(es)' if workers else 'in this process'}...[/gray]"
+    )
+    start = time.monotonic()
+    updates = []
+    hashes = compute_phashes([path for _, _, path in images])
+    for done, ((url, old_phash, _), phash) in enumerate(zip(images, hashes), 1):
+        if phash != old_phash:
+            updates.append((url, phash))
+        if done % PROGRESS_EVERY == 0:
+            rprint(f"ℹ️ [gray]{done}/{len(images)} images rehashed[/gray]")
+    elapsed = time.monotonic() - start
+    update_image_phashes(updates, save_dir)
+
+    rprint(
+        f"✅ [green]Rehashed {len(images)} image(s)[/green] in {elapsed:.1f} s "
+        f"({len(images) / max(elapsed, 1e-9):.0f}/s): {len(updates)} changed"
+        + (f", {missing} not on disk" if missing else "")
+    )
+    if rebuild_duplicates(save_dir):
+        rprint(
+            f"⚠️ [yellow]Potential duplicates found.[/yellow] Reports are written to [orange]{get_report_path(save_dir)}[/orange]"
+        )
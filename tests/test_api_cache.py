@@ -0,0 +1,86 @@
+"""Tests for the on-disk API response cache."""
+
+import json
+import os
+import time
+
+import pytest
+
+from pyspotlightarchiver.defaults import DEFAULT_API_CACHE_MODE, DEFAULT_API_CACHE_TTL
+from pyspotlightarchiver.helpers import api_cache
+from pyspotlightarchiver.helpers.api_cache import (
+    cached_api_get,
+    get_api_cache_dir,
+    get_api_cache_ttl,
+    set_api_cache,
+)
+
+
+class _Response:
+    def __init__(self, data):
+        self.content = json.dumps(data).encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def fetches(tmp_path, monkeypatch):
+    calls = []
+
+    def http_get(url, **_kwargs):
+        calls.append(url)
+        return _Response({"url": url, "call": len(calls)})
+
+    monkeypatch.setattr(api_cache, "http_get", http_get)
+    set_api_cache("use", str(tmp_path), 3600)
+    yield calls
+    set_api_cache(DEFAULT_API_CACHE_MODE, None, DEFAULT_API_CACHE_TTL)
+
+
+def test_fresh_response_is_served_from_the_save_dir_cache(tmp_path, fetches):
+    assert cached_api_get("https://api.example/a") == cached_api_get("https://api.example/a")
+    assert len(fetches) == 1
+    assert os.listdir(get_api_cache_dir(str(tmp_path)))
+
+
+def test_stale_response_is_fetched_again(tmp_path, fetches):
+    cached_api_get("https://api.example/a")
+    set_api_cache("use", str(tmp_path), 0)
+    time.sleep(0.01)
+    assert cached_api_get("https://api.example/a")["call"] == 2
+    assert get_api_cache_ttl() == 0
+
+
+def test_refresh_and_off_modes(tmp_path, fetches):
+    cached_api_get("https://api.example/a")
+    set_api_cache("refresh", str(tmp_path))
+    assert cached_api_get("https://api.example/a")["call"] == 2
+    set_api_cache("off", str(tmp_path))
+    assert cached_api_get("https://api.example/b")["call"] == 3
+    set_api_cache("use", str(tmp_path))
+    # refresh stored its response, off did not
+    assert cached_api_get("https://api.example/a")["call"] == 2
+    assert cached_api_get("https://api.example/b")["call"] == 4
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path, fetches, monkeypatch):
+    cached_api_get("https://api.example/a")
+    size = sum(
+        entry.stat().st_size for entry in os.scandir(get_api_cache_dir(str(tmp_path)))
+    )
+    # Room for two responses; sizes vary by a few bytes with the fetch time
+    monkeypatch.setattr(api_cache, "_max_bytes", 2 * size + size // 2)
+    cached_api_get("https://api.example/b")
+    time.sleep(0.01)
+    cached_api_get("https://api.example/a")  # a is now the most recently used
+    cached_api_get("https://api.example/c")
+    fetches.clear()
+    for url in ("https://api.example/a", "https://api.example/c", "https://api.example/b"):
+        cached_api_get(url)
+    assert fetches == ["https://api.example/b"]
+
+
+def test_negative_ttl_is_rejected():
+    with pytest.raises(ValueError):
+        set_api_cache("use", ttl=-1)
@@ -0,0 +1,57 @@
+"""Tests for the asyncio download engine."""
+
+import asyncio
+
+from pyspotlightarchiver.helpers.download_helper import asset_id
+from pyspotlightarchiver.utils import async_download_utils
+from pyspotlightarchiver.utils.async_download_utils import _AsyncDownloader
+
+GOOD = "https://img.example/good.jpg"
+BAD = "https://img.example/bad.jpg"
+
+
+class _Entry:
+    def urls(self, _orientation):
+        return [("Landscape", GOOD), ("Portrait", BAD)]
+
+    def sha256(self, _url):
+        return None
+
+
+def test_failing_image_does_not_abort_the_run(tmp_path, monkeypatch):
+    def phash(path):
+        if "bad" in path:
+            raise ValueError("corrupt image")
+        return "0" * 16
+
+    def fake_download(url, **_kwargs):
+        return {"path": str(tmp_path / asset_id(url)), "reused": False}
+
+    patches = {
+        "_api_call": lambda *a, **k: [_Entry()],
+        "record_locale_entries": lambda *a: None,
+        "get_archived_urls": lambda *a: set(),
+        "get_image_validators": lambda *a: None,
+        "download_image_info": fake_download,
+        "compute_phash": phash,
+        "get_image_size": lambda _path: (1, 1),
+        "image_metadata": lambda *a: {},
+        "add_image_url_to_db": lambda *a, **k: None,
+    }
+    for name, value in patches.items():
+        monkeypatch.setattr(async_download_utils, name, value)
+
+    done = []
+    downloader = _AsyncDownloader(
+        3,
+        "landscape",
+        save_dir=str(tmp_path),
+        embed_exif=False,
+        on_locale_done=lambda *args: done.append(args),
+    )
+    status = asyncio.run(downloader.run(["en-US"]))
+
+    assert status["downloaded"] == 1
+    assert done == [("en-US", 1, 0)]
+    # The failed asset may be claimed again by a later locale
+    assert asset_id(BAD) not in downloader._claimed
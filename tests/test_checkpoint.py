@@ -0,0 +1,89 @@
+"""Tests for resumable crawl checkpoints."""
+
+import os
+
+import pytest
+
+from pyspotlightarchiver.helpers.checkpoint import CrawlCheckpoint
+from pyspotlightarchiver.helpers.circuit_breaker import CircuitOpenError
+from pyspotlightarchiver.utils import list_url
+
+
+def test_state_round_trip_and_clear(tmp_path):
+    checkpoint = CrawlCheckpoint("crawl", str(tmp_path), api_ver=3)
+    assert checkpoint.load() is None
+    checkpoint.save({"done": ["en-US"]})
+    checkpoint.save({"done": ["en-US", "fr-FR"]})
+    assert CrawlCheckpoint("crawl", str(tmp_path), api_ver=3).load() == {
+        "done": ["en-US", "fr-FR"]
+    }
+    assert os.listdir(os.path.dirname(checkpoint.path)) == ["crawl.json"]
+    checkpoint.clear()
+    checkpoint.clear()
+    assert checkpoint.load() is None
+
+
+def test_checkpoint_of_another_crawl_is_ignored(tmp_path):
+    CrawlCheckpoint("crawl", str(tmp_path), api_ver=3).save({"done": ["en-US"]})
+    assert CrawlCheckpoint("crawl", str(tmp_path), api_ver=4).load() is None
+
+
+def test_unreadable_checkpoint_starts_over(tmp_path):
+    checkpoint = CrawlCheckpoint("crawl", str(tmp_path))
+    checkpoint.save({"done": []})
+    with open(checkpoint.path, "w", encoding="utf-8") as f:
+        f.write('{"params": {}, "sta')
+    assert checkpoint.load() is None
+
+
+class _Entry:
+    def __init__(self, url):
+        self.url = url
+
+    def urls(self, _orientation):
+        return [("landscape", self.url)]
+
+
+@pytest.fixture
+def queried(monkeypatch):
+    calls = []
+    failing = {"b"}
+
+    def get_results(_api_ver, locale, _orientation):
+        calls.append(locale)
+        if locale in failing:
+            raise CircuitOpenError("api.example", 30)
+        return [_Entry(f"https://img.example/{locale}.jpg")]
+
+    monkeypatch.setattr(list_url, "get_results", get_results)
+    return calls, failing
+
+
+def _list_all(save_dir, locales, restart=False):
+    return list_url.process_all_locales(3, locales, "landscape", False, restart, save_dir)
+
+
+def test_interrupted_listing_resumes_with_the_failed_locales(tmp_path, queried):
+    calls, failing = queried
+    save_dir = str(tmp_path)
+    assert _list_all(save_dir, ["a", "b", "c"]) == 2
+    assert calls == ["a", "b", "c"]
+    calls.clear()
+    failing.clear()
+    # The resumed run only queries the locale that failed, and counts every URL
+    assert _list_all(save_dir, ["a", "b", "c"]) == 3
+    assert calls == ["b"]
+    # A finished listing leaves no checkpoint behind
+    calls.clear()
+    _list_all(save_dir, ["a", "b", "c"])
+    assert calls == ["a", "b", "c"]
+
+
+def test_restart_discards_the_checkpoint(tmp_path, queried):
+    calls, failing = queried
+    save_dir = str(tmp_path)
+    _list_all(save_dir, ["a", "b"])
+    calls.clear()
+    failing.clear()
+    _list_all(save_dir, ["a", "b"], restart=True)
+    assert calls == ["a", "b"]
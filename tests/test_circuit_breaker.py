@@ -0,0 +1,73 @@
+"""Tests for the per-host circuit breakers."""
+
+import time
+
+import pytest
+import requests
+
+from pyspotlightarchiver.helpers import download_helper
+from pyspotlightarchiver.helpers.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    get_circuit_breaker,
+)
+
+
+def _open(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("host.example", failure_threshold=3, cooldown=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.before_request()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError, match="another 60 second"):
+        breaker.before_request()
+    assert breaker.trips == 1
+
+
+def test_half_open_trial_closes_or_reopens():
+    breaker = CircuitBreaker("host.example", failure_threshold=1, cooldown=0.05)
+    _open(breaker)
+    time.sleep(0.06)
+    assert breaker.before_request()
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError, match="trial request"):
+        breaker.before_request()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    time.sleep(0.06)
+    assert breaker.before_request()
+    breaker.record_success()
+    assert not breaker.before_request()
+
+
+class _Session:
+    def __init__(self, exc):
+        self.exc = exc
+
+    def request(self, *args, **kwargs):
+        raise self.exc
+
+
+@pytest.mark.parametrize(
+    "exc", [KeyboardInterrupt(), requests.exceptions.TooManyRedirects("loop")]
+)
+def test_interrupted_trial_is_released(monkeypatch, exc):
+    url = f"https://trial-{type(exc).__name__}.example/image.jpg"
+    breaker = get_circuit_breaker(url)
+    breaker.cooldown = 0.05
+    _open(breaker)
+    time.sleep(0.06)
+    monkeypatch.setattr(download_helper, "get_session", lambda: _Session(exc))
+    with pytest.raises(type(exc)):
+        download_helper.http_get(url)
+    # The next request becomes the trial instead of failing for good
+    assert breaker.before_request()
@@ -0,0 +1,45 @@
+"""Tests for the unseen image estimator."""
+
+import json
+import math
+
+import pytest
+
+from pyspotlightarchiver.helpers.coverage import UnseenEstimator
+
+
+def test_nothing_observed_expects_everything_new():
+    estimator = UnseenEstimator()
+    assert estimator.unseen_probability() == 1.0
+    assert estimator.unseen_assets() == 0
+    assert math.isinf(estimator.expected_new_per_call())
+
+
+def test_good_turing_and_chao1():
+    estimator = UnseenEstimator()
+    # a, b, c once; d twice; e three times
+    estimator.update(["a", "b", "c", "d", "e"], calls=1, new_images=2)
+    estimator.update(["d", "e", "e"], calls=1, new_images=0)
+    assert estimator.observations == 8
+    assert estimator.unseen_probability() == pytest.approx(3 / 8)
+    assert estimator.unseen_assets() == pytest.approx(3 * 2 / (2 * 2))
+    # 4 assets per call * 3/8 unseen * (2 + 1) / (5 seen + 2) not yet archived
+    assert estimator.expected_new_per_call() == pytest.approx(4 * 3 / 8 * 3 / 7)
+
+
+def test_repeated_responses_drive_the_estimate_down():
+    estimator = UnseenEstimator()
+    estimator.update(["a", "b", "c", "d"], calls=1, new_images=4)
+    first = estimator.expected_new_per_call()
+    for _ in range(5):
+        estimator.update(["a", "b", "c", "d"], calls=1, new_images=0)
+    assert estimator.unseen_probability() == 0
+    assert estimator.expected_new_per_call() == 0 < first
+
+
+def test_state_round_trips_through_json():
+    estimator = UnseenEstimator()
+    estimator.update(["a", "b", "b"], calls=2, new_images=1)
+    restored = UnseenEstimator.from_dict(json.loads(json.dumps(estimator.as_dict())))
+    assert restored.as_dict() == estimator.as_dict()
+    assert restored.format() == estimator.format()
@@ -0,0 +1,74 @@
+"""Tests for the image database writer."""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from pyspotlightarchiver.helpers import download_db
+from pyspotlightarchiver.helpers.download_db import (
+    add_image_url_to_db,
+    close_db,
+    flush_db,
+    get_image_url_from_db,
+    init_db,
+)
+
+
+def test_failing_listener_does_not_report_lost_records(tmp_path, monkeypatch, capsys):
+    save_dir = str(tmp_path)
+
+    def broken_listener(_save_dir, _rows, _replaced):
+        raise RuntimeError("index update failed")
+
+    monkeypatch.setattr(
+        download_db, "_insert_listeners", [*download_db._insert_listeners, broken_listener]
+    )
+    init_db(save_dir)
+    try:
+        add_image_url_to_db("https://img.example/a.jpg", "ffffffff00000000", "a.jpg", save_dir)
+        flush_db(save_dir)
+        assert get_image_url_from_db("https://img.example/a.jpg", save_dir)
+    finally:
+        close_db()
+    output = capsys.readouterr().out
+    assert "Failed to record" not in output
+    assert "index update failed" in output
+
+
+def test_unopenable_database_fails_writes_instead_of_hanging(tmp_path):
+    # .cache is a file, so the database directory cannot be created
+    (tmp_path / ".cache").write_text("")
+    save_dir = str(tmp_path)
+    try:
+        with pytest.raises(OSError):
+            init_db(save_dir)
+        with pytest.raises(OSError):
+            add_image_url_to_db("https://img.example/a.jpg", "0" * 16, "a.jpg", save_dir)
+    finally:
+        close_db()
+
+
+def test_locked_database_batch_is_retried(tmp_path, monkeypatch):
+    save_dir = str(tmp_path)
+
+    def connect_without_busy_timeout(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        return sqlite3.connect(db_path, timeout=0, check_same_thread=False)
+
+    monkeypatch.setattr(download_db, "_connect", connect_without_busy_timeout)
+    monkeypatch.setattr(download_db, "WRITE_RETRY_DELAY", 0.1)
+    init_db(save_dir)
+    other = sqlite3.connect(
+        download_db.get_db_path(save_dir), timeout=0, check_same_thread=False
+    )
+    other.execute("BEGIN EXCLUSIVE")
+    threading.Timer(0.3, other.rollback).start()
+    try:
+        add_image_url_to_db("https://img.example/a.jpg", "0" * 16, "a.jpg", save_dir)
+        flush_db(save_dir)
+        assert get_image_url_from_db("https://img.example/a.jpg", save_dir)
+    finally:
+        close_db()
+        other.close()
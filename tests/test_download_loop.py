@@ -0,0 +1,42 @@
+"""Tests for the download loop of --multiple."""
+
+import time
+
+import pytest
+
+from pyspotlightarchiver.helpers.circuit_breaker import get_circuit_breaker
+from pyspotlightarchiver.helpers.download_db import close_db, init_db
+from pyspotlightarchiver.utils import download_utils
+
+
+@pytest.mark.parametrize("locale", ["en-US", "all"])
+def test_loop_waits_while_the_api_circuit_is_open(tmp_path, monkeypatch, locale):
+    save_dir = str(tmp_path)
+    init_db(save_dir)
+    breaker = get_circuit_breaker(f"https://api-{locale}.example/")
+    breaker.cooldown = 0.5
+    start = time.monotonic()
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    calls = []
+
+    def api_call(_api_ver, _locale, _orientation, _verbose=False):
+        calls.append(time.monotonic())
+        breaker.before_request()
+        breaker.record_success()
+        return []
+
+    monkeypatch.setattr(download_utils, "_api_call", api_call)
+    monkeypatch.setattr(download_utils, "MIN_ROUNDS_BEFORE_STOP", 1)
+    try:
+        download_utils.download_multiple_until_exhausted(
+            3, locale, "landscape", save_dir=save_dir, embed_exif=False, stop_below=1
+        )
+    finally:
+        close_db()
+
+    # The failed call is not counted; the next one waits for the trial request
+    assert calls[0] - start < breaker.cooldown
+    failed = [t for t in calls if t - start < breaker.cooldown]
+    assert len(failed) <= (15 if locale == "all" else 1)
+    assert any(t - start >= breaker.cooldown for t in calls)
@@ -0,0 +1,123 @@
+"""Tests for the staged download pipeline."""
+
+import threading
+
+from pyspotlightarchiver.utils import download_pipeline
+from pyspotlightarchiver.utils.download_pipeline import DownloadPipeline, _Stage
+
+
+class _Entry:
+    def sha256(self, _url):
+        return None
+
+
+def _join(pipeline, timeout=5):
+    """Run pipeline.join() in a thread; True if it returned within timeout."""
+    thread = threading.Thread(target=pipeline.join, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_failing_job_is_dropped_and_join_returns(tmp_path, monkeypatch):
+    image = tmp_path / "image.jpg"
+    image.write_bytes(b"")
+    done = []
+
+    def broken_phash(_path):
+        raise RuntimeError("hash worker crashed")
+
+    monkeypatch.setattr(
+        download_pipeline, "download_image_info", lambda *a, **k: {"path": str(image)}
+    )
+    monkeypatch.setattr(download_pipeline, "get_image_validators", lambda *a: None)
+    monkeypatch.setattr(download_pipeline, "compute_phash", broken_phash)
+
+    pipeline = DownloadPipeline(3, "landscape", str(tmp_path), embed_exif=False)
+    jobs = [(_Entry(), "Image", f"https://img.example/{i}.jpg") for i in range(3)]
+    pipeline.submit("en-us", jobs, on_done=lambda *args: done.append(args))
+
+    assert _join(pipeline)
+    assert done == [("en-us", 0, 0)]
+    # The failed images may be claimed again by a later locale
+    assert pipeline.claim(jobs[0][2])
+    pipeline.close()
+
+
+def test_stage_worker_survives_an_exception():
+    seen = []
+
+    def func(jobs):
+        if jobs == ["bad"]:
+            raise RuntimeError("boom")
+        seen.extend(jobs)
+
+    stage = _Stage("test", func, 1)
+    stage.put("bad")
+    stage.put("good")
+    stage.stop()
+    assert seen == ["good"]
+
+
+def test_kept_local_file_counts_as_already_downloaded(tmp_path, monkeypatch):
+    image = tmp_path / "image.jpg"
+    image.write_bytes(b"")
+    done = []
+
+    monkeypatch.setattr(
+        download_pipeline,
+        "download_image_info",
+        lambda *a, **k: {"path": str(image), "reused": True},
+    )
+    monkeypatch.setattr(download_pipeline, "get_image_validators", lambda *a: None)
+    monkeypatch.setattr(download_pipeline, "compute_phash", lambda _path: "0" * 16)
+    monkeypatch.setattr(download_pipeline, "image_metadata", lambda *a: {})
+    monkeypatch.setattr(download_pipeline, "add_image_url_to_db", lambda *a, **k: None)
+
+    pipeline = DownloadPipeline(3, "landscape", str(tmp_path), embed_exif=False)
+    pipeline.submit(
+        "en-us",
+        [(_Entry(), "Image", "https://img.example/kept.jpg")],
+        already_downloaded=2,
+        on_done=lambda *args: done.append(args),
+    )
+    assert _join(pipeline)
+    assert done == [("en-us", 0, 3)]
+    pipeline.close()
+
+
+def test_interrupted_submit_does_not_block_join(tmp_path, monkeypatch):
+    image = tmp_path / "image.jpg"
+    image.write_bytes(b"")
+    done = []
+    monkeypatch.setattr(
+        download_pipeline,
+        "download_image_info",
+        lambda *a, **k: {"path": str(image), "reused": False},
+    )
+    monkeypatch.setattr(download_pipeline, "get_image_validators", lambda *a: None)
+    monkeypatch.setattr(download_pipeline, "compute_phash", lambda _path: "0" * 16)
+    monkeypatch.setattr(download_pipeline, "image_metadata", lambda *a: {})
+    monkeypatch.setattr(download_pipeline, "add_image_url_to_db", lambda *a, **k: None)
+
+    pipeline = DownloadPipeline(3, "landscape", str(tmp_path), embed_exif=False)
+    put = pipeline._download.put
+    calls = []
+
+    def interrupted_put(job):
+        calls.append(job)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        put(job)
+
+    monkeypatch.setattr(pipeline._download, "put", interrupted_put)
+    jobs = [(_Entry(), "Image", f"https://img.example/{i}.jpg") for i in range(4)]
+    try:
+        pipeline.submit("en-us", jobs, on_done=lambda *args: done.append(args))
+    except KeyboardInterrupt:
+        pass
+    assert _join(pipeline)
+    # The locale is not reported done, so a resumed run queries it again
+    assert done == []
+    assert pipeline.claim(jobs[3][2])
+    pipeline.close()
@@ -0,0 +1,34 @@
+"""Tests for the shared HTTP connection pools."""
+
+import threading
+
+from pyspotlightarchiver.defaults import HTTP_POOL_SIZE
+from pyspotlightarchiver.helpers.http_client import get_session, set_http_pool_size
+
+
+def _session_in_thread():
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(get_session()))
+    thread.start()
+    thread.join()
+    return sessions[0]
+
+
+def test_threads_get_own_sessions_sharing_adapters():
+    session = get_session()
+    other = _session_in_thread()
+    assert session is get_session()
+    assert other is not session
+    assert other.get_adapter("https://a.example") is session.get_adapter("https://b.example")
+
+
+def test_resized_pool_is_mounted_on_existing_sessions():
+    session = get_session()
+    old = session.get_adapter("https://a.example")
+    try:
+        set_http_pool_size(HTTP_POOL_SIZE + 8)
+        new = get_session().get_adapter("https://a.example")
+        assert new is not old
+        assert new is _session_in_thread().get_adapter("https://a.example")
+    finally:
+        set_http_pool_size(HTTP_POOL_SIZE)
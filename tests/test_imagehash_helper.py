@@ -0,0 +1,55 @@
+"""Tests for phash computation."""
+
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from PIL import Image
+
+from pyspotlightarchiver.helpers import imagehash_helper
+from pyspotlightarchiver.helpers.imagehash_helper import (
+    compute_phash,
+    compute_phashes,
+    get_hash_workers,
+    set_hash_workers,
+)
+
+
+class _BrokenPool:
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+    def map(self, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"{i}.jpg"
+        Image.linear_gradient("L").rotate(i * 30).convert("RGB").save(path)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def broken_pool(monkeypatch):
+    set_hash_workers(2)
+    monkeypatch.setattr(imagehash_helper, "_get_hash_pool", _BrokenPool)
+    yield
+    set_hash_workers(0)
+
+
+def test_compute_phash_falls_back_when_the_pool_breaks(images, broken_pool):
+    expected = imagehash_helper._phash_file(images[0], "exact")
+    assert compute_phash(images[0]) == expected
+    assert get_hash_workers() == 0
+
+
+def test_compute_phashes_falls_back_when_the_pool_breaks(images, broken_pool):
+    expected = [imagehash_helper._phash_file(path, "exact") for path in images]
+    assert list(compute_phashes(images)) == expected
+    assert get_hash_workers() == 0
@@ -0,0 +1,59 @@
+"""Tests for learning groups of equivalent locales."""
+
+import sqlite3
+
+import pytest
+
+from pyspotlightarchiver.helpers.download_db import (
+    _run_write,
+    add_locale_assets,
+    close_db,
+    get_db_path,
+    get_locale_assets,
+    init_db,
+)
+from pyspotlightarchiver.helpers.locale_classes import get_locale_classes, overlap
+
+
+@pytest.fixture
+def save_dir(tmp_path):
+    init_db(str(tmp_path))
+    yield str(tmp_path)
+    close_db()
+
+
+def _record(save_dir, locale, keys):
+    add_locale_assets(3, locale, keys, save_dir)
+    # add_locale_assets does not wait for the writer
+    _run_write(save_dir, lambda conn: None)
+
+
+def test_locales_sharing_most_assets_are_grouped(save_dir):
+    pool = [f"asset{i}" for i in range(10)]
+    _record(save_dir, "en-US", pool)
+    _record(save_dir, "en-GB", pool[:8] + ["gb1", "gb2"])
+    # Shares a quarter of its assets: not equivalent
+    _record(save_dir, "fr-FR", pool[:2] + [f"fr{i}" for i in range(6)])
+    _record(save_dir, "de-DE", ["de1"])  # too few assets to classify
+    assert get_locale_classes(3, save_dir) == [["en-GB", "en-US"], ["fr-FR"]]
+
+
+def test_overlap_uses_the_smaller_set():
+    assert overlap({1, 2}, {1, 2, 3, 4}) == 1.0
+    assert overlap(set(), {1}) == 0.0
+
+
+def test_old_observations_age_out(save_dir):
+    _record(save_dir, "en-US", ["old", "recent"])
+    close_db()
+    with sqlite3.connect(get_db_path(save_dir)) as conn:
+        conn.execute(
+            "UPDATE locale_assets SET last_seen = datetime('now', '-60 days') "
+            "WHERE asset_id = 'old'"
+        )
+    assert get_locale_assets(3, save_dir) == {"en-US": {"recent"}}
+    # The next response for the locale prunes them from the table
+    _record(save_dir, "en-US", ["new"])
+    with sqlite3.connect(get_db_path(save_dir)) as conn:
+        rows = conn.execute("SELECT asset_id FROM locale_assets ORDER BY asset_id").fetchall()
+    assert rows == [("new",), ("recent",)]
@@ -0,0 +1,66 @@
+"""Tests for the Thompson sampling locale scheduler."""
+
+import random
+from collections import Counter
+
+import pytest
+
+from pyspotlightarchiver.helpers.download_db import _run_write, close_db, init_db
+from pyspotlightarchiver.helpers.locale_scheduler import LocaleScheduler
+
+LOCALES = [f"l{n}" for n in range(20)]
+
+
+@pytest.fixture
+def save_dir(tmp_path):
+    init_db(str(tmp_path))
+    random.seed(1234)
+    yield str(tmp_path)
+    close_db()
+
+
+def test_round_is_a_subset_of_distinct_locales(save_dir):
+    scheduler = LocaleScheduler(3, save_dir, round_size=5, explore_rate=0.5)
+    for _ in range(20):
+        chosen = scheduler.choose(LOCALES)
+        assert len(chosen) == len(set(chosen)) == 5
+        assert set(chosen) <= set(LOCALES)
+    assert sorted(scheduler.choose(LOCALES[:3])) == LOCALES[:3]
+
+
+def test_productive_locales_are_favoured(save_dir):
+    scheduler = LocaleScheduler(3, save_dir, round_size=2, explore_rate=0)
+    for _ in range(10):
+        scheduler.update({"l0": 3, "l1": 0, "l2": 0})
+    picks = Counter()
+    for _ in range(200):
+        picks.update(scheduler.choose(["l0", "l1", "l2"]))
+    assert picks["l0"] == 200
+    assert scheduler.format_yield() == "30 new image(s) in 30 locale call(s) (1.00 per call)"
+
+
+def test_untried_locales_are_explored(save_dir):
+    scheduler = LocaleScheduler(3, save_dir, round_size=1, explore_rate=0)
+    for _ in range(10):
+        scheduler.update({"l0": 0})
+    # A dry locale loses to one without history, whose prior mean is 1
+    picks = Counter(scheduler.choose(["l0", "l1"])[0] for _ in range(200))
+    assert picks["l1"] > 180
+
+
+def test_old_history_is_discounted(save_dir):
+    scheduler = LocaleScheduler(3, save_dir, window=10)
+    scheduler._stats["l0"] = (1000, 0)
+    # Treated as 10 dry calls, not 1000: Gamma(1, 1/11) has mean 1/11
+    mean = sum(scheduler._draw("l0") for _ in range(2000)) / 2000
+    assert mean == pytest.approx(1 / 11, rel=0.2)
+
+
+def test_history_is_persisted(save_dir):
+    LocaleScheduler(4, save_dir).update({"l0": 2, "l1": 0})
+    LocaleScheduler(4, save_dir).update({"l0": 1})
+    # update does not wait for the writer
+    _run_write(save_dir, lambda conn: None)
+    stats = LocaleScheduler(4, save_dir)._stats
+    assert stats == {"l0": (2, 3), "l1": (1, 0)}
+    assert not LocaleScheduler(3, save_dir)._stats
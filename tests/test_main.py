@@ -0,0 +1,25 @@
+"""Tests for the command line argument checks."""
+
+import sys
+
+import pytest
+
+from pyspotlightarchiver import main as main_module
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["--phash-threshold", "65"], "must be between 0 and 64, got 65"),
+        (["--phash-threshold", "-1"], "must be between 0 and 64, got -1"),
+        (["--phash-threshold", "ten"], "'ten' is not an integer"),
+        (["--exiftool-workers", "0"], "must be at least 1, got 0"),
+        (["--hash-workers", "-2"], "must be at least 0, got -2"),
+    ],
+)
+def test_out_of_range_options_are_rejected(monkeypatch, capsys, args, message):
+    monkeypatch.setattr(sys, "argv", ["pyspotlightarchiver", "download", *args])
+    with pytest.raises(SystemExit) as excinfo:
+        main_module.main()
+    assert excinfo.value.code == 2
+    assert message in capsys.readouterr().err
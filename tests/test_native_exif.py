@@ -0,0 +1,67 @@
+"""Tests for the native JPEG EXIF/XMP writer."""
+
+import pytest
+from PIL import Image
+
+from pyspotlightarchiver.utils import exif_utils
+from pyspotlightarchiver.utils.native_exif import write_jpeg_metadata
+
+_IMAGE_DESCRIPTION = 0x010E
+_MAKE = 0x010F
+_ORIENTATION = 0x0112
+_COPYRIGHT = 0x8298
+
+
+@pytest.fixture
+def jpeg(tmp_path):
+    path = tmp_path / "image.jpg"
+    Image.new("RGB", (16, 16), "teal").save(path)
+    return str(path)
+
+
+def _exif(path):
+    with Image.open(path) as img:
+        img.load()
+        return img.getexif(), img.info.get("xmp", b"")
+
+
+def test_writes_exif_and_xmp(jpeg):
+    assert write_jpeg_metadata(jpeg, title="Lake", copyright_text="(c) Someone")
+    exif, xmp = _exif(jpeg)
+    assert exif[_IMAGE_DESCRIPTION] == "Lake"
+    assert exif[_COPYRIGHT] == "(c) Someone"
+    assert "Lake" in xmp.decode("utf-8")
+
+
+def test_rewrite_replaces_own_metadata(jpeg):
+    write_jpeg_metadata(jpeg, title="Lake", caption_title="Old caption")
+    assert write_jpeg_metadata(jpeg, title="Mountain")
+    exif, xmp = _exif(jpeg)
+    assert exif[_IMAGE_DESCRIPTION] == "Mountain"
+    assert "Lake" not in xmp.decode("utf-8")
+
+
+def test_existing_camera_exif_is_left_to_exiftool(jpeg, monkeypatch):
+    camera = Image.Exif()
+    camera[_MAKE] = "Camera maker"
+    camera[_ORIENTATION] = 6
+    with Image.open(jpeg) as img:
+        img.save(jpeg, exif=camera)
+    with open(jpeg, "rb") as f:
+        original = f.read()
+
+    with pytest.raises(ValueError):
+        write_jpeg_metadata(jpeg, title="Lake")
+    with open(jpeg, "rb") as f:
+        assert f.read() == original
+
+    fallback = []
+    monkeypatch.setattr(
+        exif_utils,
+        "set_exif_metadata_batch",
+        lambda jobs, **kwargs: fallback.extend(jobs) or len(jobs),
+    )
+    monkeypatch.setattr(exif_utils, "_exif_writer", "native")
+    fields = {"title": "Lake"}
+    assert exif_utils.embed_exif_metadata_batch([(jpeg, fields)]) == 1
+    assert fallback == [(jpeg, fields)]
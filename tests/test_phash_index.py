@@ -0,0 +1,152 @@
+"""Tests for the packed perceptual hash index."""
+
+import random
+
+import numpy as np
+import pytest
+
+from pyspotlightarchiver.helpers import phash_index
+from pyspotlightarchiver.helpers.download_db import (
+    add_image_url_to_db,
+    close_db,
+    flush_db,
+    init_db,
+)
+from pyspotlightarchiver.helpers.phash_index import (
+    PHashIndex,
+    get_phash_index_path,
+    int_to_phash,
+    load_phash_index,
+    phash_to_int,
+    popcount,
+)
+
+
+def _near(value, bits, rng):
+    """value with the given number of distinct random bits flipped."""
+    for bit in rng.sample(range(64), bits):
+        value ^= 1 << bit
+    return value
+
+
+def _hashes(seed=7, clusters=30, size=4):
+    """Clusters of hashes a few bits apart, plus unrelated ones."""
+    rng = random.Random(seed)
+    values = []
+    for _ in range(clusters):
+        centre = rng.getrandbits(64)
+        values.append(centre)
+        values.extend(_near(centre, rng.randint(1, 12), rng) for _ in range(size - 1))
+    values.extend(rng.getrandbits(64) for _ in range(40))
+    return values
+
+
+def _index(values):
+    index = PHashIndex()
+    for rowid, value in enumerate(values, start=1):
+        assert index.append(rowid, value)
+    return index
+
+
+def _brute_groups(values, max_distance):
+    parent = list(range(len(values)))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for i, a in enumerate(values):
+        for j in range(i + 1, len(values)):
+            if bin(a ^ values[j]).count("1") <= max_distance:
+                parent[find(j)] = find(i)
+    groups = {}
+    for i in range(len(values)):
+        groups.setdefault(find(i), []).append(i + 1)
+    return sorted(group for group in groups.values() if len(group) > 1)
+
+
+def test_hex_conversion():
+    assert phash_to_int("00000000000000ff") == 255
+    assert int_to_phash(255) == "00000000000000ff"
+    assert phash_to_int("xyz") is None
+    assert phash_to_int("zz00000000000000") is None
+    assert phash_to_int(None) is None
+    assert not PHashIndex().append(1, "not a hash")
+
+
+def test_popcount_fallback_matches(monkeypatch):
+    values = np.array([0, 1, 2**64 - 1, 0xF0F0], dtype=np.uint64)
+    expected = [0, 1, 64, 8]
+    assert popcount(values).tolist() == expected
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert popcount(values).tolist() == expected
+
+
+def test_query_returns_rows_within_distance_nearest_first():
+    values = _hashes()
+    index = _index(values)
+    for value in values[:20]:
+        expected = sorted(
+            (bin(value ^ other).count("1"), rowid)
+            for rowid, other in enumerate(values, start=1)
+            if bin(value ^ other).count("1") <= 10
+        )
+        # Ties keep rowid order
+        assert index.query(int_to_phash(value), max_distance=10) == [
+            (rowid, distance) for distance, rowid in expected
+        ]
+    assert index.query_batch(["bad", values[0]], 0) == [[], [(1, 0)]]
+
+
+@pytest.mark.parametrize("max_distance", [0, 3, 10, 20, 63])
+def test_banded_groups_match_brute_force(max_distance):
+    values = _hashes()
+    # Exact duplicates land in a group at any threshold
+    values.append(values[0])
+    assert sorted(_index(values).near_duplicate_groups(max_distance)) == _brute_groups(
+        values, max_distance
+    )
+
+
+def test_saved_index_is_memory_mapped_and_still_appendable(tmp_path):
+    values = _hashes()
+    path = str(tmp_path / "index.npy")
+    _index(values).save(path)
+    loaded = PHashIndex.load(path)
+    assert len(loaded) == len(values)
+    assert not loaded.hashes.flags.writeable
+    loaded.append(len(values) + 1, values[0])
+    assert loaded.query(values[0], 0)[-1] == (len(values) + 1, 0)
+    # Appending copied the records; the file is unchanged
+    assert len(PHashIndex.load(path)) == len(values)
+    np.save(path, np.zeros(3))
+    with pytest.raises(ValueError):
+        PHashIndex.load(path)
+
+
+def test_stale_index_is_rebuilt_from_the_database(tmp_path, monkeypatch):
+    save_dir = str(tmp_path)
+    builds = []
+    build = phash_index.build_phash_index
+    monkeypatch.setattr(
+        phash_index, "build_phash_index", lambda d: builds.append(d) or build(d)
+    )
+    init_db(save_dir)
+    try:
+        add_image_url_to_db("https://img.example/a.jpg", "00000000000000ff", "a.jpg", save_dir)
+        flush_db(save_dir)
+        assert len(load_phash_index(save_dir)) == 1
+        assert len(load_phash_index(save_dir)) == 1
+        assert len(builds) == 1
+        add_image_url_to_db("https://img.example/b.jpg", "00000000000000fe", "b.jpg", save_dir)
+        flush_db(save_dir)
+        index = load_phash_index(save_dir)
+        assert len(builds) == 2
+        assert index.near_duplicate_groups(1) == [[1, 2]]
+        with open(get_phash_index_path(save_dir), "wb") as f:
+            f.write(b"corrupt")
+        assert len(load_phash_index(save_dir)) == 2
+        assert len(builds) == 3
+    finally:
+        close_db()
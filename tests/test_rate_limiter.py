@@ -0,0 +1,91 @@
+"""Tests for the adaptive (AIMD) rate limiter."""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from pyspotlightarchiver.helpers import rate_limiter
+from pyspotlightarchiver.helpers.rate_limiter import (
+    AdaptiveRateLimiter,
+    get_rate_limiter,
+    parse_retry_after,
+)
+
+
+def test_healthy_responses_raise_the_rate_additively():
+    limiter = AdaptiveRateLimiter(rate=1.0, max_rate=1.6, increase=0.25)
+    for _ in range(4):
+        limiter.record(200, 0.1)
+    # The first response only seeds the latency average
+    assert limiter.rate == pytest.approx(1.6)
+    limiter.record(200, 0.1)
+    assert limiter.rate == pytest.approx(1.6)
+
+
+def test_throttling_halves_the_rate_down_to_the_minimum():
+    limiter = AdaptiveRateLimiter(rate=4.0, min_rate=1.5)
+    limiter.record(429, 0.1)
+    assert limiter.rate == 2.0
+    limiter.record(503, 0.1)
+    assert limiter.rate == 1.5
+    assert limiter.throttled == 2
+
+
+def test_slow_responses_trim_the_rate():
+    limiter = AdaptiveRateLimiter(rate=10.0, latency_factor=2.0)
+    limiter.record(200, 0.1)
+    limiter.record(200, 1.0)
+    assert limiter.rate == pytest.approx(9.0)
+
+
+class _Clock:
+    """Stands in for the time module; sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    return fake
+
+
+def test_burst_then_refill_rate(clock):
+    limiter = AdaptiveRateLimiter(rate=2.0, burst=3)
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire() == pytest.approx(0.5)
+    assert limiter.requests == 4
+    assert clock.now == pytest.approx(100.5)
+
+
+def test_retry_after_blocks_requests(clock):
+    limiter = AdaptiveRateLimiter(rate=100.0, burst=5)
+    limiter.record(429, 0.1, retry_after=3)
+    start = clock.now
+    limiter.acquire()
+    assert clock.now - start >= 3
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("-4") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(later, usegmt=True)) <= 30
+
+
+def test_limiters_are_shared_per_host():
+    limiter = get_rate_limiter("https://limiter.example/a")
+    assert get_rate_limiter("https://limiter.example/b?x=1") is limiter
+    assert get_rate_limiter("limiter.example") is limiter
+    assert get_rate_limiter("https://other.example/") is not limiter
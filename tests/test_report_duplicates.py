@@ -0,0 +1,46 @@
+"""Tests for the perceptual duplicates report."""
+
+import os
+
+from pyspotlightarchiver.helpers.download_db import (
+    add_image_url_to_db,
+    close_db,
+    init_db,
+)
+from pyspotlightarchiver.helpers.report_duplicates_helper import (
+    get_report_path,
+    report_duplicates,
+)
+
+
+def test_report_removed_when_no_duplicates_remain(tmp_path):
+    save_dir = str(tmp_path)
+    init_db(save_dir)
+    # Three bits apart: duplicates at threshold 6, not at 0
+    add_image_url_to_db("https://img.example/a.jpg", "ffffffff00000000", "a.jpg", save_dir)
+    add_image_url_to_db("https://img.example/b.jpg", "ffffffff00000007", "b.jpg", save_dir)
+    try:
+        assert report_duplicates(save_dir, 6)
+        assert os.path.exists(get_report_path(save_dir))
+        assert not report_duplicates(save_dir, 0)
+        assert not os.path.exists(get_report_path(save_dir))
+        assert not report_duplicates(save_dir, 0)
+    finally:
+        close_db()
+
+
+def test_rerecorded_image_leaves_its_group(tmp_path):
+    save_dir = str(tmp_path)
+    init_db(save_dir)
+    add_image_url_to_db("https://img.example/a.jpg", "ffffffff00000000", "a.jpg", save_dir)
+    add_image_url_to_db("https://img.example/b.jpg", "ffffffff00000007", "b.jpg", save_dir)
+    try:
+        assert report_duplicates(save_dir, 6)
+        # b is recorded again with a hash far from a's
+        add_image_url_to_db("https://img.example/b.jpg", "0000000fffffffff", "b.jpg", save_dir)
+        assert not report_duplicates(save_dir, 6)
+        # ... and joins a group again when it matches
+        add_image_url_to_db("https://img.example/b.jpg", "ffffffff00000001", "b.jpg", save_dir)
+        assert report_duplicates(save_dir, 6)
+    finally:
+        close_db()
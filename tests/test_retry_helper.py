@@ -0,0 +1,82 @@
+"""Tests for the retry policy."""
+
+import pytest
+import requests
+
+from pyspotlightarchiver.helpers import retry_helper
+from pyspotlightarchiver.helpers.circuit_breaker import CircuitOpenError
+from pyspotlightarchiver.helpers.retry_helper import RetryPolicy
+
+
+def _http_error(status_code, retry_after=None):
+    response = requests.Response()
+    response.status_code = status_code
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.exceptions.HTTPError(f"{status_code} error", response=response)
+
+
+class _Flaky:
+    """Raises the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def waits(monkeypatch):
+    delays = []
+    monkeypatch.setattr(retry_helper, "wait_with_countdown", delays.append)
+    return delays
+
+
+def test_transient_failures_are_retried(waits):
+    operation = _Flaky(requests.exceptions.ConnectionError("reset"), _http_error(503))
+    policy = RetryPolicy(max_attempts=3, base_delay=1, max_delay=10, deadline=60)
+    assert policy.run(operation) == "ok"
+    assert operation.calls == 3
+    # The upper half of each exponential step is randomised
+    assert 0.5 <= waits[0] <= 1
+    assert 1 <= waits[1] <= 2
+
+
+@pytest.mark.parametrize(
+    "error",
+    [_http_error(404), ValueError("bad payload"), CircuitOpenError("host", 30)],
+)
+def test_permanent_failures_are_raised_at_once(waits, error):
+    operation = _Flaky(error)
+    with pytest.raises(type(error)):
+        RetryPolicy(max_attempts=5).run(operation)
+    assert operation.calls == 1
+    assert not waits
+
+
+def test_retry_after_overrides_the_backoff(waits):
+    operation = _Flaky(_http_error(429, retry_after="7"))
+    policy = RetryPolicy(max_attempts=2, base_delay=1, max_delay=2, deadline=60)
+    assert policy.run(operation) == "ok"
+    assert waits == [7.0]
+
+
+def test_last_failure_is_raised_after_max_attempts(waits):
+    operation = _Flaky(*(requests.exceptions.Timeout(str(n)) for n in range(3)))
+    with pytest.raises(requests.exceptions.Timeout, match="2"):
+        RetryPolicy(max_attempts=3, base_delay=0.01, deadline=60).run(operation)
+    assert operation.calls == 3
+    assert len(waits) == 2
+
+
+def test_no_retry_would_outlast_the_deadline(waits):
+    operation = _Flaky(_http_error(503, retry_after="120"))
+    with pytest.raises(requests.exceptions.HTTPError):
+        RetryPolicy(max_attempts=5, deadline=60).run(operation)
+    assert operation.calls == 1
+    assert not waits
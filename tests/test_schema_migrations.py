@@ -0,0 +1,125 @@
+"""Tests for upgrading existing archives to the current schema."""
+
+import os
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from pyspotlightarchiver.helpers import download_db
+from pyspotlightarchiver.helpers.download_db import (
+    SCHEMA_VERSION,
+    close_db,
+    get_db_path,
+    get_image_url_from_db,
+    init_db,
+)
+
+
+def _open(save_dir):
+    db_path = get_db_path(save_dir)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    return closing(sqlite3.connect(db_path))
+
+
+def _version(save_dir):
+    with _open(save_dir) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _apply(conn, migrations):
+    for steps in migrations:
+        for statement in steps:
+            if callable(statement):
+                statement(conn)
+            else:
+                conn.execute(statement)
+    conn.execute(f"PRAGMA user_version = {len(migrations)}")
+    conn.commit()
+
+
+@pytest.fixture
+def save_dir(tmp_path):
+    yield str(tmp_path)
+    close_db()
+
+
+def test_unversioned_archive_is_upgraded_in_place(save_dir):
+    # The layout written before the schema was versioned
+    with _open(save_dir) as conn:
+        conn.execute(
+            """
+            CREATE TABLE downloaded_images (
+                url TEXT PRIMARY KEY,
+                phash TEXT,
+                filename TEXT,
+                downloaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO downloaded_images (url, phash, filename) VALUES (?, ?, ?)",
+            ("https://img.example/path/a.jpg?w=1", "0" * 16, "a.jpg"),
+        )
+        conn.commit()
+    init_db(save_dir)
+    assert _version(save_dir) == SCHEMA_VERSION
+    assert get_image_url_from_db("https://img.example/path/a.jpg?w=1", save_dir)[:3] == (
+        "https://img.example/path/a.jpg?w=1",
+        "0" * 16,
+        "a.jpg",
+    )
+    with _open(save_dir) as conn:
+        # Migration 3 backfilled the asset id from the URL
+        assert conn.execute("SELECT asset_id FROM downloaded_images").fetchall() == [
+            ("a.jpg",)
+        ]
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    assert {"archive_meta", "locale_assets", "locale_stats"} <= tables
+
+
+def test_locale_observations_get_a_last_seen_time(save_dir):
+    with _open(save_dir) as conn:
+        _apply(conn, download_db._MIGRATIONS[:6])
+        conn.execute(
+            "INSERT INTO locale_assets (api_ver, locale, asset_id, first_seen) "
+            "VALUES (3, 'en-US', 'a.jpg', '2026-01-02 03:04:05')"
+        )
+        conn.commit()
+    init_db(save_dir)
+    with _open(save_dir) as conn:
+        assert conn.execute("SELECT last_seen FROM locale_assets").fetchall() == [
+            ("2026-01-02 03:04:05",)
+        ]
+
+
+def test_current_archive_is_left_alone(save_dir):
+    init_db(save_dir)
+    close_db()
+    init_db(save_dir)
+    assert _version(save_dir) == SCHEMA_VERSION
+
+
+def test_newer_schema_is_not_touched(save_dir, capsys):
+    with _open(save_dir) as conn:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    init_db(save_dir)
+    assert _version(save_dir) == SCHEMA_VERSION + 1
+    assert "newer than this version" in capsys.readouterr().out
+
+
+def test_failed_migration_is_rolled_back(save_dir, monkeypatch):
+    def fail(_conn):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    migrations = download_db._MIGRATIONS + [["CREATE TABLE extra (x INTEGER)", fail]]
+    monkeypatch.setattr(download_db, "_MIGRATIONS", migrations)
+    monkeypatch.setattr(download_db, "SCHEMA_VERSION", len(migrations))
+    with pytest.raises(sqlite3.OperationalError):
+        init_db(save_dir)
+    # Every migration before the failing one is kept, the failing one is undone
+    assert _version(save_dir) == SCHEMA_VERSION
+    with _open(save_dir) as conn:
+        assert not conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'extra'"
+        ).fetchall()
@@ -0,0 +1,76 @@
+"""Tests for the compact set of archived URLs."""
+
+from pyspotlightarchiver.helpers import seen_urls
+from pyspotlightarchiver.helpers.download_db import (
+    add_image_url_to_db,
+    close_db,
+    flush_db,
+    get_archived_urls,
+    init_db,
+)
+from pyspotlightarchiver.helpers.download_helper import refresh_saved_files
+from pyspotlightarchiver.helpers.seen_urls import SeenURLSet, url_key
+
+URLS = [f"https://img.example/{n}.jpg" for n in range(50)]
+
+
+def test_membership_of_initial_and_added_urls():
+    seen = SeenURLSet(URLS[:30] + URLS[:5])
+    assert len(seen) == 30
+    seen.add(URLS[40])
+    seen.add(URLS[40])
+    seen.add(URLS[0])
+    assert len(seen) == 31
+    assert URLS[0] in seen and URLS[40] in seen
+    assert URLS[35] not in seen
+    assert seen.contains_many(URLS[28:32] + [URLS[40]]) == [True, True, False, False, True]
+
+
+def test_empty_set():
+    seen = SeenURLSet()
+    assert URLS[0] not in seen
+    assert seen.contains_many(URLS[:2]) == [False, False]
+    assert seen.contains_many([]) == []
+
+
+def test_recent_additions_are_merged_into_the_array(monkeypatch):
+    monkeypatch.setattr(seen_urls, "_MERGE_THRESHOLD", 8)
+    seen = SeenURLSet(URLS[:10])
+    for url in URLS[10:18]:
+        seen.add(url)
+    stats = seen.memory_stats()
+    assert stats["urls"] == len(seen) == 18
+    assert stats["array_bytes"] == 18 * 8
+    assert all(seen.contains_many(URLS[:18]))
+    assert not any(seen.contains_many(URLS[18:]))
+
+
+def test_url_key_is_a_stable_64_bit_integer():
+    assert url_key(URLS[0]) == url_key(URLS[0])
+    assert url_key(URLS[0]) != url_key(URLS[1])
+    assert 0 <= url_key(URLS[0]) < 2**64
+
+
+def test_archived_urls_need_a_record_and_a_file(tmp_path):
+    save_dir = str(tmp_path)
+    for name in ("a.jpg", "c.jpg"):
+        (tmp_path / name).write_bytes(b"jpeg")
+    refresh_saved_files()
+    init_db(save_dir)
+    try:
+        add_image_url_to_db("https://img.example/a.jpg", "0" * 16, "a.jpg", save_dir)
+        add_image_url_to_db("https://img.example/b.jpg", "0" * 16, "b.jpg", save_dir)
+        flush_db(save_dir)
+        urls = [
+            "https://img.example/a.jpg",
+            "https://other.example/a.jpg?w=1920",
+            "https://img.example/b.jpg",  # recorded, but not on disk
+            "https://img.example/c.jpg",
+        ]
+        assert get_archived_urls(urls, save_dir) == set(urls[:2])
+        # Records committed after the set was loaded are added to it
+        add_image_url_to_db("https://img.example/c.jpg", "0" * 16, "c.jpg", save_dir)
+        flush_db(save_dir)
+        assert get_archived_urls(urls, save_dir) == {urls[0], urls[1], urls[3]}
+    finally:
+        close_db()